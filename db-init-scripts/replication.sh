@@ -0,0 +1,3 @@
+#!/bin/bash
+# allow the live-db-replica to stream from this database
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
@@ -0,0 +1,25 @@
+from sqlmodel import Session, select
+
+from app.spatial.shape import Shape
+from models.v1.buurt_gemeente import Buurt
+from models.v1.etl_metadata import TableLoad
+from shared.constants import source
+
+
+class CrudBuurt:
+    table_name = f"{source}.{Buurt.__tablename__}"
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_shapes(self) -> list[Shape]:
+        rows = self.session.exec(select(Buurt.bu_code, Buurt.gm_code, Buurt.shape_wkt))
+        return [Shape(*row) for row in rows]
+
+    def get_version(self) -> int:
+        return (
+            self.session.exec(
+                select(TableLoad.version).where(TableLoad.table_name == self.table_name)
+            ).one_or_none()
+            or 0
+        )
@@ -1,6 +1,18 @@
-from sqlmodel import Session, and_, select
+from sqlalchemy import bindparam
+from sqlmodel import Session, and_, col, select
+from sqlmodel.sql.expression import Select, SelectOfScalar
 
 from models.v1.cbs_aantal_woningen import CbsAantalWoningen
+from models.v1.cbs_aggregates import CbsAantalWoningenPerJaar, CbsAantalWoningenTrend
+
+# NOTE built once with bound parameters, so executing it reuses the compiled
+# statement from the cache instead of building and cache-keying a new one
+AANTAL_WONINGEN = select(CbsAantalWoningen.aantal_woningen).where(
+    and_(
+        CbsAantalWoningen.gm_code == bindparam("gm_code"),
+        CbsAantalWoningen.jaar == bindparam("jaar"),
+    ),
+)
 
 
 class CrudCbs:
@@ -8,15 +20,43 @@ class CrudCbs:
         self.session = session
         self.gm_code = gm_code
 
+    def aantal_woningen_query(self, jaar: int) -> SelectOfScalar[float]:
+        # NOTE filtering on jaar prunes the query to the partition of that year
+        return AANTAL_WONINGEN.params(gm_code=self.gm_code, jaar=jaar)
+
     def get_aantal_woningen(self, jaar: int) -> float:
         return (
             self.session.exec(
-                select(CbsAantalWoningen.aantal_woningen).where(
-                    and_(
-                        CbsAantalWoningen.gm_code == self.gm_code,
-                        CbsAantalWoningen.jaar == jaar,
-                    ),
-                ),
+                AANTAL_WONINGEN, params={"gm_code": self.gm_code, "jaar": jaar}
             ).one_or_none()
             or 0.0
         )
+
+    def trend_query(
+        self, van: int | None = None, tot: int | None = None
+    ) -> Select[CbsAantalWoningenTrend, float]:
+        """
+        The precomputed trend of the gemeente with the national total of every
+        year, read from the materialized views on their unique indexes.
+        """
+        query = (
+            select(
+                CbsAantalWoningenTrend, CbsAantalWoningenPerJaar.totaal_aantal_woningen
+            )
+            .join(
+                CbsAantalWoningenPerJaar,
+                col(CbsAantalWoningenPerJaar.jaar) == CbsAantalWoningenTrend.jaar,
+            )
+            .where(CbsAantalWoningenTrend.gm_code == self.gm_code)
+            .order_by(col(CbsAantalWoningenTrend.jaar))
+        )
+        if van is not None:
+            query = query.where(CbsAantalWoningenTrend.jaar >= van)
+        if tot is not None:
+            query = query.where(CbsAantalWoningenTrend.jaar <= tot)
+        return query
+
+    def get_trend(
+        self, van: int | None = None, tot: int | None = None
+    ) -> list[tuple[CbsAantalWoningenTrend, float]]:
+        return list(self.session.exec(self.trend_query(van, tot)).all())
@@ -0,0 +1,83 @@
+import base64
+import binascii
+import json
+from collections.abc import Iterator
+
+from sqlalchemy import Column, Select, select, tuple_
+from sqlmodel import Session, SQLModel
+
+from models.v1.buurt_gemeente import Buurt, Gemeente
+from models.v1.cbs_aantal_woningen import CbsAantalWoningen
+
+EXPORTABLE_TABLES: dict[str, type[SQLModel]] = {
+    "cbs-aantal-woningen": CbsAantalWoningen,
+    "gemeente": Gemeente,
+    "buurt": Buurt,
+}
+
+
+class InvalidTokenError(ValueError): ...
+
+
+def encode_token(key: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_token(token: str, length: int) -> tuple:
+    """Decode a token into a primary key of the given number of values"""
+    msg = f"Invalid pagination token: {token}"
+    try:
+        key = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except (binascii.Error, ValueError) as err:
+        raise InvalidTokenError(msg) from err
+    if not isinstance(key, list) or len(key) != length:
+        raise InvalidTokenError(msg)
+    if not all(isinstance(value, str | int | float) for value in key):
+        raise InvalidTokenError(msg)
+    return tuple(key)
+
+
+class CrudExport:
+    """
+    Reads a whole table in primary key order with a server-side cursor. The
+    primary key of the last row is the keyset to resume from.
+    """
+
+    def __init__(self, session: Session, model: type[SQLModel]):
+        self.session = session
+        self.table = model.__table__  # type: ignore
+
+    @property
+    def primary_key(self) -> list[Column]:
+        return list(self.table.primary_key.columns)
+
+    @property
+    def columns(self) -> list[Column]:
+        return list(self.table.columns)
+
+    def statement(self, columns: list[Column], after: tuple | None) -> Select:
+        statement = select(*columns).order_by(*self.primary_key)
+        if after is None:
+            return statement
+        return statement.where(tuple_(*self.primary_key) > tuple_(*after))
+
+    def next_key(self, after: tuple | None, limit: int) -> tuple | None:
+        """The key of the last row of the page, when more rows follow it"""
+        keys = self.statement(self.primary_key, after).offset(limit - 1).limit(2)
+        rows = self.session.connection().execute(keys).all()
+        return tuple(rows[0]) if rows[1:] else None
+
+    def stream(self, statement: Select, batch_size: int) -> Iterator[list[dict]]:
+        """
+        Yield the rows in batches, only one batch is in memory at a time. The
+        session is closed afterwards, so its connection returns to the pool as
+        soon as the export is complete.
+        """
+        try:
+            result = self.session.connection().execute(
+                statement, execution_options={"yield_per": batch_size}
+            )
+            for partition in result.mappings().partitions():
+                yield [dict(row) for row in partition]
+        finally:
+            self.session.close()
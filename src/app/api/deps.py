@@ -1,8 +1,63 @@
-from typing import Annotated
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING, Annotated
 
-from fastapi import Depends
+from fastapi import Depends, Request
 from sqlmodel import Session
 
-from shared.engine import get_sessions
+from app.api.crud.buurt import CrudBuurt
+from app.api.timeouts import guarded
+from app.snapshot import SnapshotProvider
+from app.spatial.provider import SpatialIndexProvider
+from shared.engine import get_read_sessions, get_sessions
+from shared.settings import settings
 
-SessionDep = Annotated[Session, Depends(get_sessions)]
+if TYPE_CHECKING:
+    from app.spatial.index import SpatialIndex
+    from app.warmup import WarmUp
+    from shared.snapshot import Snapshot
+
+
+async def get_guarded_sessions(
+    request: Request, session: Annotated[Session, Depends(get_sessions)]
+) -> AsyncIterator[Session]:
+    async with guarded(request, session):
+        yield session
+
+
+async def get_guarded_read_sessions(
+    request: Request, session: Annotated[Session, Depends(get_read_sessions)]
+) -> AsyncIterator[Session]:
+    async with guarded(request, session):
+        yield session
+
+
+SessionDep = Annotated[Session, Depends(get_guarded_sessions)]
+ReadSessionDep = Annotated[Session, Depends(get_guarded_read_sessions)]
+
+spatial_index_provider = SpatialIndexProvider(settings.SPATIAL_INDEX_REFRESH_SECONDS)
+
+
+def get_spatial_index(session: ReadSessionDep) -> "SpatialIndex":
+    return spatial_index_provider.get(CrudBuurt(session))
+
+
+SpatialIndexDep = Annotated["SpatialIndex", Depends(get_spatial_index)]
+
+snapshot_provider = SnapshotProvider(
+    settings.SNAPSHOT_PATH, settings.SNAPSHOT_CHECK_SECONDS
+)
+
+
+def get_snapshot() -> "Snapshot | None":
+    return snapshot_provider.get()
+
+
+SnapshotDep = Annotated["Snapshot | None", Depends(get_snapshot)]
+
+
+def get_warm_up(request: Request) -> "WarmUp | None":
+    """The warm-up started by the lifespan of the app"""
+    return getattr(request.app.state, "warm_up", None)
+
+
+WarmUpDep = Annotated["WarmUp | None", Depends(get_warm_up)]
@@ -0,0 +1,56 @@
+from typing import TYPE_CHECKING, Annotated
+
+from fastapi import APIRouter, HTTPException, Query, status
+from sqlmodel import Field, SQLModel
+
+from app.api.deps import SpatialIndexDep
+from app.spatial.shape import NOT_FOUND
+from shared.settings import settings
+
+if TYPE_CHECKING:
+    from app.spatial.index import SpatialIndex
+
+router = APIRouter()
+
+
+class BuurtLocation(SQLModel):
+    bu_code: str
+    gm_code: str
+
+
+class Points(SQLModel):
+    """Coordinates in the coordinate system of the buurt shapes"""
+
+    points: list[tuple[float, float]] = Field(
+        max_length=settings.SPATIAL_LOOKUP_MAX_POINTS
+    )
+
+
+def locate(
+    index: "SpatialIndex", points: list[tuple[float, float]]
+) -> list[BuurtLocation | None]:
+    return [
+        None
+        if shape == NOT_FOUND
+        else BuurtLocation(
+            bu_code=index.codes[shape], gm_code=index.parent_codes[shape]
+        )
+        for shape in index.locate(points).tolist()
+    ]
+
+
+@router.get("/locate")
+def locate_buurt(
+    index: SpatialIndexDep,
+    x: Annotated[float, Query()],
+    y: Annotated[float, Query()],
+) -> BuurtLocation:
+    location = locate(index, [(x, y)])[0]
+    if location is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "No buurt contains the point")
+    return location
+
+
+@router.post("/locate")
+def locate_buurten(index: SpatialIndexDep, body: Points) -> list[BuurtLocation | None]:
+    return locate(index, body.points)
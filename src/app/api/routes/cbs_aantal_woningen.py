@@ -1,15 +1,52 @@
 from datetime import date
+from typing import Annotated
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
+from sqlmodel import SQLModel
 
 from app.api.crud.cbs import CrudCbs
-from app.api.deps import SessionDep
+from app.api.deps import ReadSessionDep, SnapshotDep
 
 router = APIRouter()
 
 
+class AantalWoningenJaar(SQLModel):
+    jaar: int
+    aantal_woningen: float
+    cumulatief_aantal_woningen: float
+    groei: float | None
+    rang: int
+    totaal_aantal_woningen: float
+
+
+# NOTE sync routes run in the threadpool, so a blocking query does not keep the
+# event loop from noticing a client that disconnected
 @router.get("/{gm_code}/aantal-woningen")
-async def get_cbs_aantal_woningen(session: SessionDep, gm_code: str) -> float:
+def get_cbs_aantal_woningen(
+    session: ReadSessionDep, snapshot: SnapshotDep, gm_code: str
+) -> float:
+    jaar = date.today().year - 1
+    # NOTE the snapshot holds the whole table, a missing value is not in the db
+    if snapshot is not None:
+        return snapshot.get(gm_code, jaar) or 0.0
+
+    crud = CrudCbs(session, gm_code)
+    return crud.get_aantal_woningen(jaar)
+
+
+@router.get("/{gm_code}/aantal-woningen/trend")
+def get_cbs_aantal_woningen_trend(
+    session: ReadSessionDep,
+    gm_code: str,
+    van: Annotated[int | None, Query()] = None,
+    tot: Annotated[int | None, Query()] = None,
+) -> list[AantalWoningenJaar]:
     crud = CrudCbs(session, gm_code)
 
-    return crud.get_aantal_woningen(date.today().year - 1)
+    return [
+        AantalWoningenJaar(
+            **trend.model_dump(exclude={"gm_code"}),
+            totaal_aantal_woningen=totaal,
+        )
+        for trend, totaal in crud.get_trend(van, tot)
+    ]
@@ -0,0 +1,146 @@
+import csv
+import io
+import json
+from collections.abc import Iterator
+from enum import StrEnum
+from functools import cache
+from typing import TYPE_CHECKING, Annotated
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, String
+from sqlalchemy.types import TypeEngine
+
+from app.api.crud.export import (
+    EXPORTABLE_TABLES,
+    CrudExport,
+    InvalidTokenError,
+    decode_token,
+    encode_token,
+)
+from app.api.deps import ReadSessionDep
+from shared.settings import settings
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+router = APIRouter()
+
+Batches = Iterator[list[dict]]
+
+
+class ExportFormat(StrEnum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+    ARROW = "arrow"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.ARROW: "application/vnd.apache.arrow.stream",
+}
+
+
+@cache
+def arrow_types() -> dict[type[TypeEngine], "pa.DataType"]:
+    # NOTE pyarrow is imported on the first arrow export, not at startup
+    import pyarrow as pa  # noqa: PLC0415
+
+    return {
+        Boolean: pa.bool_(),
+        Integer: pa.int64(),
+        Float: pa.float64(),
+        DateTime: pa.timestamp("us", tz="UTC"),
+        String: pa.string(),
+    }
+
+
+def arrow_type(column: Column) -> "pa.DataType":
+    for sql_type, arrow in arrow_types().items():
+        if isinstance(column.type, sql_type):
+            return arrow
+    return arrow_types()[String]
+
+
+def arrow_schema(columns: list[Column]) -> "pa.Schema":
+    import pyarrow as pa  # noqa: PLC0415
+
+    return pa.schema([(column.name, arrow_type(column)) for column in columns])
+
+
+def ndjson_chunks(batches: Batches, columns: list[Column]) -> Iterator[bytes]:  # noqa: ARG001
+    for batch in batches:
+        yield "".join(f"{json.dumps(row, default=str)}\n" for row in batch).encode()
+
+
+def csv_chunks(batches: Batches, columns: list[Column]) -> Iterator[bytes]:
+    buffer = io.BytesIO()
+    text = io.TextIOWrapper(buffer, encoding="utf-8", newline="", write_through=True)
+    writer = csv.DictWriter(text, fieldnames=[column.name for column in columns])
+    writer.writeheader()
+    for batch in batches:
+        writer.writerows(batch)
+        yield drain(buffer)
+    yield drain(buffer)
+
+
+def arrow_chunks(batches: Batches, columns: list[Column]) -> Iterator[bytes]:
+    import pyarrow as pa  # noqa: PLC0415
+
+    buffer = io.BytesIO()
+    schema = arrow_schema(columns)
+    with pa.ipc.new_stream(buffer, schema) as writer:
+        for batch in batches:
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+            yield drain(buffer)
+    yield drain(buffer)
+
+
+def drain(buffer: io.BytesIO) -> bytes:
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return value
+
+
+ENCODERS = {
+    ExportFormat.NDJSON: ndjson_chunks,
+    ExportFormat.CSV: csv_chunks,
+    ExportFormat.ARROW: arrow_chunks,
+}
+
+
+@router.get("/{table}", response_class=StreamingResponse)
+def export_table(
+    session: ReadSessionDep,
+    table: str,
+    format: ExportFormat = ExportFormat.NDJSON,  # noqa: A002
+    after: Annotated[
+        str | None, Query(description="The X-Next-Token of the previous page.")
+    ] = None,
+    limit: Annotated[int | None, Query(gt=0)] = None,
+) -> StreamingResponse:
+    """
+    Stream a whole table in primary key order. With a limit the token to
+    request the next page is returned in the X-Next-Token header.
+    """
+    if table not in EXPORTABLE_TABLES:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, f"Unknown table {table}")
+
+    crud = CrudExport(session, EXPORTABLE_TABLES[table])
+    try:
+        key = decode_token(after, len(crud.primary_key)) if after is not None else None
+    except InvalidTokenError as err:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(err)) from err
+
+    next_key = crud.next_key(key, limit) if limit is not None else None
+    statement = crud.statement(crud.columns, key)
+
+    headers = {"X-Next-Token": encode_token(next_key)} if next_key else {}
+    batches = crud.stream(statement.limit(limit), settings.EXPORT_BATCH_SIZE)
+    return StreamingResponse(
+        ENCODERS[format](batches, crud.columns),
+        media_type=MEDIA_TYPES[format],
+        headers=headers,
+    )
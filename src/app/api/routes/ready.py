@@ -0,0 +1,42 @@
+import time
+
+from fastapi import APIRouter, Response, status
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import SQLModel
+
+from app.api.deps import ReadSessionDep, WarmUpDep
+from shared.settings import settings
+
+router = APIRouter()
+
+
+class Readiness(SQLModel):
+    status: str
+    latency_ms: float | None = None
+
+
+@router.get("")
+def get_ready(
+    session: ReadSessionDep, warm_up: WarmUpDep, response: Response
+) -> Readiness:
+    """
+    Ready once the warm-up finished and the database answers within
+    READY_MAX_LATENCY_SECONDS, unlike the heartbeat this is not ready before.
+    """
+    if warm_up is None or not warm_up.finished.is_set():
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return Readiness(status="warming up")
+
+    start = time.perf_counter()
+    try:
+        session.execute(text("SELECT 1"))
+    except DBAPIError:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return Readiness(status="database unavailable")
+
+    latency = time.perf_counter() - start
+    if latency > settings.READY_MAX_LATENCY_SECONDS:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return Readiness(status="database slow", latency_ms=latency * 1000)
+    return Readiness(status="ready", latency_ms=latency * 1000)
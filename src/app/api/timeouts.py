@@ -0,0 +1,175 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from typing import Any
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import Connection, event, func, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import SessionTransaction
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+from structlog import get_logger
+
+from shared.settings import settings
+
+logger = get_logger(__name__)
+
+QUERY_CANCELED = "57014"
+LOCK_NOT_AVAILABLE = "55P03"
+# NOTE libpq reports a command in progress as status 1, for both drivers
+TRANSACTION_STATUS_ACTIVE = 1
+
+TIMEOUT_RESPONSES = {
+    QUERY_CANCELED: (status.HTTP_504_GATEWAY_TIMEOUT, "The query took too long."),
+    LOCK_NOT_AVAILABLE: (
+        status.HTTP_503_SERVICE_UNAVAILABLE,
+        "The data is being updated, try again later.",
+    ),
+}
+
+
+def route_timeouts(name: str | None) -> tuple[str, str]:
+    """The statement_timeout and lock_timeout of a route, by the route name"""
+    if name is None:
+        return settings.STATEMENT_TIMEOUT, settings.LOCK_TIMEOUT
+    return (
+        settings.ROUTE_STATEMENT_TIMEOUTS.get(name, settings.STATEMENT_TIMEOUT),
+        settings.ROUTE_LOCK_TIMEOUTS.get(name, settings.LOCK_TIMEOUT),
+    )
+
+
+class QueryGuard:
+    """
+    Sets the timeouts of a route local to every transaction of the session,
+    so they are reset when the connection returns to the pool, and cancels
+    the running query of the session when the client disconnects.
+    """
+
+    def __init__(self, session: Session, statement_timeout: str, lock_timeout: str):
+        self.session = session
+        self.statement_timeout = statement_timeout
+        self.lock_timeout = lock_timeout
+        self.connection: Any = None
+
+    def apply(self, connection: Connection) -> None:
+        connection.execute(
+            select(
+                func.set_config("statement_timeout", self.statement_timeout, True),
+                func.set_config("lock_timeout", self.lock_timeout, True),
+            )
+        )
+        self.connection = connection.connection.dbapi_connection
+
+    def after_begin(
+        self,
+        session: Session,  # noqa: ARG002
+        transaction: SessionTransaction,  # noqa: ARG002
+        connection: Connection,
+    ) -> None:
+        self.apply(connection)
+
+    def after_transaction_end(
+        self,
+        session: Session,  # noqa: ARG002
+        transaction: SessionTransaction,
+    ) -> None:
+        # NOTE after a commit the connection may serve another request
+        if transaction.parent is None:
+            self.connection = None
+
+    def start(self) -> None:
+        # NOTE a session already in a transaction, e.g. in tests, gets no begin
+        if self.session.in_transaction():
+            self.apply(self.session.connection())
+        event.listen(self.session, "after_begin", self.after_begin)
+        event.listen(self.session, "after_transaction_end", self.after_transaction_end)
+
+    def stop(self) -> None:
+        event.remove(self.session, "after_begin", self.after_begin)
+        event.remove(self.session, "after_transaction_end", self.after_transaction_end)
+
+    def is_executing(self) -> bool:
+        return (
+            self.connection is not None
+            and self.connection.info.transaction_status == TRANSACTION_STATUS_ACTIVE
+        )
+
+    async def cancel_on_disconnect(self, request: Request, interval: float) -> None:
+        # NOTE is_disconnected receives the pending message of the client, so
+        # it must not run next to a response that listens for the disconnect
+        while not await request.is_disconnected():  # noqa: ASYNC110
+            await asyncio.sleep(interval)
+        if self.is_executing():
+            logger.info("Client disconnected, cancelling the query.")
+            await run_in_threadpool(self.connection.cancel)
+
+
+def streams(route: Any) -> bool:
+    """
+    Whether the route streams its response, the session is then used until
+    the response is sent and the response listens for the disconnect itself
+    """
+    response_class = getattr(route, "response_class", None)
+    return isinstance(response_class, type) and issubclass(
+        response_class, StreamingResponse
+    )
+
+
+@asynccontextmanager
+async def guarded(request: Request, session: Session) -> AsyncIterator[Session]:
+    """The session with the timeouts of the route of the request"""
+    route = request.scope.get("route")
+    guard = QueryGuard(session, *route_timeouts(getattr(route, "name", None)))
+    await run_in_threadpool(guard.start)
+    watcher = None
+    if not streams(route):
+        watcher = asyncio.create_task(
+            guard.cancel_on_disconnect(request, settings.DISCONNECT_CHECK_SECONDS)
+        )
+    try:
+        yield session
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+            with suppress(asyncio.CancelledError):
+                await watcher
+        guard.stop()
+
+
+def sqlstate(exc: DBAPIError) -> str | None:
+    """The error code of psycopg2 (pgcode) and psycopg (sqlstate)"""
+    return getattr(exc.orig, "pgcode", None) or getattr(exc.orig, "sqlstate", None)
+
+
+async def query_timeout_handler(request: Request, exc: Exception) -> JSONResponse:  # noqa: ARG001
+    """
+    504 for a cancelled statement, 503 for a lock that was not acquired, and
+    500 for the other errors of the database, e.g. a lost connection
+    """
+    code = sqlstate(exc) if isinstance(exc, DBAPIError) else None
+    if code is None or code not in TIMEOUT_RESPONSES:
+        logger.error("Database error.", sqlstate=code, exc_info=exc)
+        return JSONResponse(
+            {"message": "Internal Server Error"},
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+    status_code, message = TIMEOUT_RESPONSES[code]
+    logger.warning("Query timed out.", sqlstate=code, status_code=status_code)
+    headers = {"Retry-After": "1"} if code == LOCK_NOT_AVAILABLE else None
+    return JSONResponse({"message": message}, status_code, headers=headers)
+
+
+async def pool_timeout_handler(
+    request: Request,  # noqa: ARG001
+    exc: Exception,  # noqa: ARG001
+) -> JSONResponse:
+    """503 when no connection of the pool became available in time"""
+    logger.warning("No database connection available.")
+    return JSONResponse(
+        {"message": "The API is busy, try again later."},
+        status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"},
+    )
@@ -1,3 +1,6 @@
 # route paths
 HEARTBEAT = "heartbeat"
+READY = "ready"
 CBS = "cbs"
+BUURT = "buurt"
+EXPORT = "export"
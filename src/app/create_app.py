@@ -1,18 +1,53 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
-from app.api.routes import cbs_aantal_woningen, heartbeat
-from app.constants import CBS, HEARTBEAT
+from app.api.deps import snapshot_provider, spatial_index_provider
+from app.api.routes import buurt, cbs_aantal_woningen, export, heartbeat, ready
+from app.api.timeouts import pool_timeout_handler, query_timeout_handler
+from app.constants import BUURT, CBS, EXPORT, HEARTBEAT, READY
+from app.warmup import WarmUp
+from shared.engine import get_replica_router
 from shared.settings import settings
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Warm up in the background, the heartbeat answers in the meantime"""
+    app.state.warm_up = WarmUp(
+        get_replica_router(),
+        snapshot_provider,
+        spatial_index_provider,
+        settings.WARMUP_CONNECTIONS,
+    )
+    task = asyncio.create_task(app.state.warm_up.run(settings.WARMUP_RETRY_SECONDS))
+    yield
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(root_path=settings.API_STRING, openapi_url="/openapi.json")
+    app = FastAPI(
+        root_path=settings.API_STRING, openapi_url="/openapi.json", lifespan=lifespan
+    )
 
     app.title = settings.PROJECT_NAME
 
     app.include_router(heartbeat.router, prefix=f"/{HEARTBEAT}")
+    app.include_router(ready.router, prefix=f"/{READY}")
     app.include_router(cbs_aantal_woningen.router, prefix=f"/{CBS}")
+    app.include_router(buurt.router, prefix=f"/{BUURT}")
+    app.include_router(export.router, prefix=f"/{EXPORT}")
+
+    app.add_exception_handler(OperationalError, query_timeout_handler)
+    app.add_exception_handler(PoolTimeoutError, pool_timeout_handler)
 
     origins = (
         [
@@ -28,6 +63,8 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Token"],
     )
+    app.add_middleware(GZipMiddleware, minimum_size=1000)
 
     return app
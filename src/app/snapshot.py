@@ -0,0 +1,66 @@
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from structlog import get_logger
+
+if TYPE_CHECKING:
+    from shared.snapshot import Snapshot
+
+logger = get_logger(__name__)
+
+
+class SnapshotProvider:
+    """
+    Keeps the snapshot published by the ETL mapped, and remaps it when the
+    file was replaced. The file is checked at most once every
+    `check_interval` seconds, requests in between use the current mapping.
+    """
+
+    def __init__(self, path: Path | None, check_interval: float):
+        self.path = path
+        self.check_interval = check_interval
+        self.snapshot: Snapshot | None = None
+        self.file_id: tuple[int, int] | None = None
+        self.checked_at = -math.inf
+        self.lock = threading.Lock()
+
+    def is_checked(self) -> bool:
+        return time.monotonic() - self.checked_at < self.check_interval
+
+    def get(self) -> "Snapshot | None":
+        if self.path is None or self.is_checked():
+            return self.snapshot
+
+        with self.lock:
+            if not self.is_checked():
+                self.refresh(self.path)
+                self.checked_at = time.monotonic()
+            return self.snapshot
+
+    def refresh(self, path: Path) -> None:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            self.snapshot, self.file_id = None, None
+            return
+
+        # NOTE a published snapshot replaces the file, so it gets a new inode
+        file_id = (stat.st_ino, stat.st_mtime_ns)
+        if file_id == self.file_id:
+            return
+
+        # NOTE numpy is imported on the first mapping, not at startup
+        from shared.snapshot import Snapshot  # noqa: PLC0415
+
+        # NOTE the previous mapping is unmapped once no request uses it anymore
+        self.snapshot, self.file_id = Snapshot(path), file_id
+        logger.info(
+            "Snapshot mapped.",
+            path=os.fspath(path),
+            version=self.snapshot.version,
+            gm_codes=len(self.snapshot.keys),
+        )
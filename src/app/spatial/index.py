@@ -0,0 +1,149 @@
+import math
+from collections.abc import Sequence
+
+import numpy as np
+from structlog import get_logger
+
+from app.spatial.shape import NOT_FOUND, Shape
+from app.spatial.wkt import parse_polygon_rings, ring_edges
+
+logger = get_logger(__name__)
+
+
+def shape_edges(shapes: Sequence[Shape]) -> tuple[list[Shape], list[np.ndarray]]:
+    """
+    The shapes with their edges, shapes without an area or with an unsupported
+    geometry are left out, so one bad shape does not break the whole index
+    """
+    indexed, edges = [], []
+    for shape in shapes:
+        try:
+            found = ring_edges(parse_polygon_rings(shape.wkt))
+        except ValueError as err:
+            logger.warning("Skipping unsupported shape.", code=shape.code, error=err)
+            continue
+        if len(found) == 0:
+            logger.warning("Skipping shape without area.", code=shape.code)
+            continue
+        indexed.append(shape)
+        edges.append(found)
+    return indexed, edges
+
+
+class SpatialIndex:
+    """
+    Locates the shape containing a point. The edges of all shapes are stored in
+    one array, a uniform grid over the bounding boxes selects the candidate
+    shapes, and the candidates are tested with a vectorized even-odd
+    point-in-polygon test.
+    """
+
+    def __init__(self, shapes: Sequence[Shape], cells_per_shape: float = 1.0):
+        shapes, edges = shape_edges(shapes)
+        self.codes = np.array([shape.code for shape in shapes], dtype=object)
+        self.parent_codes = np.array(
+            [shape.parent_code for shape in shapes], dtype=object
+        )
+        counts = np.array([len(edge) for edge in edges], dtype=np.int64)
+        self.edge_offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.edges = np.concatenate(edges) if edges else np.empty((0, 4))
+        self.bounds = np.array(
+            [
+                [
+                    min(edge[:, 0].min(), edge[:, 2].min()),
+                    min(edge[:, 1].min(), edge[:, 3].min()),
+                    max(edge[:, 0].max(), edge[:, 2].max()),
+                    max(edge[:, 1].max(), edge[:, 3].max()),
+                ]
+                for edge in edges
+            ]
+        ).reshape(-1, 4)
+        self.build_grid(cells_per_shape)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def build_grid(self, cells_per_shape: float) -> None:
+        """
+        Assign every shape to the grid cells its bounding box overlaps, stored
+        as the cell offsets into a flat array of shape indices.
+        """
+        if len(self) == 0:
+            self.origin, self.cell_size, self.shape = np.zeros(2), np.ones(2), (1, 1)
+            self.cell_offsets = np.zeros(2, dtype=np.int64)
+            self.cell_items = np.empty(0, dtype=np.int64)
+            return
+
+        minimum, maximum = (
+            self.bounds[:, :2].min(axis=0),
+            self.bounds[:, 2:].max(axis=0),
+        )
+        side = max(1, math.ceil(math.sqrt(len(self) * cells_per_shape)))
+        self.origin = minimum
+        self.cell_size = np.maximum((maximum - minimum) / side, np.finfo(float).eps)
+        self.shape = (side, side)
+
+        low = self.cell_of(self.bounds[:, :2], clip=True)
+        high = self.cell_of(self.bounds[:, 2:], clip=True)
+        shape_cells, shape_items = [], []
+        for index, ((x0, y0), (x1, y1)) in enumerate(zip(low, high, strict=True)):
+            xs, ys = np.meshgrid(np.arange(x0, x1 + 1), np.arange(y0, y1 + 1))
+            shape_cells.append((xs * side + ys).ravel())
+            shape_items.append(np.full(xs.size, index))
+        cells, items = np.concatenate(shape_cells), np.concatenate(shape_items)
+
+        order = np.argsort(cells, kind="stable")
+        self.cell_items = items[order]
+        self.cell_offsets = np.concatenate(
+            [[0], np.cumsum(np.bincount(cells, minlength=side * side))]
+        )
+
+    def cell_of(self, points: np.ndarray, clip: bool = False) -> np.ndarray:
+        cells = np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+        if clip:
+            return np.clip(cells, 0, np.array(self.shape) - 1)
+        return cells
+
+    def candidates(self, points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """The pairs of point and shape indices whose bounding boxes overlap"""
+        cells = self.cell_of(points)
+        inside_grid = np.all((cells >= 0) & (cells < self.shape), axis=1)
+        point_indices = np.flatnonzero(inside_grid)
+        flat = cells[inside_grid, 0] * self.shape[1] + cells[inside_grid, 1]
+
+        starts, ends = self.cell_offsets[flat], self.cell_offsets[flat + 1]
+        counts = ends - starts
+        pair_points = np.repeat(point_indices, counts)
+        shifts = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        pair_shapes = self.cell_items[np.arange(counts.sum()) + shifts]
+
+        bounds, xy = self.bounds[pair_shapes], points[pair_points]
+        overlaps = np.all((xy >= bounds[:, :2]) & (xy <= bounds[:, 2:]), axis=1)
+        return pair_points[overlaps], pair_shapes[overlaps]
+
+    def contains(self, shape: int, points: np.ndarray) -> np.ndarray:
+        """Even-odd test of the points against all edges of the shape"""
+        edges = self.edges[self.edge_offsets[shape] : self.edge_offsets[shape + 1]]
+        x0, y0, x1, y1 = edges.T
+        px, py = points[:, :1], points[:, 1:]
+
+        straddles = (y0 > py) != (y1 > py)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_crossing = x0 + (py - y0) * (x1 - x0) / (y1 - y0)
+        crossings = np.count_nonzero(straddles & (px < x_crossing), axis=1)
+        return crossings % 2 == 1
+
+    def locate(self, points: np.ndarray | Sequence[Sequence[float]]) -> np.ndarray:
+        """The index of the shape containing each point, or NOT_FOUND"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        located = np.full(len(points), NOT_FOUND, dtype=np.int64)
+        pair_points, pair_shapes = self.candidates(points)
+
+        order = np.argsort(pair_shapes, kind="stable")
+        pair_points, pair_shapes = pair_points[order], pair_shapes[order]
+        shapes, starts = np.unique(pair_shapes, return_index=True)
+        groups = np.split(pair_points, starts)[1:]
+        for shape, group in zip(shapes, groups, strict=True):
+            inside = group[self.contains(shape, points[group])]
+            located[inside] = shape
+        return located
@@ -0,0 +1,60 @@
+import math
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from structlog import get_logger
+
+from app.api.crud.buurt import CrudBuurt
+
+if TYPE_CHECKING:
+    from app.spatial.index import SpatialIndex
+
+logger = get_logger(__name__)
+
+
+class SpatialIndexProvider:
+    """
+    Keeps the spatial index of the buurten in memory, and rebuilds it when the
+    version of the buurt table changed. The version is checked at most once
+    every `refresh_interval` seconds.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self.index: SpatialIndex | None = None
+        self.version: int | None = None
+        self.checked_at = -math.inf
+        self.lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.index, self.version, self.checked_at = None, None, -math.inf
+
+    def is_checked(self) -> bool:
+        return time.monotonic() - self.checked_at < self.refresh_interval
+
+    def get(self, crud: CrudBuurt) -> "SpatialIndex":
+        if self.index is not None and self.is_checked():
+            return self.index
+
+        with self.lock:
+            if self.index is not None and self.is_checked():
+                return self.index
+
+            version = crud.get_version()
+            if self.index is None or version != self.version:
+                # NOTE numpy is imported on the first build, not at startup
+                from app.spatial.index import SpatialIndex  # noqa: PLC0415
+
+                start = time.perf_counter()
+                self.index = SpatialIndex(crud.get_shapes())
+                logger.info(
+                    "Spatial index built.",
+                    shapes=len(self.index),
+                    version=version,
+                    duration_s=round(time.perf_counter() - start, 4),
+                )
+                self.version = version
+            self.checked_at = time.monotonic()
+            return self.index
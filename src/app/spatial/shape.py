@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+# NOTE kept apart from the index, so reading shapes does not import numpy
+NOT_FOUND = -1
+
+
+@dataclass(frozen=True)
+class Shape:
+    code: str
+    parent_code: str
+    wkt: str
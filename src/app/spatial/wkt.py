@@ -0,0 +1,38 @@
+import re
+
+import numpy as np
+
+RING_PATTERN = re.compile(r"\(([^()]+)\)")
+POLYGON_TYPES = ("POLYGON", "MULTIPOLYGON")
+
+
+def parse_ring(text: str) -> np.ndarray:
+    """A ring as an (n, 2) array of the x and y coordinates"""
+    return np.array(
+        [point.split() for point in text.split(",")], dtype=np.float64
+    ).reshape(-1, 2)
+
+
+def parse_polygon_rings(wkt: str) -> list[np.ndarray]:
+    """
+    The rings of a POLYGON or MULTIPOLYGON, exteriors and holes alike. With the
+    even-odd rule a point is inside when it is inside an odd number of rings,
+    so the nesting of the rings is not needed.
+    """
+    header = wkt.split("(", 1)[0].upper().split()
+    geometry_type = " ".join(word for word in header if word != "EMPTY")
+    if geometry_type not in POLYGON_TYPES:
+        msg = f"Unsupported geometry type: {geometry_type or wkt[:20]}"
+        raise ValueError(msg)
+    return [parse_ring(ring) for ring in RING_PATTERN.findall(wkt)]
+
+
+def ring_edges(rings: list[np.ndarray]) -> np.ndarray:
+    """
+    The edges of closed rings as an (n, 4) array of x0, y0, x1, y1, empty for
+    e.g. `POLYGON EMPTY`
+    """
+    edges = [
+        np.hstack([ring, np.roll(ring, -1, axis=0)]) for ring in rings if len(ring) > 1
+    ]
+    return np.concatenate(edges) if edges else np.empty((0, 4))
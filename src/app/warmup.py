@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import date
+
+from sqlalchemy import Engine
+from sqlalchemy.exc import ProgrammingError
+from sqlmodel import Session
+from structlog import get_logger
+
+from app.api.crud.buurt import CrudBuurt
+from app.api.crud.cbs import CrudCbs
+from app.api.timeouts import sqlstate
+from app.snapshot import SnapshotProvider
+from app.spatial.provider import SpatialIndexProvider
+from shared.engine import ReplicaRouter
+
+logger = get_logger(__name__)
+
+UNDEFINED_TABLE = "42P01"
+
+
+@contextmanager
+def unless_not_loaded(step: str) -> Iterator[None]:
+    """Nothing to warm up from tables the ETL has not created yet"""
+    try:
+        yield
+    except ProgrammingError as err:
+        if sqlstate(err) != UNDEFINED_TABLE:
+            raise
+        logger.info("Tables not loaded yet, nothing to warm up.", step=step)
+
+
+class WarmUp:
+    """
+    Warms the API up before it reports ready, so the first requests after a
+    deploy do not pay for it: opens connections of the pool of every engine,
+    runs the CRUD statements on each of them to fill the statement cache and
+    the catalog caches of the database sessions, and loads the snapshot and
+    the spatial index. Tables the ETL has not created yet are skipped, any
+    failure is retried until the warm-up succeeds.
+    """
+
+    def __init__(
+        self,
+        router: ReplicaRouter,
+        snapshot_provider: SnapshotProvider,
+        spatial_index_provider: SpatialIndexProvider,
+        connections: int,
+    ):
+        self.router = router
+        self.snapshot_provider = snapshot_provider
+        self.spatial_index_provider = spatial_index_provider
+        self.connections = connections
+        self.finished = threading.Event()
+
+    def prime(self, engine: Engine) -> None:
+        # NOTE all connections are opened before any is returned to the pool
+        connections = [engine.connect() for _ in range(self.connections)]
+        try:
+            for connection in connections:
+                with Session(bind=connection) as session, unless_not_loaded("cbs"):
+                    crud = CrudCbs(session, "")
+                    crud.get_aantal_woningen(date.today().year - 1)
+                    crud.get_trend()
+        finally:
+            for connection in connections:
+                connection.close()
+
+    def warm(self) -> None:
+        start = time.perf_counter()
+        for engine in self.router.engines():
+            self.prime(engine)
+        self.snapshot_provider.get()
+        with Session(self.router.engine()) as session, unless_not_loaded("buurt"):
+            self.spatial_index_provider.get(CrudBuurt(session))
+
+        self.finished.set()
+        logger.info(
+            "Warm-up finished.", duration_s=round(time.perf_counter() - start, 4)
+        )
+
+    async def run(self, retry_interval: float) -> None:
+        while not self.finished.is_set():
+            try:
+                await asyncio.to_thread(self.warm)
+            except Exception as err:
+                # NOTE e.g. the database is down or a snapshot is corrupt,
+                # the API only reports ready after a warm-up that succeeded
+                logger.warning("Warm-up failed, retrying.", exc_info=err)
+                await asyncio.sleep(retry_interval)
@@ -1,4 +1,5 @@
 from etl.apis.rest_client import SyncRestClient
+from shared.settings import settings
 
 
 class CbsApi:
@@ -6,10 +7,15 @@ class CbsApi:
     Centraal Bureau voor Statistiek Public API
     """
 
-    def __init__(self, client: SyncRestClient | None = None):
+    def __init__(
+        self,
+        client: SyncRestClient | None = None,
+        endpoint: str | None = None,
+    ):
         if client is None:
             client = SyncRestClient()
         self.client = client
+        self._endpoint = endpoint or settings.CBS_ODATA_URL
 
     @property
     def headers(self) -> dict[str, str]:
@@ -17,7 +23,7 @@ class CbsApi:
 
     @property
     def endpoint(self) -> str:
-        return "https://opendata.cbs.nl/ODataApi/odata"
+        return self._endpoint
 
     def get_gerealiseerde_woningen_for_year(self, year: int) -> list[dict]:
         # https://opendata.cbs.nl/statline/portal.html?_la=nl&_catalog=CBS&tableId=81955NED&_theme=397
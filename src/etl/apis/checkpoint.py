@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+
+class PaginationCheckpoint:
+    """
+    Progress of a paginated extraction: the next `skip` offset and the pages
+    retrieved so far.
+
+    When a path is given every completed page is appended to a JSON lines file,
+    together with the offset of the next page. A rerun resumes from the last
+    completed page instead of from the start, the file is removed once the
+    extraction completes. Without a path the progress is only kept in memory.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.skip = 0
+        self.results: list[dict] = []
+
+    @classmethod
+    def for_request(
+        cls,
+        directory: Path,
+        endpoint_func: Callable,
+        limit: int,
+        **kwargs,
+    ) -> "PaginationCheckpoint":
+        """Checkpoint file that is unique for the endpoint, page size and kwargs"""
+        key = json.dumps(
+            [endpoint_func.__qualname__, limit, kwargs], sort_keys=True, default=str
+        )
+        name = f"{endpoint_func.__name__}-{hashlib.sha256(key.encode()).hexdigest()}"
+        return cls(Path(directory) / f"{name[:80]}.jsonl")
+
+    def resume(self, skip: int) -> None:
+        self.skip = skip
+        self.results = []
+        if self.path is None or not self.path.exists():
+            return
+
+        # NOTE the end of the last complete page, a torn page after it is cut
+        # off so the pages added after resuming can be read back
+        end = 0
+        with self.path.open("rb+") as file:
+            for line in file:
+                try:
+                    page = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Discarding partially written checkpoint page.")
+                    file.truncate(end)
+                    break
+                end += len(line)
+                self.skip = page["skip"]
+                self.results.append(page["result"])
+
+        logger.info(
+            "Resuming paginated extraction from checkpoint.",
+            skip=self.skip,
+            pages=len(self.results),
+        )
+
+    def add(self, result: dict, limit: int) -> None:
+        self.results.append(result)
+        self.skip += limit
+        if self.path is None:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a") as file:
+            file.write(json.dumps({"skip": self.skip, "result": result}) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def complete(self) -> None:
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
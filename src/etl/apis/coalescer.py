@@ -0,0 +1,82 @@
+import asyncio
+import math
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+import httpx
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CoalescerStats:
+    sent: int = 0
+    coalesced: int = 0
+    memo_hits: int = 0
+
+
+@dataclass
+class RequestCoalescer:
+    """
+    Deduplicates identical requests of an `AsyncRestClient`. Concurrent
+    identical requests share one in-flight request, and successful responses
+    are memoized for `ttl` seconds, or for the lifetime of the coalescer
+    (e.g. a run) without a ttl.
+    """
+
+    ttl: float | None = None
+    stats: CoalescerStats = field(default_factory=CoalescerStats)
+    in_flight: dict[str, asyncio.Future] = field(default_factory=dict)
+    memo: dict[str, tuple[float, httpx.Response]] = field(default_factory=dict)
+
+    @staticmethod
+    def key(method: str, url: str, params: dict | None = None) -> str:
+        return f"{method} {httpx.Request(method, url, params=params).url}"
+
+    def memoized(self, key: str) -> httpx.Response | None:
+        expires_at, response = self.memo.get(key, (0.0, None))
+        if response is not None and time.monotonic() < expires_at:
+            return response
+        self.memo.pop(key, None)
+        return None
+
+    def memoize(self, key: str, response: httpx.Response) -> None:
+        if response.is_success:
+            ttl = math.inf if self.ttl is None else self.ttl
+            self.memo[key] = (time.monotonic() + ttl, response)
+
+    def clear(self) -> None:
+        self.memo.clear()
+
+    async def run(
+        self,
+        key: str,
+        send: Callable[[], Awaitable[httpx.Response]],
+    ) -> httpx.Response:
+        if (response := self.memoized(key)) is not None:
+            self.stats.memo_hits += 1
+            return response
+        if (future := self.in_flight.get(key)) is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.stats.sent += 1
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        try:
+            response = await send()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as err:
+            future.set_exception(err)
+            future.exception()  # NOTE marks it retrieved when nobody is waiting
+            raise
+        finally:
+            del self.in_flight[key]
+
+        future.set_result(response)
+        self.memoize(key, response)
+        return response
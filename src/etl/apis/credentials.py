@@ -0,0 +1,79 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class Credentials:
+    headers: dict[str, str] = field(default_factory=dict)
+    expires_at: float | None = None
+
+    def expires_within(self, seconds: float) -> bool:
+        return self.expires_at is not None and self.expires_at - time.time() <= seconds
+
+
+class CredentialProvider:
+    """
+    Provides the auth headers of an `AsyncRestClient`, with a single-flight
+    refresh. Concurrent callers that need a refresh wait on the one running,
+    instead of each fetching a new token from the auth provider.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[Credentials]],
+        refresh_margin: float = 60.0,
+    ):
+        """
+        Args:
+            fetch: Coroutine function fetching new credentials.
+            refresh_margin: Seconds before expiry at which the credentials
+                are refreshed proactively.
+        """
+        self.fetch = fetch
+        self.refresh_margin = refresh_margin
+        self.credentials: Credentials | None = None
+        self.refreshes = 0
+        self._lock: asyncio.Lock | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        """A lock per event loop, every `asyncio.run` starts a new loop"""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+        return self._lock
+
+    def needs_refresh(self, credentials: Credentials | None) -> bool:
+        return credentials is None or credentials.expires_within(self.refresh_margin)
+
+    async def get(self) -> Credentials:
+        credentials = self.credentials
+        if credentials is None or self.needs_refresh(credentials):
+            return await self.refresh(stale=credentials)
+        return credentials
+
+    async def refresh(self, stale: Credentials | None = None) -> Credentials:
+        """
+        Refresh the credentials, unless they were already replaced since the
+        caller got the `stale` credentials, then the new ones are returned.
+        """
+        async with self.lock:
+            current = self.credentials
+            if (
+                current is not None
+                and current is not stale
+                and not self.needs_refresh(current)
+            ):
+                return current
+
+            logger.info("Refreshing credentials.")
+            self.credentials = await self.fetch()
+            self.refreshes += 1
+            return self.credentials
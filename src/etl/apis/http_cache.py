@@ -0,0 +1,224 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from http import HTTPStatus
+from pathlib import Path
+
+import httpx
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    digest: str
+    size: int
+    stored_at: float
+    last_access: float
+    content_type: str | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    max_age: int | None = None
+
+    @property
+    def has_validators(self) -> bool:
+        return self.etag is not None or self.last_modified is not None
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.revalidated + self.misses
+        return (self.hits + self.revalidated) / lookups if lookups else 0.0
+
+
+@dataclass
+class HttpCache:
+    """
+    On-disk cache for GET responses.
+
+    Bodies are gzip compressed and stored content-addressed by their sha256
+    digest, so identical payloads served under different urls are stored once.
+    An index maps each url to its body digest and the validators (ETag /
+    Last-Modified) the server sent along.
+
+    Entries with validators are revalidated with a conditional request, entries
+    without validators are considered fresh for `ttl` seconds. A
+    `Cache-Control: max-age` sent by the server takes precedence over both.
+    The total size of the stored bodies is bounded by `max_bytes`, the least
+    recently used entries are evicted first.
+    """
+
+    directory: Path
+    max_bytes: int = 512 * 1024**2
+    ttl: float = 24 * 60 * 60
+    stats: CacheStats = field(default_factory=CacheStats)
+
+    def __post_init__(self):
+        self.directory = Path(self.directory)
+        self._lock = threading.Lock()
+        self._entries = self._read_index()
+
+    @property
+    def index_path(self) -> Path:
+        return self.directory / "index.json"
+
+    def blob_path(self, digest: str) -> Path:
+        return self.directory / "objects" / digest[:2] / f"{digest}.gz"
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(f"GET {url}".encode()).hexdigest()
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(self.key(url))
+            if entry is None or not self.blob_path(entry.digest).exists():
+                self.stats.misses += 1
+                return None
+            return entry
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        lifetime: float
+        if entry.max_age is not None:
+            lifetime = entry.max_age
+        elif entry.has_validators:
+            lifetime = 0
+        else:
+            lifetime = self.ttl
+        return time.time() - entry.stored_at < lifetime
+
+    @staticmethod
+    def conditional_headers(entry: CacheEntry) -> dict[str, str]:
+        headers = {}
+        if entry.etag is not None:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified is not None:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def hit(self, entry: CacheEntry) -> httpx.Response:
+        """Serve a fresh entry without contacting the server."""
+        with self._lock:
+            self.stats.hits += 1
+            entry.last_access = time.time()
+            self._write_index()
+        logger.info("HTTP cache hit.", url=entry.url)
+        return self.response(entry)
+
+    def revalidated(
+        self, entry: CacheEntry, response: httpx.Response
+    ) -> httpx.Response:
+        """Serve an entry the server confirmed with a 304 Not Modified."""
+        with self._lock:
+            self.stats.revalidated += 1
+            entry.stored_at = entry.last_access = time.time()
+            entry.max_age = self._max_age(response) or entry.max_age
+            entry.etag = response.headers.get("ETag", entry.etag)
+            entry.last_modified = response.headers.get(
+                "Last-Modified", entry.last_modified
+            )
+            self._write_index()
+        logger.info("HTTP cache revalidated.", url=entry.url)
+        return self.response(entry)
+
+    def store(self, url: str, response: httpx.Response) -> None:
+        if response.status_code != HTTPStatus.OK or "no-store" in response.headers.get(
+            "Cache-Control", ""
+        ):
+            return
+
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        blob_path = self.blob_path(digest)
+        if not blob_path.exists():
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            self._atomic_write(blob_path, gzip.compress(content))
+
+        now = time.time()
+        with self._lock:
+            self.stats.stores += 1
+            self._entries[self.key(url)] = CacheEntry(
+                url=url,
+                digest=digest,
+                size=blob_path.stat().st_size,
+                stored_at=now,
+                last_access=now,
+                content_type=response.headers.get("Content-Type"),
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                max_age=self._max_age(response),
+            )
+            self._evict()
+            self._write_index()
+
+    def response(self, entry: CacheEntry) -> httpx.Response:
+        headers = {"Content-Type": entry.content_type} if entry.content_type else {}
+        return httpx.Response(
+            HTTPStatus.OK,
+            headers=headers,
+            content=gzip.decompress(self.blob_path(entry.digest).read_bytes()),
+            request=httpx.Request("GET", entry.url),
+        )
+
+    def _evict(self) -> None:
+        blob_sizes = {entry.digest: entry.size for entry in self._entries.values()}
+        total = sum(blob_sizes.values())
+        for key, entry in sorted(
+            self._entries.items(), key=lambda item: item[1].last_access
+        ):
+            if total <= self.max_bytes:
+                break
+            del self._entries[key]
+            self.stats.evictions += 1
+            if all(other.digest != entry.digest for other in self._entries.values()):
+                total -= entry.size
+                self.blob_path(entry.digest).unlink(missing_ok=True)
+
+    @staticmethod
+    def _max_age(response: httpx.Response) -> int | None:
+        match = MAX_AGE_PATTERN.search(response.headers.get("Cache-Control", ""))
+        return int(match.group(1)) if match else None
+
+    def _read_index(self) -> dict[str, CacheEntry]:
+        if not self.index_path.exists():
+            return {}
+        try:
+            index = json.loads(self.index_path.read_text())
+        except json.JSONDecodeError:
+            logger.warning("HTTP cache index is corrupt, starting empty.")
+            return {}
+        return {key: CacheEntry(**value) for key, value in index.items()}
+
+    def _write_index(self) -> None:
+        self._atomic_write(
+            self.index_path,
+            json.dumps(
+                {key: asdict(entry) for key, entry in self._entries.items()}
+            ).encode(),
+        )
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(
+            f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
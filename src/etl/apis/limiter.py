@@ -0,0 +1,125 @@
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from http import HTTPStatus
+
+import httpx
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class LimiterStats:
+    sent: int = 0
+    congested: int = 0
+    increases: int = 0
+    decreases: int = 0
+    peak_limit: int = 0
+
+
+def is_congested(response: httpx.Response) -> bool:
+    """Rate limited, failed upstream, or timed out in `AsyncRestClient.fetch`"""
+    return (
+        response.status_code
+        in (HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.REQUEST_TIMEOUT)
+        or response.is_server_error
+    )
+
+
+@dataclass
+class AdaptiveLimiter:
+    """
+    Limits the requests of an `AsyncRestClient` in flight, additive increase
+    and multiplicative decrease (AIMD) like TCP congestion control. Every
+    healthy response faster than `latency_threshold`, while at least half
+    the limit is in flight, raises the limit by 1/limit, about one per round
+    of requests, a 429, 5xx or timeout cuts it by `backoff`. Only responses
+    to requests sent after the last cut lower it again, so the failures of
+    one round count once.
+    """
+
+    limit: float = 4.0
+    minimum: float = 1.0
+    maximum: float = 128.0
+    backoff: float = 0.5
+    latency_threshold: float = 10.0
+    in_flight: int = 0
+    decreased_at: float = -math.inf
+    stats: LimiterStats = field(default_factory=LimiterStats)
+    waiters: deque[asyncio.Future] = field(default_factory=deque)
+
+    def __post_init__(self):
+        self.stats.peak_limit = self.current_limit
+
+    @property
+    def current_limit(self) -> int:
+        """The metric of the number of requests allowed in flight"""
+        return max(1, int(self.limit))
+
+    async def acquire(self) -> None:
+        # NOTE a waiter is woken per free slot, but may lose it to a new request
+        while self.in_flight >= self.current_limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                self.wake()
+                raise
+        self.in_flight += 1
+        self.stats.sent += 1
+
+    def wake(self) -> None:
+        slots = self.current_limit - self.in_flight
+        while slots > 0 and self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                slots -= 1
+
+    def increase(self) -> None:
+        before = self.current_limit
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        if self.current_limit > before:
+            self.stats.increases += 1
+            self.stats.peak_limit = max(self.stats.peak_limit, self.current_limit)
+            logger.debug("Concurrency limit increased.", limit=self.current_limit)
+
+    def decrease(self) -> None:
+        self.limit = max(self.minimum, self.limit * self.backoff)
+        self.decreased_at = time.monotonic()
+        self.stats.decreases += 1
+        logger.info("Concurrency limit decreased.", limit=self.current_limit)
+
+    def is_healthy(self, sent_at: float) -> bool:
+        # NOTE only raise a limit in use, not while the last requests drain
+        return (
+            time.monotonic() - sent_at <= self.latency_threshold
+            and self.in_flight >= self.current_limit / 2
+        )
+
+    def release(self, sent_at: float, response: httpx.Response | None) -> None:
+        """Adjust the limit to the response, none when the request raised"""
+        if response is not None and is_congested(response):
+            self.stats.congested += 1
+            if sent_at >= self.decreased_at:
+                self.decrease()
+        elif response is not None and self.is_healthy(sent_at):
+            self.increase()
+        self.in_flight -= 1
+        self.wake()
+
+    async def run(
+        self, send: Callable[[], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        await self.acquire()
+        sent_at, response = time.monotonic(), None
+        try:
+            response = await send()
+        finally:
+            self.release(sent_at, response)
+        return response
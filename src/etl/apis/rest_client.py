@@ -2,7 +2,9 @@ import asyncio
 import time
 from abc import ABC
 from collections.abc import Callable, Coroutine
-from functools import cached_property
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from functools import cached_property, partial
 from http import HTTPStatus
 from uuid import uuid4
 
@@ -11,13 +13,24 @@ from httpx import AsyncClient, HTTPError
 from structlog import get_logger
 from structlog.contextvars import bound_contextvars
 
+from etl.apis.checkpoint import PaginationCheckpoint
+from etl.apis.coalescer import RequestCoalescer
+from etl.apis.credentials import CredentialProvider, Credentials
+from etl.apis.http_cache import CacheEntry, HttpCache
+from etl.apis.limiter import AdaptiveLimiter
+from shared.settings import settings
+
 logger = get_logger(__name__)
 
+THROTTLED = (HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE)
+
 
 class TooManyFailedRequestsError(Exception): ...
 
 
 class RestClient:
+    cache: HttpCache | None = None
+
     @cached_property
     def headers(self) -> dict[str, str]:
         return {}
@@ -39,8 +52,63 @@ class RestClient:
             raise err
         return response
 
+    @staticmethod
+    def retry_after(response: httpx.Response) -> float:
+        """The seconds of the Retry-After header, a delay or an HTTP date"""
+        value = response.headers.get("Retry-After")
+        if value is None:
+            return settings.RETRY_AFTER_DEFAULT_SECONDS
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                delta = parsedate_to_datetime(value) - datetime.now(UTC)
+                seconds = delta.total_seconds()
+            except (TypeError, ValueError):
+                return settings.RETRY_AFTER_DEFAULT_SECONDS
+        return min(max(seconds, 0.0), settings.RETRY_AFTER_MAX_SECONDS)
+
+    @staticmethod
+    def cache_key(url: str, params: dict | None = None) -> str:
+        return str(httpx.Request("GET", url, params=params).url)
+
+    def cache_lookup(self, url: str) -> CacheEntry | None:
+        return self.cache.lookup(url) if self.cache is not None else None
+
+    def fresh_cached_response(self, entry: CacheEntry | None) -> httpx.Response | None:
+        if self.cache is None or entry is None or not self.cache.is_fresh(entry):
+            return None
+        return self.cache.hit(entry)
+
+    def request_headers(
+        self,
+        entry: CacheEntry | None,
+        headers: dict[str, str] | None = None,
+    ) -> dict[str, str]:
+        """Add the validators of a cached entry to turn a GET into a conditional GET"""
+        headers = self.headers if headers is None else headers
+        if entry is None:
+            return headers
+        return {**headers, **HttpCache.conditional_headers(entry)}
+
+    def update_cache(
+        self,
+        url: str,
+        entry: CacheEntry | None,
+        response: httpx.Response,
+    ) -> httpx.Response:
+        if self.cache is None:
+            return response
+        if entry is not None and response.status_code == HTTPStatus.NOT_MODIFIED:
+            return self.cache.revalidated(entry, response)
+        self.cache.store(url, response)
+        return response
+
 
 class SyncRestClient(RestClient, ABC):
+    def __init__(self, cache: HttpCache | None = None):
+        self.cache = cache
+
     def get_request(
         self,
         request: str,
@@ -49,7 +117,15 @@ class SyncRestClient(RestClient, ABC):
     ) -> httpx.Response:
         url = f"{self.hostname}{request}" if include_hostname else f"{request}"
 
-        return httpx.get(url, headers=self.headers, timeout=30.0, **kwargs)
+        cache_key = self.cache_key(url, kwargs.get("params"))
+        entry = self.cache_lookup(cache_key)
+        if (cached := self.fresh_cached_response(entry)) is not None:
+            return cached
+
+        response = httpx.get(
+            url, headers=self.request_headers(entry), timeout=30.0, **kwargs
+        )
+        return self.update_cache(cache_key, entry, response)
 
     def send_request(
         self,
@@ -78,6 +154,18 @@ class SyncRestClient(RestClient, ABC):
                     request,
                     retries - 1,
                     check_status=check_status,
+                    include_hostname=include_hostname,
+                    **kwargs,
+                )
+            if response.status_code in THROTTLED and retries > 0:
+                delay = self.retry_after(response)
+                logger.warning("Request throttled, retrying.", retry_after=delay)
+                time.sleep(delay)
+                return self.send_request(
+                    request,
+                    retries - 1,
+                    check_status=check_status,
+                    include_hostname=include_hostname,
                     **kwargs,
                 )
             if response.status_code == HTTPStatus.UNAUTHORIZED and retries > 0:
@@ -86,6 +174,7 @@ class SyncRestClient(RestClient, ABC):
                     request,
                     retries - 1,
                     check_status=check_status,
+                    include_hostname=include_hostname,
                     **kwargs,
                 )
 
@@ -102,6 +191,7 @@ class SyncRestClient(RestClient, ABC):
         skip: int = 0,
         num_requests: int | None = None,
         sleep_time: int | None = None,
+        checkpoint: PaginationCheckpoint | None = None,
         **kwargs,
     ) -> list[dict]:
         """
@@ -115,18 +205,21 @@ class SyncRestClient(RestClient, ABC):
             retries: The number of retries to attempt in case of failure.
             skip: The number of items to skip. Defaults to 0.
             num_requests: The maximum number of requests to make. Defaults to None.
+            checkpoint: Persists every completed page, so a failed extraction
+                resumes from the last completed page. Defaults to None.
             **kwargs: Additional keyword arguments to pass to the endpoint function.
 
         Returns:
             A list of results from the paginated requests.
         """
-        results: list[dict] = []
-        skip_count = skip
+        checkpoint = checkpoint or PaginationCheckpoint()
+        checkpoint.resume(skip)
+
         while True:
-            if num_requests is not None and num_requests < len(results) + 1:
+            if num_requests is not None and num_requests < len(checkpoint.results) + 1:
                 break
 
-            request_url = endpoint_func(skip=skip_count, limit=limit, **kwargs)
+            request_url = endpoint_func(skip=checkpoint.skip, limit=limit, **kwargs)
             response = self.send_request(request_url, retries=retries)
             if response.status_code == HTTPStatus.NO_CONTENT:
                 break  # NOTE if no content is returned assume we are done
@@ -135,33 +228,86 @@ class SyncRestClient(RestClient, ABC):
             if break_condition(result):
                 break
 
-            results.append(result)
-            skip_count += limit
+            checkpoint.add(result, limit)
 
             if sleep_time is not None:
                 time.sleep(sleep_time)
-        return results
+
+        checkpoint.complete()
+        return checkpoint.results
 
 
 class AsyncRestClient(RestClient, ABC):
-    def __init__(self):
+    def __init__(
+        self,
+        cache: HttpCache | None = None,
+        credentials: CredentialProvider | None = None,
+        coalescer: RequestCoalescer | None = None,
+        limiter: AdaptiveLimiter | None = None,
+    ):
         self.client = AsyncClient(timeout=30.0)
+        self.cache = cache
+        self.credentials = credentials
+        self.coalescer = coalescer
+        self.limiter = limiter
+
+    async def get_credentials(self) -> Credentials:
+        if self.credentials is None:
+            return Credentials(self.headers)
+        return await self.credentials.get()
+
+    async def refresh_credentials(self, stale: Credentials) -> None:
+        """
+        Refresh after a 401, concurrent requests that failed with the same
+        credentials share a single refresh.
+        """
+        if self.credentials is None:
+            self.reset_headers_cache()
+        else:
+            await self.credentials.refresh(stale=stale)
 
     async def get_request(
         self,
         request: str,
         include_hostname: bool,
+        headers: dict[str, str] | None = None,
         **kwargs,
     ) -> httpx.Response:
         url = f"{self.hostname}{request}" if include_hostname else f"{request}"
 
+        cache_key = self.cache_key(url, kwargs.get("params"))
+        entry = self.cache_lookup(cache_key)
+        if (cached := self.fresh_cached_response(entry)) is not None:
+            return cached
+
+        fetch = partial(self.fetch, url, cache_key, entry, headers, **kwargs)
+        if self.coalescer is None:
+            return await fetch()
+        return await self.coalescer.run(
+            self.coalescer.key("GET", url, kwargs.get("params")), fetch
+        )
+
+    async def fetch(
+        self,
+        url: str,
+        cache_key: str,
+        entry: CacheEntry | None,
+        headers: dict[str, str] | None,
+        **kwargs,
+    ) -> httpx.Response:
+        send = partial(
+            self.http_get, url, self.request_headers(entry, headers), **kwargs
+        )
+        response = await (send() if self.limiter is None else self.limiter.run(send))
+        if response.status_code == HTTPStatus.REQUEST_TIMEOUT:
+            return response
+        return self.update_cache(cache_key, entry, response)
+
+    async def http_get(
+        self, url: str, headers: dict[str, str], **kwargs
+    ) -> httpx.Response:
         try:
-            return await self.client.get(
-                url,
-                headers=self.headers,
-                timeout=100,
-                **kwargs,
-            )
+            return await self.client.get(url, headers=headers, timeout=100, **kwargs)
         except httpx.TimeoutException:
             logger.warning("request timed out")
             return httpx.Response(HTTPStatus.REQUEST_TIMEOUT)
@@ -181,9 +327,11 @@ class AsyncRestClient(RestClient, ABC):
             kwargs=kwargs,
         ):
             logger.info("Sending request.")
+            credentials = await self.get_credentials()
             response = await self.get_request(
                 request,
                 include_hostname=include_hostname,
+                headers=credentials.headers,
                 **kwargs,
             )
             logger.info("Response received.")
@@ -193,14 +341,28 @@ class AsyncRestClient(RestClient, ABC):
                     request,
                     retries - 1,
                     check_status,
+                    include_hostname,
+                    **kwargs,
+                )
+            if response.status_code in THROTTLED and retries > 0:
+                # NOTE the wait holds no slot of the limiter
+                delay = self.retry_after(response)
+                logger.warning("Request throttled, retrying.", retry_after=delay)
+                await asyncio.sleep(delay)
+                return await self.send_request(
+                    request,
+                    retries - 1,
+                    check_status,
+                    include_hostname,
                     **kwargs,
                 )
             if response.status_code == HTTPStatus.UNAUTHORIZED and retries > 0:
-                self.reset_headers_cache()
+                await self.refresh_credentials(stale=credentials)
                 return await self.send_request(
                     request,
                     retries - 1,
                     check_status,
+                    include_hostname,
                     **kwargs,
                 )
             if check_status:
@@ -213,7 +375,8 @@ class AsyncRestClient(RestClient, ABC):
         tasks: list[list[Coroutine]],
     ) -> list[httpx.Response]:
         """
-        Execute a list of tasks in batches.
+        Execute a list of tasks in batches. With a limiter the requests in
+        flight are limited adaptively, so all tasks can be one batch.
 
         Args:
             tasks: A list of lists, where each sublist contains
@@ -1,10 +1,21 @@
 import pandas as pd
 from sqlalchemy import RowMapping
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlmodel import Session, SQLModel
 from structlog import get_logger
 
+from etl.flows.partitions import (
+    build_partition,
+    create_partitions,
+    partition_key,
+    swap_partition,
+)
 from etl.flows.utils import collect_validation_errors
+from etl.instrumentation import instrument
+from models.v1.etl_metadata import TableLoad
+from shared.materialized_views import refresh_materialized_views
+from shared.settings import settings
 
 logger = get_logger(__name__)
 
@@ -13,13 +24,12 @@ class SqlmodelLoader:
     def __init__(self, session: Session):
         self.session = session
 
+    @staticmethod
+    def table_name(model: type[SQLModel]) -> str:
+        return f"{model.__table_args__['schema']}.{model.__tablename__}"  # type: ignore
+
     def recreate_tables(self, models: list[type[SQLModel]]) -> None:
-        tables = [
-            SQLModel.metadata.tables[
-                f"{table.__table_args__['schema']}.{table.__tablename__}"
-            ]  # type: ignore
-            for table in models
-        ]
+        tables = [SQLModel.metadata.tables[self.table_name(table)] for table in models]
         logger.info(f"(Re) creating table: {tables}")
 
         bind = self.session.get_bind()
@@ -27,6 +37,7 @@ class SqlmodelLoader:
         SQLModel.metadata.drop_all(bind, tables=tables, checkfirst=True)
         SQLModel.metadata.create_all(bind, tables=tables, checkfirst=True)
 
+    @instrument("load", rows_from="objects")
     def recreate_and_load(
         self,
         tables_to_recreate: list[type[SQLModel]],
@@ -39,18 +50,97 @@ class SqlmodelLoader:
         logger.info(f"Loading {len(objects)} objects")
         try:
             self.recreate_tables(tables_to_recreate)
+            self.create_partitions(tables_to_recreate, objects)
             self.session.add_all(objects)
+            self.record_table_loads(tables_to_recreate)
+            self.session.commit()
+            logger.info("Transaction committed successfully.")
+            self.refresh_materialized_views(tables_to_recreate)
+
+        except SQLAlchemyError as e:
+            logger.error("Transaction failed, rolling back.", exc_info=e)
+            self.session.rollback()
+            raise e
+
+    def create_partitions(
+        self, models: list[type[SQLModel]], objects: list[SQLModel]
+    ) -> None:
+        """Create a partition for every value of the partition key in the objects"""
+        for model in models:
+            if (key := partition_key(model)) is None:
+                continue
+            values = {getattr(obj, key) for obj in objects if isinstance(obj, model)}
+            create_partitions(self.session.connection(), model.__table__, values)  # type: ignore
+
+    @instrument("load", rows_from="objects")
+    def replace_partition(
+        self,
+        model: type[SQLModel],
+        value: int | str,
+        objects: list[SQLModel],
+    ) -> None:
+        """
+        Replace the partition of a single value of the partition key, the
+        other partitions are left untouched. The new partition is built as a
+        separate table first, the parent table is only locked to swap it in.
+        """
+        if (key := partition_key(model)) is None:
+            msg = f"{model.__name__} is not a partitioned table."
+            raise ValueError(msg)
+
+        table = model.__table__  # type: ignore
+        rows = [obj.model_dump() for obj in objects]
+        logger.info(f"Replacing partition {key}={value} with {len(rows)} rows")
+        try:
+            connection = self.session.connection()
+            table.create(connection, checkfirst=True)
+            new = build_partition(connection, table, key, value, rows)
+            swap_partition(
+                connection, table, key, value, new, settings.PARTITION_LOCK_TIMEOUT
+            )
+            self.record_table_loads([model])
             self.session.commit()
             logger.info("Transaction committed successfully.")
+            self.refresh_materialized_views([model])
 
         except SQLAlchemyError as e:
             logger.error("Transaction failed, rolling back.", exc_info=e)
             self.session.rollback()
             raise e
 
+    def refresh_materialized_views(self, models: list[type[SQLModel]]) -> None:
+        """
+        Refresh the views on the loaded tables once the load is committed, a
+        concurrent refresh keeps the previous contents readable meanwhile.
+        """
+        tables = [model.__table__ for model in models]  # type: ignore
+        refresh_materialized_views(self.session.connection(), tables)
+        self.session.commit()
+
+    def record_table_loads(self, models: list[type[SQLModel]]) -> None:
+        """
+        Bump the version of the loaded tables in the same transaction, so
+        readers caching a table know to reload it.
+        """
+        TableLoad.__table__.create(self.session.get_bind(), checkfirst=True)  # type: ignore
+        for model in models:
+            statement = insert(TableLoad).values(
+                table_name=self.table_name(model), version=1
+            )
+            self.session.exec(
+                statement.on_conflict_do_update(
+                    index_elements=[TableLoad.table_name],
+                    set_={
+                        "version": TableLoad.version + 1,
+                        "loaded_at": statement.excluded.loaded_at,
+                    },
+                )
+            )
+
 
 class SqlmodelTransformer:
     @staticmethod
+    @instrument("transform")
     def transform(
         model_class: type[SQLModel], records: list[RowMapping]
     ) -> list[SQLModel]:
@@ -74,6 +164,7 @@ class SqlmodelTransformer:
 
 class DataframeTransformer:
     @staticmethod
+    @instrument("transform")
     def transform(model_class: type[SQLModel], df: pd.DataFrame) -> list[SQLModel]:
         logger.info(f"Transforming dataframe to objects of type {model_class.__name__}")
         objects = []
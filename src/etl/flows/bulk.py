@@ -0,0 +1,149 @@
+from collections.abc import Iterable, Mapping
+
+from pydantic import ValidationError
+from sqlalchemy import (
+    Column,
+    ColumnElement,
+    Connection,
+    ForeignKeyConstraint,
+    MetaData,
+    Table,
+    and_,
+    exists,
+    func,
+    insert,
+    select,
+)
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.schema import sort_tables
+from sqlmodel import SQLModel
+from structlog import get_logger
+
+from etl.flows.base import SqlmodelLoader
+from etl.instrumentation import span
+
+logger = get_logger(__name__)
+
+Rows = Iterable[list[dict]]
+
+
+class OrphanedRowsError(ValueError): ...
+
+
+def validate_rows(model_class: type[SQLModel], rows: list[dict]) -> list[dict]:
+    """Validate flat rows against the model, without building objects"""
+    valid = []
+    for row in rows:
+        try:
+            model_class.model_validate(row)
+        except ValidationError as err:
+            logger.error(f"Error validating {model_class.__name__}: {err}")
+            continue
+        valid.append(row)
+    return valid
+
+
+class BulkLoader(SqlmodelLoader):
+    """
+    Loads a group of related models as flat rows with core inserts, instead of
+    adding an object graph to the session. The tables are loaded in foreign
+    key order, rows of tables referencing other tables are staged in a
+    temporary table first and checked for orphans before they are inserted.
+    """
+
+    @staticmethod
+    def load_order(models: Iterable[type[SQLModel]]) -> list[type[SQLModel]]:
+        """The models ordered so referenced tables come before their children"""
+        by_table = {model.__table__: model for model in models}  # type: ignore
+        return [by_table[table] for table in sort_tables(by_table)]
+
+    def recreate_and_bulk_load(self, sources: Mapping[type[SQLModel], Rows]) -> None:
+        """
+        Args:
+            sources: The chunks of rows of every model, the chunks are read
+                and inserted one at a time.
+        """
+        models = self.load_order(sources)
+        try:
+            self.recreate_tables(models)
+            for model in models:
+                with span("load", self.table_name(model)) as current:
+                    current.rows = self.bulk_insert(model, sources[model])
+            self.record_table_loads(models)
+            self.session.commit()
+            logger.info("Transaction committed successfully.")
+            self.refresh_materialized_views(models)
+
+        except (SQLAlchemyError, OrphanedRowsError) as e:
+            logger.error("Transaction failed, rolling back.", exc_info=e)
+            self.session.rollback()
+            raise e
+
+    def bulk_insert(self, model: type[SQLModel], chunks: Rows) -> int:
+        table: Table = model.__table__  # type: ignore
+        connection = self.session.connection()
+        if not table.foreign_key_constraints:
+            return self.insert_chunks(connection, table, model, chunks)
+
+        staging = self.create_staging_table(connection, table)
+        count = self.insert_chunks(connection, staging, model, chunks)
+        self.check_foreign_keys(connection, table, staging)
+        connection.execute(
+            insert(table).from_select(
+                [column.name for column in staging.columns], select(staging)
+            )
+        )
+        return count
+
+    @staticmethod
+    def insert_chunks(
+        connection: Connection,
+        table: Table,
+        model: type[SQLModel],
+        chunks: Rows,
+    ) -> int:
+        count = 0
+        for chunk in chunks:
+            if rows := validate_rows(model, chunk):
+                connection.execute(insert(table), rows)
+                count += len(rows)
+        return count
+
+    @staticmethod
+    def create_staging_table(connection: Connection, table: Table) -> Table:
+        staging = Table(
+            f"staging_{table.name}",
+            MetaData(),
+            *(Column(column.name, column.type) for column in table.columns),
+            prefixes=["TEMPORARY"],
+            postgresql_on_commit="DROP",
+        )
+        staging.create(connection)
+        return staging
+
+    @staticmethod
+    def check_foreign_keys(
+        connection: Connection, table: Table, staging: Table
+    ) -> None:
+        """Set-based anti-join of the staged rows against the referenced tables"""
+        for constraint in table.foreign_key_constraints:
+            orphans = select(func.count()).where(
+                ~exists().where(foreign_key_matches(constraint, staging))
+            )
+            if count := connection.execute(orphans.select_from(staging)).scalar_one():
+                msg = (
+                    f"{count} rows of {table.fullname} reference a missing "
+                    f"{constraint.referred_table.fullname}"
+                )
+                raise OrphanedRowsError(msg)
+
+
+def foreign_key_matches(
+    constraint: ForeignKeyConstraint, staging: Table
+) -> ColumnElement[bool]:
+    return and_(
+        *(
+            element.column == staging.c[element.parent.name]
+            for element in constraint.elements
+        )
+    )
@@ -0,0 +1,75 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import pandas as pd
+from structlog import get_logger
+
+from etl.flows.bulk import BulkLoader
+from models.v1.buurt_gemeente import Buurt, Gemeente
+
+logger = get_logger(__name__)
+
+
+def read_csv_chunks(
+    path: Path,
+    columns: dict[str, str],
+    chunk_size: int,
+    encoding: str = "utf-8",
+) -> Iterator[list[dict]]:
+    """
+    Read the renamed columns of a csv as chunks of rows, so large files, e.g.
+    with WKT geometries, are never fully in memory.
+    """
+    with pd.read_csv(
+        path,
+        usecols=list(columns),
+        dtype=str,
+        encoding=encoding,
+        chunksize=chunk_size,
+    ) as reader:
+        for chunk in reader:
+            yield chunk.rename(columns=columns).to_dict("records")
+
+
+class GemeenteExtractor:
+    columns = {"GemeentecodeGM": "gm_code", "Gemeentenaam": "gm_naam"}
+
+    def __init__(self, path: Path, chunk_size: int = 10000):
+        self.path = path
+        self.chunk_size = chunk_size
+
+    def extract(self) -> Iterator[list[dict]]:
+        # NOTE the CBS gemeenten lists are latin-1 encoded
+        return read_csv_chunks(self.path, self.columns, self.chunk_size, "latin-1")
+
+
+class BuurtExtractor:
+    """
+    Reads buurten with WKT geometries, e.g. the buurten layer of the CBS wijk-
+    en buurtkaart exported with `ogr2ogr -f CSV -lco GEOMETRY=AS_WKT`.
+    """
+
+    columns = {"buurtcode": "bu_code", "gemeentecode": "gm_code", "WKT": "shape_wkt"}
+
+    def __init__(self, path: Path | None, chunk_size: int = 1000):
+        self.path = path
+        self.chunk_size = chunk_size
+
+    def extract(self) -> Iterator[list[dict]]:
+        if self.path is None:
+            logger.warning("No buurten file configured, loading no buurten.")
+            return iter(())
+        return read_csv_chunks(self.path, self.columns, self.chunk_size)
+
+
+def run_buurt_gemeente_flow(
+    gemeente_extractor: GemeenteExtractor,
+    buurt_extractor: BuurtExtractor,
+    loader: BulkLoader,
+):
+    loader.recreate_and_bulk_load(
+        {
+            Buurt: buurt_extractor.extract(),
+            Gemeente: gemeente_extractor.extract(),
+        }
+    )
@@ -1,34 +1,56 @@
 from datetime import date
+from pathlib import Path
 
 import pandas as pd
 from structlog import get_logger
 
 from etl.apis.cbs import CbsApi
 from etl.flows.base import SqlmodelLoader
+from etl.flows.fingerprints import FingerprintStore, fingerprint
+from etl.flows.snapshot import publish_snapshot
+from etl.flows.staging import ParquetStage
 from etl.flows.utils import collect_validation_errors
+from etl.instrumentation import instrument
+from models.v1 import cbs_aggregates  # noqa: F401, registers the views to refresh
 from models.v1.cbs_aantal_woningen import CbsAantalWoningen
 
 logger = get_logger(__name__)
 
 
 class CbsAantalWoningenExtractor:
-    def __init__(self, api: CbsApi | None = None):
+    raw_columns = ["RegioS", "Nieuwbouw_2"]
+
+    def __init__(
+        self,
+        api: CbsApi | None = None,
+        stage: ParquetStage | None = None,
+        replay: bool = False,
+    ):
         if api is None:
             api = CbsApi()
+        if replay and stage is None:
+            msg = "Replaying an extract requires a staging area to read from."
+            raise ValueError(msg)
         self.api = api
+        self.stage = stage
+        self.replay = replay
 
-    def extract(self) -> pd.DataFrame:
+    @staticmethod
+    def default_years() -> list[int]:
+        return list(range(date.today().year - 10, date.today().year + 1))
+
+    @instrument("extract")
+    def extract(self, years: list[int] | None = None) -> pd.DataFrame:
         """
         Create a dataframe of the amount of woningen gerealiseerd
-        per year per gemeente
+        per year per gemeente, for the last ten years by default
         """
 
         dfs = []
 
-        for year in range(date.today().year - 10, date.today().year + 1):
-            records = self.api.get_gerealiseerde_woningen_for_year(year)
-            if records:
-                df = pd.DataFrame(records)
+        for year in years or self.default_years():
+            df = self.extract_records(year)
+            if not df.empty:
                 df = df.rename(
                     columns={"RegioS": "gm_code", "Nieuwbouw_2": "aantal_woningen"},
                 )
@@ -44,9 +66,24 @@ class CbsAantalWoningenExtractor:
 
         return pd.concat(dfs).reset_index()
 
+    def extract_records(self, year: int) -> pd.DataFrame:
+        """
+        Get the raw records of a year from the CBS api, or from the staging
+        area when replaying. Records retrieved from the api are staged.
+        """
+        if self.replay and self.stage is not None:
+            return self.stage.read(columns=self.raw_columns, partitions=[year])
+
+        records = self.api.get_gerealiseerde_woningen_for_year(year)
+        if records and self.stage is not None:
+            self.stage.reset(year)
+            self.stage.write(records, year)
+        return pd.DataFrame(records)
+
 
 class CbsAantalWoningenTransformer:
     @staticmethod
+    @instrument("transform")
     def transform(df: pd.DataFrame) -> list[CbsAantalWoningen]:
         objects = []
         for _, row in df.iterrows():
@@ -64,12 +101,68 @@ class CbsAantalWoningenTransformer:
         return objects
 
 
+def extracted_years(df: pd.DataFrame) -> list[int]:
+    return [] if df.empty else sorted(df["jaar"].unique().tolist())
+
+
+def rows_of_year(df: pd.DataFrame, year: int) -> pd.DataFrame:
+    return df[df["jaar"] == year] if not df.empty else df
+
+
 def run_cbs_aantal_woningen_flow(
-    extractor: CbsAantalWoningenExtractor, loader: SqlmodelLoader
+    extractor: CbsAantalWoningenExtractor,
+    loader: SqlmodelLoader,
+    years: list[int] | None = None,
+    snapshot: Path | None = None,
+    force: bool = False,
 ):
-    df = extractor.extract()
-    objects = CbsAantalWoningenTransformer.transform(df)
-    loader.recreate_and_load([CbsAantalWoningen], objects)
+    """
+    Recreate the table with the last ten years, or only replace the
+    partitions of the given years, years without extracted rows are kept as
+    they are. The extract of every year is fingerprinted, years that did not
+    change since they were loaded are not transformed and loaded again,
+    unless forced. The loaded table is published as a snapshot for the API
+    when a snapshot path is given.
+    """
+    df = extractor.extract(years)
+    store = FingerprintStore(loader.session, loader.table_name(CbsAantalWoningen))
+    extracted = extracted_years(df)
+    if missing := sorted(set(years or []) - set(extracted)):
+        # NOTE an empty extract would replace the partition with an empty one
+        logger.warning("No rows extracted, keeping the loaded years.", years=missing)
+    fingerprints = {
+        year: fingerprint(rows_of_year(df, year))
+        for year in years or extracted
+        if year in extracted
+    }
+
+    if not years and (force or set(map(str, fingerprints)) != set(store.load())):
+        # NOTE years were added or dropped, or no fingerprints are stored yet
+        objects = CbsAantalWoningenTransformer.transform(df)
+        loader.recreate_and_load([CbsAantalWoningen], objects)
+        store.save(fingerprints, replace=True)
+    elif not replace_changed_years(df, loader, store, fingerprints, force):
+        logger.info("No changed years, skipping the load.")
+        return
+
+    if snapshot is not None:
+        publish_snapshot(loader.session, snapshot)
+
+
+def replace_changed_years(
+    df: pd.DataFrame,
+    loader: SqlmodelLoader,
+    store: FingerprintStore,
+    fingerprints: dict[int, str],
+    force: bool,
+) -> list[int]:
+    """Replace the partitions of the changed years, and return those years"""
+    changed = list(fingerprints) if force else store.changed(fingerprints)
+    for year in changed:
+        objects = CbsAantalWoningenTransformer.transform(rows_of_year(df, year))
+        loader.replace_partition(CbsAantalWoningen, year, objects)
+        store.save({year: fingerprints[year]})
+    return changed
 
 
 if __name__ == "__main__":
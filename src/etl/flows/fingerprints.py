@@ -0,0 +1,103 @@
+import hashlib
+from typing import TypeVar
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, delete, select
+from structlog import get_logger
+
+from models.v1.etl_metadata import PartitionFingerprint
+
+logger = get_logger(__name__)
+
+Partition = TypeVar("Partition", int, str)
+
+
+def normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """The columns in name order, numbers as floats and stripped strings"""
+    df = df[sorted(df.columns)]
+    return df.apply(
+        lambda column: (
+            column.astype("float64")
+            if pd.api.types.is_numeric_dtype(column)
+            else column.astype(str).str.strip()
+        )
+    )
+
+
+def fingerprint(df: pd.DataFrame) -> str:
+    """
+    A fingerprint of the rows independent of their order. The hashes of the
+    normalized rows are summed, so a changed, added or removed row changes
+    the fingerprint, but sorting the rows does not.
+    """
+    rows = normalize(df)
+    hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy(np.uint64)
+    digest = hashlib.sha256()
+    digest.update(",".join(map(str, rows.columns)).encode())
+    digest.update(len(rows).to_bytes(8, "little"))
+    digest.update(int(hashes.sum(dtype=np.uint64)).to_bytes(8, "little"))
+    return digest.hexdigest()
+
+
+class FingerprintStore:
+    """The fingerprints of the loaded partitions of a table"""
+
+    def __init__(self, session: Session, table_name: str):
+        self.session = session
+        self.table_name = table_name
+
+    def load(self) -> dict[str, str]:
+        PartitionFingerprint.__table__.create(self.session.get_bind(), checkfirst=True)  # type: ignore
+        rows = self.session.exec(
+            select(
+                PartitionFingerprint.partition, PartitionFingerprint.fingerprint
+            ).where(PartitionFingerprint.table_name == self.table_name)
+        )
+        return dict(rows.all())
+
+    def changed(self, fingerprints: dict[Partition, str]) -> list[Partition]:
+        """The partitions whose fingerprint differs from the loaded one"""
+        stored = self.load()
+        changed = [
+            value
+            for value, current in fingerprints.items()
+            if stored.get(str(value)) != current
+        ]
+        logger.info(
+            "Compared partition fingerprints.",
+            table=self.table_name,
+            partitions=len(fingerprints),
+            changed=len(changed),
+        )
+        return changed
+
+    def save(self, fingerprints: dict[Partition, str], replace: bool = False) -> None:
+        """
+        Store the fingerprints of the loaded partitions, after replacing the
+        whole table the fingerprints of the other partitions are removed.
+        """
+        if replace:
+            self.session.exec(
+                delete(PartitionFingerprint).where(
+                    col(PartitionFingerprint.table_name) == self.table_name
+                )
+            )
+        for value, current in fingerprints.items():
+            statement = insert(PartitionFingerprint).values(
+                table_name=self.table_name, partition=str(value), fingerprint=current
+            )
+            self.session.exec(
+                statement.on_conflict_do_update(
+                    index_elements=[
+                        PartitionFingerprint.table_name,
+                        PartitionFingerprint.partition,
+                    ],
+                    set_={
+                        "fingerprint": statement.excluded.fingerprint,
+                        "loaded_at": statement.excluded.loaded_at,
+                    },
+                )
+            )
+        self.session.commit()
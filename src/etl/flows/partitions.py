@@ -0,0 +1,146 @@
+import time
+from collections.abc import Iterable
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    MetaData,
+    Table,
+    column,
+    delete,
+    insert,
+    literal,
+    text,
+)
+from sqlalchemy import table as table_clause
+from sqlmodel import SQLModel
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+
+def partition_key(model: type[SQLModel]) -> str | None:
+    """The column a table is LIST partitioned by, set in the info of the table"""
+    return model.__table__.info.get("partition_key")  # type: ignore
+
+
+def sql_literal(value: int | str) -> str:
+    return str(literal(value).compile(compile_kwargs={"literal_binds": True}))
+
+
+def partition_name(table: Table, value: int | str) -> str:
+    return f"{table.name}_{value}"
+
+
+def qualified(table: Table, name: str) -> str:
+    return f'"{table.schema}"."{name}"' if table.schema else f'"{name}"'
+
+
+def partition_exists(connection: Connection, table: Table, name: str) -> bool:
+    return (
+        connection.execute(
+            text("SELECT to_regclass(:name)"), {"name": qualified(table, name)}
+        ).scalar_one()
+        is not None
+    )
+
+
+def create_partitions(
+    connection: Connection, table: Table, values: Iterable[int | str]
+) -> None:
+    for value in sorted(set(values)):
+        name = partition_name(table, value)
+        connection.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {qualified(table, name)} "
+                f"PARTITION OF {qualified(table, table.name)} "
+                f"FOR VALUES IN ({sql_literal(value)})"
+            )
+        )
+
+
+def build_partition(
+    connection: Connection,
+    table: Table,
+    key: str,
+    value: int | str,
+    rows: list[dict],
+) -> str:
+    """
+    Build the new partition as a standalone table, with the primary key index
+    and a check constraint matching the partition bound, so attaching it
+    needs neither an index build nor a validation scan.
+    """
+    name = f"{partition_name(table, value)}_new"
+    connection.execute(text(f"DROP TABLE IF EXISTS {qualified(table, name)}"))
+    connection.execute(
+        text(
+            f"CREATE TABLE {qualified(table, name)} "
+            f"(LIKE {qualified(table, table.name)} INCLUDING DEFAULTS)"
+        )
+    )
+    staging = Table(
+        name,
+        MetaData(),
+        *(Column(column.name, column.type) for column in table.columns),
+        schema=table.schema,
+    )
+    if rows:
+        connection.execute(insert(staging), rows)
+
+    primary_key = ", ".join(f'"{column.name}"' for column in table.primary_key)
+    connection.execute(
+        text(
+            f"ALTER TABLE {qualified(table, name)} "
+            f'ADD CONSTRAINT "{partition_name(table, value)}_bound" '
+            f'CHECK ("{key}" IS NOT NULL AND "{key}" = {sql_literal(value)}), '
+            f'ADD CONSTRAINT "{name}_pkey" PRIMARY KEY ({primary_key})'
+        )
+    )
+    return name
+
+
+def swap_partition(  # noqa: PLR0913
+    connection: Connection,
+    table: Table,
+    key: str,
+    value: int | str,
+    new: str,
+    lock_timeout: str,
+) -> None:
+    """
+    Swap the new partition in place of the old one. Only this short sequence
+    of catalog changes holds the lock on the parent table, it gives up after
+    `lock_timeout` instead of queueing behind long running queries.
+    """
+    start = time.perf_counter()
+    parent = qualified(table, table.name)
+    name = partition_name(table, value)
+    connection.execute(text(f"SET LOCAL lock_timeout = {sql_literal(lock_timeout)}"))
+    if partition_exists(connection, table, name):
+        connection.execute(
+            text(f"ALTER TABLE {parent} DETACH PARTITION {qualified(table, name)}")
+        )
+        connection.execute(text(f"DROP TABLE {qualified(table, name)}"))
+    default = f"{table.name}_default"
+    if partition_exists(connection, table, default):
+        default_partition = table_clause(default, column(key), schema=table.schema)
+        connection.execute(
+            delete(default_partition).where(default_partition.c[key] == value)
+        )
+    connection.execute(text(f'ALTER TABLE {qualified(table, new)} RENAME TO "{name}"'))
+    connection.execute(
+        text(f'ALTER INDEX {qualified(table, f"{new}_pkey")} RENAME TO "{name}_pkey"')
+    )
+    connection.execute(
+        text(
+            f"ALTER TABLE {parent} ATTACH PARTITION {qualified(table, name)} "
+            f"FOR VALUES IN ({sql_literal(value)})"
+        )
+    )
+    logger.info(
+        "Partition swapped.",
+        table=table.fullname,
+        partition=name,
+        duration_s=round(time.perf_counter() - start, 4),
+    )
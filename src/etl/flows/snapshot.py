@@ -0,0 +1,31 @@
+from pathlib import Path
+
+from sqlmodel import Session, select
+from structlog import get_logger
+
+from etl.flows.base import SqlmodelLoader
+from models.v1.cbs_aantal_woningen import CbsAantalWoningen
+from models.v1.etl_metadata import TableLoad
+from shared.snapshot import snapshot_arrays, write_snapshot
+
+logger = get_logger(__name__)
+
+
+def publish_snapshot(session: Session, path: Path) -> None:
+    """
+    Publish the committed aantal woningen as a snapshot for the API workers,
+    stamped with the version of the table load.
+    """
+    rows = session.exec(
+        select(
+            CbsAantalWoningen.gm_code,
+            CbsAantalWoningen.jaar,
+            CbsAantalWoningen.aantal_woningen,
+        )
+    ).all()
+    table_load = session.get(TableLoad, SqlmodelLoader.table_name(CbsAantalWoningen))
+    version = table_load.version if table_load is not None else 0
+
+    gm_codes, jaren, values = zip(*rows, strict=True) if rows else ((), (), ())
+    write_snapshot(path, version, *snapshot_arrays(gm_codes, jaren, values))
+    logger.info("Snapshot published.", path=str(path), rows=len(rows), version=version)
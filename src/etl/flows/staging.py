@@ -0,0 +1,87 @@
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+
+class ParquetStage:
+    """
+    Raw layer for extracted records, stored as a hive partitioned parquet dataset
+
+    <root>/<dataset>/<partition_key>=<value>/part-<n>.parquet
+
+    Every extract batch is written as a new part of its partition, so a
+    transform or load can be replayed from disk without calling the source api.
+    """
+
+    def __init__(self, root: Path, dataset: str, partition_key: str = "year"):
+        self.path = Path(root) / dataset
+        self.partition_key = partition_key
+
+    def partition_path(self, value: int) -> Path:
+        return self.path / f"{self.partition_key}={value}"
+
+    def partitions(self) -> list[int]:
+        if not self.path.exists():
+            return []
+        return sorted(
+            int(path.name.split("=", 1)[1])
+            for path in self.path.glob(f"{self.partition_key}=*")
+            if any(path.glob("*.parquet"))
+        )
+
+    def reset(self, value: int) -> None:
+        """Remove the staged parts of a partition before it is extracted again"""
+        shutil.rmtree(self.partition_path(value), ignore_errors=True)
+
+    def write(self, records: list[dict] | pd.DataFrame, value: int) -> Path:
+        partition_path = self.partition_path(value)
+        partition_path.mkdir(parents=True, exist_ok=True)
+        part_number = len(list(partition_path.glob("part-*.parquet")))
+        part_path = partition_path / f"part-{part_number}.parquet"
+
+        table = (
+            pa.Table.from_pandas(records, preserve_index=False)
+            if isinstance(records, pd.DataFrame)
+            else pa.Table.from_pylist(records)
+        )
+        # hidden files are ignored by the dataset reader, so a partially
+        # written part is never read
+        tmp_path = partition_path / f".{part_path.name}.tmp"
+        pq.write_table(table, tmp_path)
+        tmp_path.replace(part_path)
+
+        logger.info(f"Staged {table.num_rows} records to {part_path}")
+        return part_path
+
+    def read(
+        self,
+        columns: list[str] | None = None,
+        partitions: list[int] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Read the staged records memory mapped, only the requested columns and
+        partitions are read from disk.
+        """
+        if not self.partitions():
+            return pd.DataFrame(columns=columns)
+
+        dataset = ds.dataset(
+            str(self.path.resolve()),
+            format="parquet",
+            partitioning="hive",
+            filesystem=fs.LocalFileSystem(use_mmap=True),
+        )
+        partition_filter = (
+            ds.field(self.partition_key).isin(partitions)
+            if partitions is not None
+            else None
+        )
+        return dataset.to_table(columns=columns, filter=partition_filter).to_pandas()
@@ -0,0 +1,153 @@
+import cProfile
+import inspect
+import io
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from enum import StrEnum
+from functools import wraps
+from pathlib import Path
+from typing import Any
+
+from structlog import get_logger
+from structlog.contextvars import bound_contextvars
+
+from shared.settings import settings
+
+logger = get_logger(__name__)
+
+
+class ProfileMode(StrEnum):
+    CPU = "cpu"
+    MEMORY = "memory"
+
+
+@dataclass
+class Span:
+    stage: str
+    name: str
+    rows: int | None = None
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the process, ru_maxrss is in bytes on macOS"""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / 1024**2 if sys.platform == "darwin" else max_rss / 1024
+
+
+@contextmanager
+def span(stage: str, name: str) -> Iterator[Span]:
+    """
+    Time a stage of a flow, the number of rows processed can be set on the
+    yielded span to include the throughput.
+    """
+    current = Span(stage, name)
+    start = time.perf_counter()
+    status = "failed"
+    try:
+        with bound_contextvars(stage=stage):
+            yield current
+        status = "succeeded"
+    finally:
+        duration = time.perf_counter() - start
+        logger.info(
+            f"Stage {status}.",
+            stage=stage,
+            name=name,
+            duration_s=round(duration, 4),
+            rows=current.rows,
+            rows_per_sec=(
+                round(current.rows / duration, 1)
+                if current.rows is not None and duration > 0
+                else None
+            ),
+            peak_rss_mb=round(peak_rss_mb(), 1),
+        )
+
+
+def count_rows(value: Any) -> int | None:
+    return len(value) if hasattr(value, "__len__") else None
+
+
+def instrument(stage: str, rows_from: str | None = None) -> Callable:
+    """
+    Wrap an extract, transform or load method in a span. The rows are counted
+    from the return value, or from the argument named `rows_from`.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs) -> Any:
+            with span(stage, func.__qualname__) as current:
+                if rows_from is not None:
+                    arguments = signature.bind(*args, **kwargs).arguments
+                    current.rows = count_rows(arguments[rows_from])
+                result = func(*args, **kwargs)
+                if rows_from is None:
+                    current.rows = count_rows(result)
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def cpu_profile(name: str, output_dir: Path, top: int) -> Iterator[None]:
+    """Profile the current thread with cProfile, the stats are dumped to disk"""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        path = output_dir / f"{name}-{datetime.now():%Y%m%dT%H%M%S}.prof"
+        profiler.dump_stats(path)
+
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(top)
+        logger.info("CPU profile written.", path=str(path), stats=stream.getvalue())
+
+
+@contextmanager
+def memory_profile(name: str, top: int) -> Iterator[None]:
+    """Trace allocations with tracemalloc and log the lines allocating the most"""
+    tracemalloc.start()
+    try:
+        yield
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        logger.info(
+            "Memory profile.",
+            name=name,
+            peak_traced_mb=round(peak / 1024**2, 1),
+            top=[str(stat) for stat in snapshot.statistics("lineno")[:top]],
+        )
+
+
+@contextmanager
+def profiled(
+    mode: ProfileMode | None,
+    name: str,
+    output_dir: Path | None = None,
+    top: int = 25,
+) -> Iterator[None]:
+    if mode == ProfileMode.CPU:
+        with cpu_profile(name, output_dir or settings.PROFILE_DIR, top):
+            yield
+    elif mode == ProfileMode.MEMORY:
+        with memory_profile(name, top):
+            yield
+    else:
+        yield
@@ -0,0 +1,311 @@
+import os
+import socket
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass
+from datetime import timedelta
+from uuid import uuid4
+
+from sqlalchemy import Connection, Engine, and_, func, or_, select, update
+from sqlmodel import Session, col
+from structlog import get_logger
+from structlog.contextvars import bound_contextvars
+
+from models.v1.etl_metadata import EtlJob, JobStatus
+from shared.engine import get_session
+from shared.settings import settings
+
+logger = get_logger(__name__)
+
+# NOTE the first key of the two key advisory locks, the second is the hash of
+# the name of the table or partition
+LOCK_NAMESPACE = 0x45544C
+
+
+class TablesLockedError(Exception): ...
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+
+def lock_names(targets: Sequence[str], partition: str | None) -> list[tuple[str, bool]]:
+    """The names to lock and whether the lock is shared"""
+    if partition is None:
+        return [(target, False) for target in targets]
+    return [(target, True) for target in targets] + [
+        (f"{target}/{partition}", False) for target in targets
+    ]
+
+
+def try_lock(connection: Connection, name: str, shared: bool) -> bool:
+    lock = func.pg_try_advisory_lock_shared if shared else func.pg_try_advisory_lock
+    return connection.execute(
+        select(lock(LOCK_NAMESPACE, func.hashtext(name)))
+    ).scalar_one()
+
+
+class JobQueue:
+    """
+    A queue of ETL jobs in Postgres, no broker needed. Workers claim the
+    oldest claimable job with `FOR UPDATE SKIP LOCKED`, so concurrent workers
+    never wait for, or claim, the same job. A claimed job is leased, a job
+    whose lease expired because its worker died is claimed again.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        worker_id: str | None = None,
+        lease_seconds: float = settings.JOB_LEASE_SECONDS,
+        retry_delay: float = settings.JOB_RETRY_DELAY_SECONDS,
+    ):
+        self.engine = engine
+        self.worker_id = worker_id or default_worker_id()
+        self.lease = timedelta(seconds=lease_seconds)
+        self.retry_delay = retry_delay
+
+    def create_table(self) -> None:
+        EtlJob.__table__.create(self.engine, checkfirst=True)  # type: ignore
+
+    def enqueue(
+        self,
+        flow: str,
+        partition: str | None = None,
+        params: dict | None = None,
+        max_attempts: int = settings.JOB_MAX_ATTEMPTS,
+    ) -> EtlJob:
+        job = EtlJob(
+            flow=flow,
+            partition=partition,
+            params=params or {},
+            max_attempts=max_attempts,
+        )
+        with Session(self.engine, expire_on_commit=False) as session:
+            session.add(job)
+            session.commit()
+        logger.info("Job queued.", job_id=job.id, flow=flow, partition=partition)
+        return job
+
+    def claim(self) -> EtlJob | None:
+        claimable = (
+            select(col(EtlJob.id))
+            .where(
+                or_(
+                    and_(
+                        col(EtlJob.status) == JobStatus.PENDING,
+                        col(EtlJob.run_after) <= func.now(),
+                    ),
+                    and_(
+                        col(EtlJob.status) == JobStatus.RUNNING,
+                        col(EtlJob.lease_expires_at) < func.now(),
+                    ),
+                )
+            )
+            .order_by(col(EtlJob.run_after), col(EtlJob.id))
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        statement = (
+            update(EtlJob)
+            .where(col(EtlJob.id) == claimable)
+            .values(
+                status=JobStatus.RUNNING,
+                attempts=EtlJob.attempts + 1,
+                leased_by=self.worker_id,
+                lease_expires_at=func.now() + self.lease,
+                heartbeat_at=func.now(),
+            )
+            .returning(EtlJob)
+            .execution_options(synchronize_session=False)
+        )
+        with Session(self.engine, expire_on_commit=False) as session:
+            job = session.scalars(statement).one_or_none()
+            session.commit()
+        return job
+
+    def update_leased(self, job: EtlJob, **values) -> bool:
+        """Update the job, only while this worker still holds its lease"""
+        statement = (
+            update(EtlJob)
+            .where(
+                col(EtlJob.id) == job.id,
+                col(EtlJob.leased_by) == self.worker_id,
+                col(EtlJob.status) == JobStatus.RUNNING,
+            )
+            .values(**values)
+        )
+        with Session(self.engine) as session:
+            updated = session.exec(statement).rowcount
+            session.commit()
+        return updated == 1
+
+    def heartbeat(self, job: EtlJob) -> bool:
+        return self.update_leased(
+            job, heartbeat_at=func.now(), lease_expires_at=func.now() + self.lease
+        )
+
+    def complete(self, job: EtlJob) -> bool:
+        return self.update_leased(
+            job,
+            status=JobStatus.SUCCEEDED,
+            leased_by=None,
+            lease_expires_at=None,
+            error=None,
+            finished_at=func.now(),
+        )
+
+    def fail(self, job: EtlJob, error: str) -> bool:
+        """Retry with an exponential backoff, until the attempts are exhausted"""
+        if job.attempts >= job.max_attempts:
+            return self.update_leased(
+                job,
+                status=JobStatus.FAILED,
+                leased_by=None,
+                lease_expires_at=None,
+                error=error,
+                finished_at=func.now(),
+            )
+        delay = timedelta(seconds=self.retry_delay * 2 ** (job.attempts - 1))
+        return self.update_leased(
+            job,
+            status=JobStatus.PENDING,
+            leased_by=None,
+            lease_expires_at=None,
+            error=error,
+            run_after=func.now() + delay,
+        )
+
+    def defer(self, job: EtlJob, delay: float) -> bool:
+        """Put the job back without counting the attempt"""
+        return self.update_leased(
+            job,
+            status=JobStatus.PENDING,
+            attempts=EtlJob.attempts - 1,
+            leased_by=None,
+            lease_expires_at=None,
+            run_after=func.now() + timedelta(seconds=delay),
+        )
+
+    @contextmanager
+    def heartbeats(self, job: EtlJob, interval: float) -> Iterator[None]:
+        """Renew the lease of the job in a background thread"""
+        stop = threading.Event()
+
+        def beat() -> None:
+            while not stop.wait(interval):
+                if not self.heartbeat(job):
+                    logger.warning("Lease of the job lost.", job_id=job.id)
+                    return
+
+        thread = threading.Thread(target=beat, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    @contextmanager
+    def table_locks(
+        self, targets: Sequence[str], partition: str | None
+    ) -> Iterator[bool]:
+        """
+        Try to lock the target tables of a job, on a connection of its own
+        for the duration of the job. A job of a whole table locks the table,
+        jobs of a partition share the lock of the table and lock their
+        partition, so the partitions of a table load in parallel.
+        """
+        with self.engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as connection:
+            try:
+                yield all(
+                    try_lock(connection, name, shared)
+                    for name, shared in lock_names(targets, partition)
+                )
+            finally:
+                connection.execute(select(func.pg_advisory_unlock_all()))
+
+
+@dataclass(frozen=True)
+class JobFlow:
+    run: Callable[[Session, dict], None]
+    targets: tuple[str, ...]
+
+
+class Worker:
+    """
+    Claims jobs from the queue and runs their flow with the params of the
+    job. A job of which the target tables are locked by a job of another
+    worker is deferred, a failed job is retried by any worker later on.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        flows: Mapping[str, JobFlow],
+        session_factory: Callable[[], AbstractContextManager[Session]] = get_session,
+        heartbeat_interval: float = settings.JOB_HEARTBEAT_SECONDS,
+        locked_delay: float = settings.JOB_LOCKED_DELAY_SECONDS,
+    ):
+        self.queue = queue
+        self.flows = flows
+        self.session_factory = session_factory
+        self.heartbeat_interval = heartbeat_interval
+        self.locked_delay = locked_delay
+
+    def run(
+        self, max_jobs: int | None = None, poll_interval: float | None = None
+    ) -> int:
+        """
+        Run jobs until `max_jobs` were claimed, polling the queue every
+        `poll_interval` seconds when it is empty, or stopping without one.
+        """
+        claimed = 0
+        while max_jobs is None or claimed < max_jobs:
+            if (job := self.queue.claim()) is not None:
+                claimed += 1
+                self.execute(job)
+            elif poll_interval is None:
+                break
+            else:
+                time.sleep(poll_interval)
+        return claimed
+
+    def execute(self, job: EtlJob) -> None:
+        with bound_contextvars(job_id=job.id, flow=job.flow, partition=job.partition):
+            flow = self.flows.get(job.flow)
+            if flow is None or job.attempts > job.max_attempts:
+                error = "Unknown flow" if flow is None else "Lease expired too often"
+                logger.error("Job cannot run.", error=error)
+                job.attempts = job.max_attempts
+                self.queue.fail(job, error)
+                return
+
+            with self.queue.table_locks(flow.targets, job.partition) as locked:
+                if not locked:
+                    logger.info("Target tables locked by another job, deferring.")
+                    self.queue.defer(job, self.locked_delay)
+                    return
+                self.run_flow(job, flow)
+
+    def run_flow(self, job: EtlJob, flow: JobFlow) -> None:
+        logger.info("Starting job.", attempt=job.attempts)
+        start = time.perf_counter()
+        try:
+            with (
+                self.queue.heartbeats(job, self.heartbeat_interval),
+                self.session_factory() as session,
+            ):
+                flow.run(session, job.params)
+        except Exception as err:
+            logger.exception("Job failed.")
+            self.queue.fail(job, repr(err))
+            return
+
+        self.queue.complete(job)
+        logger.info("Job succeeded.", duration=round(time.perf_counter() - start, 3))
@@ -1,26 +1,345 @@
+"""
+The flows, their dependencies and the database engine are imported by the
+commands that use them, so starting the CLI and `--help` stay fast.
+"""
+
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict
+from enum import StrEnum
+from functools import partial
+from typing import TYPE_CHECKING, Annotated
+
 import typer
+from structlog import get_logger
 
-from etl.flows.base import SqlmodelLoader
-from etl.flows.cbs_aantal_woningen import (
-    CbsAantalWoningenExtractor,
-    run_cbs_aantal_woningen_flow,
-)
-from shared.engine import get_session
+from etl.instrumentation import ProfileMode, profiled
 from shared.log import setup_structlog
 from shared.settings import settings
 
+if TYPE_CHECKING:
+    from sqlmodel import Session
+
+    from etl.apis.http_cache import HttpCache
+    from etl.jobs import JobFlow
+    from etl.runner import FlowSpec
+
 app = typer.Typer()
 
 setup_structlog(settings.LOG_LEVEL)
+logger = get_logger(__name__)
+
+HttpCacheOption = Annotated[
+    bool,
+    typer.Option(help="Cache CBS responses on disk and revalidate them on reruns."),
+]
+
+StageOption = Annotated[
+    bool,
+    typer.Option(help="Write the raw extracted records to the parquet staging area."),
+]
+ReplayOption = Annotated[
+    bool,
+    typer.Option(help="Read the raw records from the staging area instead of CBS."),
+]
+MaxWorkersOption = Annotated[
+    int, typer.Option(help="The maximum number of flows that run concurrently.")
+]
+FailFastOption = Annotated[
+    bool,
+    typer.Option(help="Stop starting new flows as soon as one of the flows fails."),
+]
+YearOption = Annotated[
+    list[int] | None,
+    typer.Option(
+        "--year",
+        help="Only reload the partitions of these years, the other years are "
+        "left untouched.",
+    ),
+]
+ForceOption = Annotated[
+    bool,
+    typer.Option(help="Load every year, also the years that did not change."),
+]
+MaxJobsOption = Annotated[
+    int | None, typer.Option(help="Stop after claiming this many jobs.")
+]
+UntilEmptyOption = Annotated[
+    bool,
+    typer.Option(help="Stop when the queue is empty, instead of polling it."),
+]
+MaxAttemptsOption = Annotated[
+    int, typer.Option(help="Give up on a job after this many failed attempts.")
+]
+ProfileOption = Annotated[
+    ProfileMode | None,
+    typer.Option(
+        help="Dump a cProfile of every flow, or log the top allocations "
+        "traced by tracemalloc."
+    ),
+]
+
+
+def get_http_cache(enabled: bool) -> "HttpCache | None":
+    from etl.apis.http_cache import HttpCache
+
+    if not enabled:
+        return None
+    return HttpCache(
+        settings.HTTP_CACHE_DIR,
+        max_bytes=settings.HTTP_CACHE_MAX_BYTES,
+        ttl=settings.HTTP_CACHE_TTL_SECONDS,
+    )
+
+
+def cbs_aantal_woningen_flow(  # noqa: PLR0913
+    session: "Session",
+    cache: "HttpCache | None" = None,
+    stage: bool = False,
+    replay: bool = False,
+    years: list[int] | None = None,
+    force: bool = False,
+):
+    from etl.apis.cbs import CbsApi
+    from etl.apis.rest_client import SyncRestClient
+    from etl.flows.base import SqlmodelLoader
+    from etl.flows.cbs_aantal_woningen import (
+        CbsAantalWoningenExtractor,
+        run_cbs_aantal_woningen_flow,
+    )
+    from etl.flows.staging import ParquetStage
+
+    extractor = CbsAantalWoningenExtractor(
+        CbsApi(SyncRestClient(cache=cache)),
+        stage=(
+            ParquetStage(settings.STAGING_DIR, "cbs_aantal_woningen")
+            if stage or replay
+            else None
+        ),
+        replay=replay,
+    )
+    run_cbs_aantal_woningen_flow(
+        extractor, SqlmodelLoader(session), years, settings.SNAPSHOT_PATH, force
+    )
+
+
+def buurt_gemeente_flow(session: "Session"):
+    from etl.flows.bulk import BulkLoader
+    from etl.flows.buurt_gemeente import (
+        BuurtExtractor,
+        GemeenteExtractor,
+        run_buurt_gemeente_flow,
+    )
+
+    run_buurt_gemeente_flow(
+        GemeenteExtractor(settings.GEMEENTEN_CSV),
+        BuurtExtractor(settings.BUURTEN_CSV),
+        BulkLoader(session),
+    )
+
+
+class JobFlowName(StrEnum):
+    CBS_GEREALISEERDE_WONINGEN = "cbs-gerealiseerde-woningen"
+    BUURT_GEMEENTE = "buurt-gemeente"
+
+
+def run_locked(
+    flow: JobFlowName, run: Callable[["Session"], None], session: "Session"
+) -> None:
+    with table_locks(flow):
+        run(session)
+
+
+def get_flows(cache: "HttpCache | None", force: bool = False) -> list["FlowSpec"]:
+    """
+    All flows with the flows they depend on, e.g. flows loading tables that
+    reference other tables through a foreign key depend on the flows loading
+    those tables. The flows take the table locks of their jobs.
+    """
+    from etl.runner import FlowSpec
+
+    # NOTE there is no edge yet: gemeente and buurt, the only tables with a
+    # foreign key between them, are loaded in one flow, and the CBS table
+    # references neither, so both flows start right away
+    flows: dict[JobFlowName, Callable[[Session], None]] = {
+        JobFlowName.CBS_GEREALISEERDE_WONINGEN: partial(
+            cbs_aantal_woningen_flow, cache=cache, force=force
+        ),
+        JobFlowName.BUURT_GEMEENTE: buurt_gemeente_flow,
+    }
+    return [
+        FlowSpec(name, partial(run_locked, name, run)) for name, run in flows.items()
+    ]
+
+
+def cbs_aantal_woningen_job(
+    session: "Session", params: dict, cache: "HttpCache | None" = None
+):
+    cbs_aantal_woningen_flow(
+        session, cache, years=params.get("years"), force=params.get("force", False)
+    )
+
+
+def buurt_gemeente_job(session: "Session", params: dict):  # noqa: ARG001
+    buurt_gemeente_flow(session)
+
+
+def get_job_flows(cache: "HttpCache | None") -> dict[str, "JobFlow"]:
+    """The flows the workers run, with the tables they load"""
+    from etl.jobs import JobFlow
+    from models.v1.buurt_gemeente import Buurt, Gemeente
+    from models.v1.cbs_aantal_woningen import CbsAantalWoningen
+
+    return {
+        JobFlowName.CBS_GEREALISEERDE_WONINGEN: JobFlow(
+            partial(cbs_aantal_woningen_job, cache=cache),
+            (CbsAantalWoningen.__table__.fullname,),  # type: ignore
+        ),
+        JobFlowName.BUURT_GEMEENTE: JobFlow(
+            buurt_gemeente_job,
+            (Gemeente.__table__.fullname, Buurt.__table__.fullname),  # type: ignore
+        ),
+    }
+
+
+@contextmanager
+def table_locks(flow: JobFlowName, years: list[int] | None = None) -> Iterator[None]:
+    """
+    Lock the tables of a flow that runs outside the queue like a job of the
+    flow, so it never loads the tables of a job that is running
+    """
+    from etl.jobs import JobQueue, TablesLockedError
+    from shared.engine import get_engine
+
+    queue = JobQueue(get_engine())
+    targets = get_job_flows(None)[flow].targets
+    partitions = [str(year) for year in years] if years else [None]
+    with ExitStack() as stack:
+        for partition in partitions:
+            if not stack.enter_context(queue.table_locks(targets, partition)):
+                msg = f"The tables of {flow} are locked by another job"
+                raise TablesLockedError(msg)
+        yield
+
+
+@contextmanager
+def exit_when_locked() -> Iterator[None]:
+    from etl.jobs import TablesLockedError
+
+    try:
+        yield
+    except TablesLockedError as err:
+        logger.error("Target tables locked by another job.", error=str(err))
+        raise typer.Exit(code=1) from err
+
+
+@app.command()
+def cbs_gerealiseerde_woningen(  # noqa: PLR0913
+    http_cache: HttpCacheOption = True,
+    stage: StageOption = False,
+    replay: ReplayOption = False,
+    year: YearOption = None,
+    force: ForceOption = False,
+    profile: ProfileOption = None,
+):
+    from shared.engine import get_session
+
+    cache = get_http_cache(http_cache)
+    with (
+        exit_when_locked(),
+        table_locks(JobFlowName.CBS_GEREALISEERDE_WONINGEN, year),
+        profiled(profile, "cbs-gerealiseerde-woningen"),
+        get_session() as session,
+    ):
+        cbs_aantal_woningen_flow(session, cache, stage, replay, year, force)
+    if cache is not None:
+        logger.info("HTTP cache stats.", **asdict(cache.stats))
+
+
+@app.command()
+def buurt_gemeente(profile: ProfileOption = None):
+    """Load the gemeenten, and the buurten of the BUURTEN_CSV setting."""
+    from shared.engine import get_session
+
+    with (
+        exit_when_locked(),
+        table_locks(JobFlowName.BUURT_GEMEENTE),
+        profiled(profile, "buurt-gemeente"),
+        get_session() as session,
+    ):
+        buurt_gemeente_flow(session)
 
 
 @app.command()
-def cbs_gerealiseerde_woningen():
-    with get_session() as session:
-        run_cbs_aantal_woningen_flow(
-            CbsAantalWoningenExtractor(), SqlmodelLoader(session)
+def run_all(
+    http_cache: HttpCacheOption = True,
+    max_workers: MaxWorkersOption = 4,
+    fail_fast: FailFastOption = True,
+    force: ForceOption = False,
+    profile: ProfileOption = None,
+):
+    """Run all flows, independent flows run concurrently."""
+    from etl.runner import FlowRunner, FlowStatus, format_summary
+
+    cache = get_http_cache(http_cache)
+    runner = FlowRunner(
+        get_flows(cache, force),
+        max_workers,
+        fail_fast,
+        cpu_profile=profile == ProfileMode.CPU,
+    )
+    with profiled(profile if profile == ProfileMode.MEMORY else None, "run-all"):
+        results = runner.run()
+
+    typer.echo(format_summary(results))
+    if cache is not None:
+        logger.info("HTTP cache stats.", **asdict(cache.stats))
+    if any(result.status != FlowStatus.SUCCEEDED for result in results):
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def enqueue(
+    flow: JobFlowName,
+    year: YearOption = None,
+    force: ForceOption = False,
+    max_attempts: MaxAttemptsOption = settings.JOB_MAX_ATTEMPTS,
+):
+    """Queue a flow for the workers, a job per year when years are given."""
+    from etl.jobs import JobQueue
+    from shared.engine import get_engine
+
+    queue = JobQueue(get_engine())
+    queue.create_table()
+    partitions: list[int | None] = [*year] if year else [None]
+    for partition in partitions:
+        queue.enqueue(
+            flow,
+            partition=None if partition is None else str(partition),
+            params={"force": force}
+            | ({} if partition is None else {"years": [partition]}),
+            max_attempts=max_attempts,
         )
 
 
+@app.command()
+def worker(
+    http_cache: HttpCacheOption = True,
+    max_jobs: MaxJobsOption = None,
+    until_empty: UntilEmptyOption = False,
+):
+    """Run the queued jobs, any number of workers can run on any number of nodes."""
+    from etl.jobs import JobQueue, Worker
+    from shared.engine import get_engine
+
+    queue = JobQueue(get_engine())
+    queue.create_table()
+    cache = get_http_cache(http_cache)
+    claimed = Worker(queue, get_job_flows(cache)).run(
+        max_jobs, None if until_empty else settings.JOB_POLL_SECONDS
+    )
+    logger.info("Worker stopped.", worker_id=queue.worker_id, claimed=claimed)
+
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,151 @@
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from enum import StrEnum
+from graphlib import CycleError, TopologicalSorter
+
+from sqlmodel import Session
+from structlog import get_logger
+from structlog.contextvars import bound_contextvars
+
+from etl.instrumentation import ProfileMode, profiled
+from shared.engine import get_session
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class FlowSpec:
+    name: str
+    run: Callable[[Session], None]
+    depends_on: tuple[str, ...] = ()
+
+
+class FlowStatus(StrEnum):
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+
+@dataclass
+class FlowResult:
+    name: str
+    status: FlowStatus
+    duration: float = 0.0
+    error: str | None = None
+
+
+class FlowRunner:
+    """
+    Runs flows concurrently in a thread pool, a flow is started as soon as all
+    the flows it depends on have succeeded. Every flow gets its own session.
+
+    When a flow fails its dependants are skipped, with `fail_fast` no new flows
+    are started at all. Flows that are already running are always finished.
+
+    cProfile only profiles the thread it is enabled in, so with `cpu_profile`
+    every flow is profiled separately.
+    """
+
+    def __init__(
+        self,
+        flows: list[FlowSpec],
+        max_workers: int = 4,
+        fail_fast: bool = True,
+        session_factory: Callable[[], AbstractContextManager[Session]] = get_session,
+        cpu_profile: bool = False,
+    ):
+        self.flows = {flow.name: flow for flow in flows}
+        self.max_workers = max_workers
+        self.fail_fast = fail_fast
+        self.session_factory = session_factory
+        self.cpu_profile = cpu_profile
+        self.validate()
+
+    @property
+    def graph(self) -> dict[str, tuple[str, ...]]:
+        return {name: flow.depends_on for name, flow in self.flows.items()}
+
+    def validate(self) -> None:
+        for flow in self.flows.values():
+            if unknown := set(flow.depends_on) - self.flows.keys():
+                msg = f"Flow {flow.name} depends on unknown flows: {sorted(unknown)}"
+                raise ValueError(msg)
+        try:
+            TopologicalSorter(self.graph).prepare()
+        except CycleError as err:
+            msg = f"Flow dependencies contain a cycle: {err.args[1]}"
+            raise ValueError(msg) from err
+
+    def run(self) -> list[FlowResult]:
+        sorter = TopologicalSorter(self.graph)
+        sorter.prepare()
+        results: dict[str, FlowResult] = {}
+        running: dict[Future, str] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while sorter.is_active():
+                for name in sorter.get_ready():
+                    if self.should_skip(name, results):
+                        results[name] = FlowResult(name, FlowStatus.SKIPPED)
+                        sorter.done(name)
+                    else:
+                        running[pool.submit(self.run_flow, self.flows[name])] = name
+
+                for future in self.wait_for_any(running):
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    sorter.done(name)
+
+        return [results[name] for name in self.flows]
+
+    def should_skip(self, name: str, results: dict[str, FlowResult]) -> bool:
+        if self.fail_fast and any(
+            result.status == FlowStatus.FAILED for result in results.values()
+        ):
+            return True
+        return any(
+            results[dependency].status != FlowStatus.SUCCEEDED
+            for dependency in self.flows[name].depends_on
+        )
+
+    @staticmethod
+    def wait_for_any(running: dict[Future, str]) -> Iterator[Future]:
+        if running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            yield from done
+
+    def run_flow(self, flow: FlowSpec) -> FlowResult:
+        with bound_contextvars(flow=flow.name):
+            logger.info("Starting flow.")
+            start = time.perf_counter()
+            try:
+                with (
+                    profiled(ProfileMode.CPU if self.cpu_profile else None, flow.name),
+                    self.session_factory() as session,
+                ):
+                    flow.run(session)
+            except Exception as err:
+                logger.exception("Flow failed.")
+                return FlowResult(
+                    flow.name,
+                    FlowStatus.FAILED,
+                    time.perf_counter() - start,
+                    error=repr(err),
+                )
+
+            duration = time.perf_counter() - start
+            logger.info("Flow succeeded.", duration=round(duration, 3))
+            return FlowResult(flow.name, FlowStatus.SUCCEEDED, duration)
+
+
+def format_summary(results: list[FlowResult]) -> str:
+    lines = [f"{'flow':<30} {'status':<10} {'duration':>10}"]
+    lines += [
+        f"{result.name:<30} {result.status:<10} {result.duration:>9.2f}s"
+        + (f"  {result.error}" if result.error else "")
+        for result in results
+    ]
+    return "\n".join(lines)
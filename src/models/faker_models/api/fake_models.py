@@ -0,0 +1,19 @@
+from datetime import date
+
+from factory import DictFactory, LazyAttribute
+from factory import Faker as FactoryFaker
+from factory.fuzzy import FuzzyInteger
+
+
+class CbsGerealiseerdeWoningenRecordFactory(DictFactory):
+    """A record of the CBS 81955NED TypedDataSet, as returned by the OData api"""
+
+    class Params:
+        jaar = date.today().year - 1
+        maand = FactoryFaker("random_int", min=1, max=12)
+        random_code = FactoryFaker("random_number", digits=4, fix_len=True)
+
+    Gebruiksfunctie = "A045364"
+    Perioden = LazyAttribute(lambda x: f"{x.jaar}MM{x.maand:02}")
+    RegioS = LazyAttribute(lambda x: f"GM{x.random_code}")
+    Nieuwbouw_2 = FuzzyInteger(0, 500)
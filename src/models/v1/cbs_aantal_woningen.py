@@ -1,12 +1,30 @@
+from sqlalchemy import DDL, event
 from sqlmodel import Field, SQLModel
 
 from shared.constants import source
 
 
 class CbsAantalWoningen(SQLModel, table=True):  # type: ignore
+    """Partitioned by jaar, every year that is loaded gets its own partition"""
+
     __tablename__ = "cbs_aantal_woningen"
-    __table_args__ = {"schema": source}
+    __table_args__ = {
+        "schema": source,
+        "postgresql_partition_by": "LIST (jaar)",
+        "info": {"partition_key": "jaar"},
+    }
 
     gm_code: str = Field(primary_key=True)
     jaar: int = Field(primary_key=True)
     aantal_woningen: float
+
+
+# NOTE rows of years without a partition end up in the default partition
+event.listen(
+    CbsAantalWoningen.__table__,  # type: ignore
+    "after_create",
+    DDL(
+        f"CREATE TABLE {source}.cbs_aantal_woningen_default "
+        f"PARTITION OF {source}.cbs_aantal_woningen DEFAULT"
+    ),
+)
@@ -0,0 +1,77 @@
+from sqlalchemy import func, select
+from sqlmodel import Field, SQLModel
+
+from models.v1.cbs_aantal_woningen import CbsAantalWoningen
+from shared.constants import source
+from shared.materialized_views import MaterializedView, register_materialized_view
+
+woningen = CbsAantalWoningen.__table__.c  # type: ignore
+vorig_jaar = func.lag(woningen.aantal_woningen).over(
+    partition_by=woningen.gm_code, order_by=woningen.jaar
+)
+
+
+class CbsAantalWoningenTrend(SQLModel, table=True):  # type: ignore
+    """
+    Materialized view of the aantal woningen per gemeente per jaar, with the
+    growth compared to the previous year and the national rank of the year.
+    """
+
+    __tablename__ = "cbs_aantal_woningen_trend"
+    __table_args__ = {"schema": source}
+
+    gm_code: str = Field(primary_key=True)
+    jaar: int = Field(primary_key=True)
+    aantal_woningen: float
+    cumulatief_aantal_woningen: float
+    groei: float | None
+    rang: int
+
+
+class CbsAantalWoningenPerJaar(SQLModel, table=True):  # type: ignore
+    """Materialized view of the national totals per jaar"""
+
+    __tablename__ = "cbs_aantal_woningen_per_jaar"
+    __table_args__ = {"schema": source}
+
+    jaar: int = Field(primary_key=True)
+    totaal_aantal_woningen: float
+    gemiddeld_aantal_woningen: float
+    aantal_gemeenten: int
+
+
+register_materialized_view(
+    MaterializedView(
+        CbsAantalWoningenTrend,
+        select(
+            woningen.gm_code,
+            woningen.jaar,
+            woningen.aantal_woningen,
+            func.sum(woningen.aantal_woningen)
+            .over(partition_by=woningen.gm_code, order_by=woningen.jaar)
+            .label("cumulatief_aantal_woningen"),
+            (
+                (woningen.aantal_woningen - vorig_jaar) / func.nullif(vorig_jaar, 0)
+            ).label("groei"),
+            func.rank()
+            .over(partition_by=woningen.jaar, order_by=woningen.aantal_woningen.desc())
+            .label("rang"),
+        ),
+        source=CbsAantalWoningen.__table__,  # type: ignore
+        unique_columns=["gm_code", "jaar"],
+    )
+)
+
+register_materialized_view(
+    MaterializedView(
+        CbsAantalWoningenPerJaar,
+        select(
+            woningen.jaar,
+            func.sum(woningen.aantal_woningen).label("totaal_aantal_woningen"),
+            func.avg(woningen.aantal_woningen).label("gemiddeld_aantal_woningen"),
+            func.count().label("aantal_gemeenten"),
+        ).group_by(woningen.jaar),
+        source=CbsAantalWoningen.__table__,  # type: ignore
+        unique_columns=["jaar"],
+    )
+)
@@ -0,0 +1,76 @@
+from datetime import UTC, datetime
+from enum import StrEnum
+
+from sqlalchemy import Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import DateTime, Field, SQLModel
+
+from shared.constants import source
+
+
+class TableLoad(SQLModel, table=True):  # type: ignore
+    """The version of a table, bumped by every load of the ETL"""
+
+    __tablename__ = "table_load"
+    __table_args__ = {"schema": source}
+
+    table_name: str = Field(primary_key=True)
+    version: int = 0
+    loaded_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True)
+    )
+
+
+class PartitionFingerprint(SQLModel, table=True):  # type: ignore
+    """The content fingerprint of the extract of a partition that was loaded"""
+
+    __tablename__ = "partition_fingerprint"
+    __table_args__ = {"schema": source}
+
+    table_name: str = Field(primary_key=True)
+    partition: str = Field(primary_key=True)
+    fingerprint: str
+    loaded_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True)
+    )
+
+
+class JobStatus(StrEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class EtlJob(SQLModel, table=True):  # type: ignore
+    """
+    A flow, or a partition of a flow, queued for the ETL workers. A worker
+    holds a running job for as long as it renews its lease with heartbeats.
+    """
+
+    __tablename__ = "etl_job"
+    __table_args__ = (
+        Index("etl_job_claimable", "status", "run_after", "id"),
+        {"schema": source},
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    flow: str
+    partition: str | None = None
+    params: dict = Field(default_factory=dict, sa_type=JSONB)
+    status: str = JobStatus.PENDING
+    attempts: int = 0
+    max_attempts: int = 3
+    run_after: datetime = Field(
+        default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True)
+    )
+    leased_by: str | None = None
+    lease_expires_at: datetime | None = Field(
+        default=None, sa_type=DateTime(timezone=True)
+    )
+    heartbeat_at: datetime | None = Field(default=None, sa_type=DateTime(timezone=True))
+    error: str | None = None
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC), sa_type=DateTime(timezone=True)
+    )
+    finished_at: datetime | None = Field(default=None, sa_type=DateTime(timezone=True))
@@ -1,22 +1,57 @@
-from collections.abc import Iterator
+import math
+import time
+from collections.abc import Iterator, Sequence
 from contextlib import contextmanager
 from functools import lru_cache
+from itertools import count
 
-from sqlalchemy import Engine
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.schema import CreateSchema
 from sqlmodel import Session, create_engine
+from structlog import get_logger
 
 # # NOTE: https://sqlmodel.tiangolo.com/tutorial/create-db-and-table/?h=metadata#sqlmodel-metadata-order-matters
 from models import v1  # noqa: F401
 from shared.constants import source
 from shared.settings import settings
 
+logger = get_logger(__name__)
+
+PRIMARY = "primary"
+
+
+def engine_urls() -> dict[str, str]:
+    """The database URLs by engine name, the primary and the read replicas"""
+    return {PRIMARY: settings.database_url} | {
+        f"replica_{number}": url for number, url in enumerate(settings.replica_urls)
+    }
+
+
+def connect_args(name: str = PRIMARY) -> dict:
+    args: dict = {}
+    if settings.POSTGRES_DRIVER == "psycopg":
+        args["prepare_threshold"] = settings.POSTGRES_PREPARE_THRESHOLD
+    if name != PRIMARY:
+        args["connect_timeout"] = settings.REPLICA_CONNECT_TIMEOUT_SECONDS
+    return args
+
+
+def get_engine(testing: bool = False, name: str = PRIMARY) -> Engine:
+    """
+    One engine, and so one pool, per database. `lru_cache` keys on how the
+    arguments are passed, `get_engine()` and `get_engine(testing=False)`
+    would each create an engine, so the arguments are normalized first.
+    """
+    return cached_engine(testing, name)
+
 
 @lru_cache
-def get_engine(testing: bool = False) -> Engine:
+def cached_engine(testing: bool, name: str) -> Engine:
     if testing:
         engine = create_engine(
-            f"postgresql+psycopg2://postgres:postgres@{settings.POSTGRES_HOST}:8888/postgres"
+            f"postgresql+{settings.POSTGRES_DRIVER}://postgres:postgres@{settings.POSTGRES_HOST}:8888/postgres",
+            connect_args=connect_args(),
         )
 
         schema_names = [source]
@@ -26,7 +61,68 @@ def get_engine(testing: bool = False) -> Engine:
                 session.commit()
 
         return engine
-    return create_engine(str(settings.database_url))
+    return create_engine(engine_urls()[name], connect_args=connect_args(name))
+
+
+def is_reachable(engine: Engine) -> bool:
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except DBAPIError:
+        return False
+    return True
+
+
+class ReplicaRouter:
+    """
+    Picks the engine for read-only sessions, round-robin over the replicas
+    that passed their last health check. The health of a replica is checked
+    at most once per interval, when no replica is healthy the reads fall
+    back to the primary.
+    """
+
+    def __init__(
+        self,
+        primary: Engine,
+        replicas: Sequence[Engine],
+        health_check_interval: float = settings.REPLICA_HEALTH_CHECK_SECONDS,
+    ):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.health_check_interval = health_check_interval
+        self.turns = count()
+        self.health: dict[Engine, tuple[float, bool]] = {}
+
+    def is_healthy(self, replica: Engine) -> bool:
+        checked_at, healthy = self.health.get(replica, (-math.inf, False))
+        if time.monotonic() - checked_at < self.health_check_interval:
+            return healthy
+
+        healthy = is_reachable(replica)
+        self.health[replica] = (time.monotonic(), healthy)
+        if not healthy:
+            logger.warning("Replica unreachable.", replica=replica.url.host)
+        return healthy
+
+    def engines(self) -> list[Engine]:
+        """The primary and the healthy replicas"""
+        return [self.primary, *filter(self.is_healthy, self.replicas)]
+
+    def engine(self) -> Engine:
+        start = next(self.turns)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if self.is_healthy(replica):
+                return replica
+        return self.primary
+
+
+@lru_cache
+def get_replica_router() -> ReplicaRouter:
+    return ReplicaRouter(
+        get_engine(),
+        [get_engine(name=name) for name in engine_urls() if name != PRIMARY],
+    )
 
 
 def get_sessions() -> Iterator[Session]:
@@ -38,6 +134,15 @@ def get_sessions() -> Iterator[Session]:
         yield session
 
 
+def get_read_sessions() -> Iterator[Session]:
+    """
+    Used for FastAPI, provides a read-only session on a replica for the
+    request lifecycle, or on the primary when no replica is available.
+    """
+    with Session(get_replica_router().engine()) as session:
+        yield session
+
+
 @contextmanager
 def get_session(testing: bool = False) -> Iterator[Session]:
     """
@@ -0,0 +1,91 @@
+from dataclasses import dataclass, field
+
+from sqlalchemy import Connection, Select, Table, event, text
+from sqlalchemy.dialects import postgresql
+from sqlmodel import SQLModel
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class MaterializedView:
+    """
+    A materialized view mapped to a SQLModel, for reading it like a table. The
+    view is not part of the metadata, it is created after and dropped before
+    the source table it is defined on.
+    """
+
+    model: type[SQLModel]
+    query: Select
+    source: Table
+    unique_columns: list[str] = field(default_factory=list)
+
+    @property
+    def table(self) -> Table:
+        return self.model.__table__  # type: ignore
+
+    @property
+    def name(self) -> str:
+        return f'"{self.table.schema}"."{self.table.name}"'
+
+    def create(self, connection: Connection) -> None:
+        query = self.query.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+        connection.execute(
+            text(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {self.name} AS {query}")
+        )
+        # NOTE a unique index is required to refresh concurrently
+        columns = ", ".join(f'"{column}"' for column in self.unique_columns)
+        connection.execute(
+            text(
+                f'CREATE UNIQUE INDEX IF NOT EXISTS "{self.table.name}_key" '
+                f"ON {self.name} ({columns})"
+            )
+        )
+
+    def drop(self, connection: Connection) -> None:
+        connection.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {self.name}"))
+
+    def is_populated(self, connection: Connection) -> bool:
+        return bool(
+            connection.execute(
+                text(
+                    "SELECT ispopulated FROM pg_matviews "
+                    "WHERE schemaname = :schema AND matviewname = :name"
+                ),
+                {"schema": self.table.schema, "name": self.table.name},
+            ).scalar_one_or_none()
+        )
+
+    def refresh(self, connection: Connection) -> None:
+        """
+        Refresh without blocking readers, a view that was never populated can
+        only be refreshed in full.
+        """
+        concurrently = "CONCURRENTLY " if self.is_populated(connection) else ""
+        connection.execute(text(f"REFRESH MATERIALIZED VIEW {concurrently}{self.name}"))
+        logger.info("Materialized view refreshed.", view=self.table.fullname)
+
+
+MATERIALIZED_VIEWS: list[MaterializedView] = []
+
+
+def register_materialized_view(view: MaterializedView) -> MaterializedView:
+    SQLModel.metadata.remove(view.table)
+    event.listen(
+        view.source, "after_create", lambda _, connection, **__: view.create(connection)
+    )
+    event.listen(
+        view.source, "before_drop", lambda _, connection, **__: view.drop(connection)
+    )
+    MATERIALIZED_VIEWS.append(view)
+    return view
+
+
+def refresh_materialized_views(connection: Connection, sources: list[Table]) -> None:
+    """Refresh the views defined on any of the source tables"""
+    for view in MATERIALIZED_VIEWS:
+        if view.source in sources:
+            view.refresh(connection)
@@ -1,4 +1,6 @@
 import logging
+from pathlib import Path
+from typing import Literal
 
 from pydantic import computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -27,24 +29,89 @@ class Settings(BaseSettings):
     PANDAS_DISPLAY_MAX_COLUMNS: int = 30
     PANDAS_DISPLAY_WIDTH: int = 1000
 
+    POSTGRES_DRIVER: Literal["psycopg2", "psycopg"] = "psycopg2"
+    # psycopg prepares a statement server-side after this many executions on a
+    # connection, None disables server-side prepared statements
+    POSTGRES_PREPARE_THRESHOLD: int | None = 5
     POSTGRES_HOST: str = "localhost"
     POSTGRES_PORT: int = 9999
     POSTGRES_TEST_PORT: int = 8888
     POSTGRES_DB: str = "postgres"
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str = "postgres"
+    # "host:port" of the read replicas of the database, e.g. '["localhost:9998"]'
+    POSTGRES_REPLICA_HOSTS: list[str] = []
+    REPLICA_HEALTH_CHECK_SECONDS: float = 10.0
+    REPLICA_CONNECT_TIMEOUT_SECONDS: int = 2
 
     ENVIRONMENT: str = "tst"
 
+    SPATIAL_INDEX_REFRESH_SECONDS: float = 30.0
+    SPATIAL_LOOKUP_MAX_POINTS: int = 10000
+    EXPORT_BATCH_SIZE: int = 5000
+    # the snapshot of the aantal woningen the ETL publishes for the API workers
+    SNAPSHOT_PATH: Path | None = Path("data/snapshots/cbs_aantal_woningen.bin")
+    SNAPSHOT_CHECK_SECONDS: float = 1.0
+    # the statement_timeout and lock_timeout of the API queries, the routes
+    # are overridden by the name of the route, e.g. '{"export_table": "5min"}'
+    STATEMENT_TIMEOUT: str = "5s"
+    LOCK_TIMEOUT: str = "1s"
+    ROUTE_STATEMENT_TIMEOUTS: dict[str, str] = {
+        "export_table": "5min",
+        "locate_buurt": "1min",
+        "locate_buurten": "1min",
+    }
+    ROUTE_LOCK_TIMEOUTS: dict[str, str] = {}
+    # how often a request checks whether its client disconnected
+    DISCONNECT_CHECK_SECONDS: float = 0.1
+    # connections of every engine opened and primed before the API is ready
+    WARMUP_CONNECTIONS: int = 5
+    WARMUP_RETRY_SECONDS: float = 5.0
+    # the API is not ready while the database answers slower than this
+    READY_MAX_LATENCY_SECONDS: float = 0.25
+
+    # ETL Settings
+    CBS_ODATA_URL: str = "https://opendata.cbs.nl/ODataApi/odata"
+    HTTP_CACHE_DIR: Path = Path(".cache/http")
+    HTTP_CACHE_MAX_BYTES: int = 512 * 1024**2
+    HTTP_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    STAGING_DIR: Path = Path("data/staging")
+    PROFILE_DIR: Path = Path("data/profiles")
+    GEMEENTEN_CSV: Path = Path("src/etl/temp_data/gemeenten-alfabetisch-2025.csv")
+    BUURTEN_CSV: Path | None = None
+    PARTITION_LOCK_TIMEOUT: str = "2s"
+    # the wait before retrying a 429 or 503 without a Retry-After, and the
+    # longest Retry-After that is honored
+    RETRY_AFTER_DEFAULT_SECONDS: float = 1.0
+    RETRY_AFTER_MAX_SECONDS: float = 60.0
+    # the job queue of the ETL workers, a job whose lease is not renewed by
+    # heartbeats is claimed again by another worker
+    JOB_LEASE_SECONDS: float = 300.0
+    JOB_HEARTBEAT_SECONDS: float = 30.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_DELAY_SECONDS: float = 60.0
+    JOB_LOCKED_DELAY_SECONDS: float = 10.0
+    JOB_POLL_SECONDS: float = 5.0
+
     @computed_field  # type: ignore[misc]
     @property
     def database_url(self) -> str:
         """Database URL for the application."""
         return (
-            f"postgresql+psycopg2://{self.POSTGRES_USER}:"
+            f"postgresql+{self.POSTGRES_DRIVER}://{self.POSTGRES_USER}:"
             f"{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:"
             f"{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
 
+    @computed_field  # type: ignore[misc]
+    @property
+    def replica_urls(self) -> list[str]:
+        """Database URLs of the read replicas, the API reads from these."""
+        return [
+            f"postgresql+{self.POSTGRES_DRIVER}://{self.POSTGRES_USER}:"
+            f"{self.POSTGRES_PASSWORD}@{host}/{self.POSTGRES_DB}"
+            for host in self.POSTGRES_REPLICA_HOSTS
+        ]
+
 
 settings = Settings()
@@ -0,0 +1,115 @@
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"CBSWON01"
+# magic, version, number of gm codes, number of years, width of the gm codes
+HEADER = struct.Struct("<8sQIII4x")
+ALIGNMENT = 8
+
+
+class SnapshotError(ValueError): ...
+
+
+def aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def layout(n_keys: int, n_years: int, width: int) -> tuple[int, int, int]:
+    """The offsets of the years, the gm codes and the values in the file"""
+    years_at = HEADER.size
+    keys_at = aligned(years_at + n_years * 4)
+    values_at = aligned(keys_at + n_keys * width)
+    return years_at, keys_at, values_at
+
+
+def snapshot_arrays(
+    gm_codes: Sequence[str], jaren: Sequence[int], values: Sequence[float]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The sorted gm codes and years, and the values as a gm code by year
+    matrix, NaN where a gemeente has no value for a year.
+    """
+    keys, key_index = np.unique(
+        np.array(gm_codes, dtype=np.bytes_), return_inverse=True
+    )
+    years, year_index = np.unique(np.array(jaren, dtype="<i4"), return_inverse=True)
+    matrix = np.full((len(keys), len(years)), np.nan, dtype="<f8")
+    matrix[key_index, year_index] = values
+    return keys, years, matrix
+
+
+def write_snapshot(
+    path: Path, version: int, keys: np.ndarray, years: np.ndarray, values: np.ndarray
+) -> None:
+    """
+    Write the snapshot next to the path and rename it in place, so readers
+    see either the previous or the new snapshot, never a partial one.
+    """
+    width = max(keys.dtype.itemsize, 1)
+    years_at, keys_at, values_at = layout(len(keys), len(years), width)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as file:
+        temporary = Path(file.name)
+        try:
+            file.write(HEADER.pack(MAGIC, version, len(keys), len(years), width))
+            for offset, array in (
+                (years_at, years.astype("<i4")),
+                (keys_at, keys.astype(f"S{width}")),
+                (values_at, values.astype("<f8")),
+            ):
+                file.seek(offset)
+                file.write(array.tobytes())
+            file.flush()
+            os.fsync(file.fileno())
+        except BaseException:
+            temporary.unlink()
+            raise
+    temporary.chmod(0o644)
+    temporary.replace(path)
+
+
+class Snapshot:
+    """
+    Read-only memory map of a snapshot, the arrays are views on the mapped
+    file, so the pages are shared by all processes reading the snapshot.
+    """
+
+    def __init__(self, path: Path):
+        with path.open("rb") as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.version, n_keys, n_years, width = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC:
+            msg = f"{path} is not a snapshot."
+            raise SnapshotError(msg)
+
+        years_at, keys_at, values_at = layout(n_keys, n_years, width)
+        self.width = width
+        self.years = np.frombuffer(self.buffer, "<i4", n_years, years_at)
+        self.keys = np.frombuffer(self.buffer, f"S{width}", n_keys, keys_at)
+        self.values = np.frombuffer(
+            self.buffer, "<f8", n_keys * n_years, values_at
+        ).reshape(n_keys, n_years)
+
+    @staticmethod
+    def find(array: np.ndarray, value: bytes | int) -> int | None:
+        index = int(np.searchsorted(array, value))
+        if index < len(array) and array[index] == value:
+            return index
+        return None
+
+    def get(self, gm_code: str, jaar: int) -> float | None:
+        """The value of a gemeente in a year, by binary search on both axes"""
+        key = gm_code.encode()
+        if len(key) > self.width:
+            return None
+        row, column = self.find(self.keys, key), self.find(self.years, jaar)
+        if row is None or column is None:
+            return None
+        value = self.values[row, column]
+        return None if np.isnan(value) else float(value)
@@ -1,8 +1,12 @@
 import pytest
-from sqlmodel import Session
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel
 
 from app.api.routes.cbs_aantal_woningen import CrudCbs
+from etl.flows.base import SqlmodelLoader
 from models.faker_models.db.fake_models import CbsAantalWoningenFactory
+from models.v1.cbs_aantal_woningen import CbsAantalWoningen
+from shared.materialized_views import refresh_materialized_views
 
 
 @pytest.mark.docker
@@ -21,3 +25,44 @@ def test_get_aantal_woningen_alternative_version(session: Session, gm_code: str)
     cbs = CbsAantalWoningenFactory(gm_code=gm_code)
 
     assert CrudCbs(session, gm_code).get_aantal_woningen(jaar=cbs.jaar) == 9749.4
+
+
+@pytest.mark.docker
+def test_get_aantal_woningen_should_prune_partitions(session: Session, gm_code: str):
+    loader = SqlmodelLoader(session)
+    for jaar in (2023, 2024):
+        loader.replace_partition(
+            CbsAantalWoningen,
+            jaar,
+            [CbsAantalWoningen(gm_code=gm_code, jaar=jaar, aantal_woningen=1)],
+        )
+    crud = CrudCbs(session, gm_code)
+    query = crud.aantal_woningen_query(2024)
+
+    plan = "\n".join(
+        session.execute(
+            text(f"EXPLAIN {query.compile(compile_kwargs={'literal_binds': True})}")
+        ).scalars()
+    )
+
+    assert "cbs_aantal_woningen_2024" in plan
+    assert "cbs_aantal_woningen_2023" not in plan
+
+
+@pytest.mark.docker
+def test_get_trend(session: Session, gm_code: str):
+    for jaar, aantal_woningen in ((2022, 100), (2023, 150), (2024, 120)):
+        CbsAantalWoningenFactory(
+            gm_code=gm_code, jaar=jaar, aantal_woningen=aantal_woningen
+        )
+    CbsAantalWoningenFactory(gm_code="GM0001", jaar=2023, aantal_woningen=50)
+    refresh_materialized_views(
+        session.connection(), [SQLModel.metadata.tables["source.cbs_aantal_woningen"]]
+    )
+
+    trend = CrudCbs(session, gm_code).get_trend(van=2023)
+
+    assert [(row.jaar, row.groei, totaal) for row, totaal in trend] == [
+        (2023, 0.5, 200),
+        (2024, -0.2, 120),
+    ]
@@ -0,0 +1,54 @@
+from collections.abc import Iterator
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.api.deps import spatial_index_provider
+from app.constants import BUURT
+from models.faker_models.db.fake_models import BuurtFactory, GemeenteFactory
+
+
+@pytest.mark.docker
+class TestLocateBuurt:
+    endpoint = f"/{BUURT}/locate"
+
+    @pytest.fixture(autouse=True)
+    def _create_buurten(self, client: TestClient) -> Iterator[None]:
+        spatial_index_provider.invalidate()
+        GemeenteFactory(gm_code="GM0001")
+        BuurtFactory(
+            bu_code="BU0001",
+            gm_code="GM0001",
+            shape_wkt="POLYGON ((0 0, 10 0, 10 10, 0 10, 0 0))",
+        )
+        BuurtFactory(
+            bu_code="BU0002",
+            gm_code="GM0001",
+            shape_wkt="POLYGON ((10 0, 20 0, 20 10, 10 10, 10 0))",
+        )
+        yield
+        spatial_index_provider.invalidate()
+
+    def test_should_locate_point(self, client: TestClient):
+        response = client.get(self.endpoint, params={"x": 15, "y": 5})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"bu_code": "BU0002", "gm_code": "GM0001"}
+
+    def test_should_return_not_found_outside_buurten(self, client: TestClient):
+        response = client.get(self.endpoint, params={"x": 50, "y": 5})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_should_locate_batch_of_points(self, client: TestClient):
+        response = client.post(
+            self.endpoint, json={"points": [[5, 5], [50, 5], [15, 5]]}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [
+            {"bu_code": "BU0001", "gm_code": "GM0001"},
+            None,
+            {"bu_code": "BU0002", "gm_code": "GM0001"},
+        ]
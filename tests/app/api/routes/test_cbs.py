@@ -1,10 +1,16 @@
+from pathlib import Path
+
 import pytest
-from fastapi import status
+from fastapi import FastAPI, status
 from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel
 
+from app.api.deps import get_snapshot
 from app.constants import CBS
 from models.faker_models.db.fake_models import CbsAantalWoningenFactory
+from shared.materialized_views import refresh_materialized_views
 from shared.settings import settings
+from shared.snapshot import Snapshot, snapshot_arrays, write_snapshot
 
 
 class TestCbsAantalWoningen:
@@ -33,3 +39,47 @@ class TestCbsAantalWoningen:
         content = response.json()
 
         assert content == cbs.aantal_woningen
+
+    @pytest.mark.docker
+    def test_should_get_aantal_woningen_from_snapshot(
+        self,
+        app: FastAPI,
+        client: TestClient,
+        gm_code: str,
+        current_year: int,
+        tmp_path: Path,
+    ) -> None:
+        path = tmp_path / "cbs_aantal_woningen.bin"
+        arrays = snapshot_arrays([gm_code], [current_year - 1], [42.0])
+        write_snapshot(path, 1, *arrays)
+        app.dependency_overrides[get_snapshot] = lambda: Snapshot(path)
+
+        response = client.get(self.endpoint(gm_code))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == 42.0
+
+    @pytest.mark.docker
+    def test_should_get_aantal_woningen_trend(
+        self, client: TestClient, session: Session, gm_code: str
+    ) -> None:
+        for jaar in (2023, 2024):
+            CbsAantalWoningenFactory(gm_code=gm_code, jaar=jaar, aantal_woningen=10)
+        refresh_materialized_views(
+            session.connection(),
+            [SQLModel.metadata.tables["source.cbs_aantal_woningen"]],
+        )
+
+        response = client.get(f"{self.endpoint(gm_code)}/trend", params={"tot": 2023})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [
+            {
+                "jaar": 2023,
+                "aantal_woningen": 10,
+                "cumulatief_aantal_woningen": 10,
+                "groei": None,
+                "rang": 1,
+                "totaal_aantal_woningen": 10,
+            }
+        ]
@@ -0,0 +1,89 @@
+import base64
+import csv
+import io
+import json
+
+import pyarrow as pa
+import pytest
+from factory import Sequence
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.api.crud.export import encode_token
+from app.constants import EXPORT
+from models.faker_models.db.fake_models import CbsAantalWoningenFactory
+
+ENDPOINT = f"/{EXPORT}/cbs-aantal-woningen"
+
+
+@pytest.mark.docker
+class TestExportTable:
+    @pytest.fixture(autouse=True)
+    def _create_rows(self, client: TestClient):
+        rows = CbsAantalWoningenFactory.create_batch(
+            25, gm_code=Sequence(lambda n: f"GM{n:04}")
+        )
+        self.gm_codes = sorted(row.gm_code for row in rows)
+
+    def ndjson(self, content: bytes) -> list[dict]:
+        return [json.loads(line) for line in content.decode().splitlines()]
+
+    def test_should_stream_ndjson_in_primary_key_order(self, client: TestClient):
+        response = client.get(ENDPOINT)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = self.ndjson(response.content)
+        assert [row["gm_code"] for row in rows] == self.gm_codes
+
+    def test_should_stream_csv(self, client: TestClient):
+        response = client.get(ENDPOINT, params={"format": "csv"})
+
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 25
+        assert set(rows[0]) == {"gm_code", "jaar", "aantal_woningen"}
+
+    def test_should_stream_arrow_ipc(self, client: TestClient):
+        response = client.get(ENDPOINT, params={"format": "arrow"})
+
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.num_rows == 25
+        assert table.schema.field("jaar").type == pa.int64()
+
+    def test_should_resume_from_next_token(self, client: TestClient):
+        exported, params = [], {"limit": 10}
+        while True:
+            response = client.get(ENDPOINT, params=params)
+            exported += self.ndjson(response.content)
+            if "X-Next-Token" not in response.headers:
+                break
+            params = {"limit": 10, "after": response.headers["X-Next-Token"]}
+
+        assert len(exported) == 25
+        assert len({row["gm_code"] for row in exported}) == 25
+
+    def test_should_compress_with_gzip(self, client: TestClient):
+        response = client.get(ENDPOINT, headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(self.ndjson(response.content)) == 25
+
+    @pytest.mark.parametrize(
+        "token",
+        [
+            "not-a-token",
+            encode_token(("GM0001",)),
+            base64.urlsafe_b64encode(b"42").decode(),
+            base64.urlsafe_b64encode(b'{"GM0001": 2020}').decode(),
+            encode_token(("GM0001", [2020])),
+        ],
+    )
+    def test_should_reject_invalid_token(self, client: TestClient, token: str):
+        response = client.get(ENDPOINT, params={"after": token})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_should_return_not_found_for_unknown_table(self, client: TestClient):
+        response = client.get(f"/{EXPORT}/unknown")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
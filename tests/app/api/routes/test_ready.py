@@ -0,0 +1,43 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+from app.constants import READY
+from shared.settings import settings
+
+
+@pytest.fixture
+def warmed_up(app: FastAPI) -> None:
+    finished = threading.Event()
+    finished.set()
+    app.state.warm_up = SimpleNamespace(finished=finished)
+
+
+@pytest.mark.docker
+class TestReady:
+    def test_should_not_be_ready_before_the_warm_up(self, client: TestClient):
+        response = client.get(f"/{READY}")
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json()["status"] == "warming up"
+
+    @pytest.mark.usefixtures("warmed_up")
+    def test_should_be_ready_after_the_warm_up(self, client: TestClient):
+        response = client.get(f"/{READY}")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "ready"
+
+    @pytest.mark.usefixtures("warmed_up")
+    def test_should_not_be_ready_when_the_database_is_slow(
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(settings, "READY_MAX_LATENCY_SECONDS", 0)
+
+        response = client.get(f"/{READY}")
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json()["status"] == "database slow"
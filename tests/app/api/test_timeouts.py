@@ -0,0 +1,149 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session
+
+from app.api.deps import ReadSessionDep
+from app.api.timeouts import (
+    QUERY_CANCELED,
+    QueryGuard,
+    guarded,
+    query_timeout_handler,
+    route_timeouts,
+    sqlstate,
+)
+from app.constants import CBS
+from models.v1.cbs_aantal_woningen import CbsAantalWoningen
+from shared.settings import settings
+
+
+class DisconnectedRequest:
+    async def is_disconnected(self) -> bool:
+        return True
+
+
+def test_route_timeouts_fall_back_to_the_defaults(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "ROUTE_STATEMENT_TIMEOUTS", {"export": "5min"})
+    monkeypatch.setattr(settings, "ROUTE_LOCK_TIMEOUTS", {})
+
+    assert route_timeouts("export") == ("5min", settings.LOCK_TIMEOUT)
+    assert route_timeouts("other") == (
+        settings.STATEMENT_TIMEOUT,
+        settings.LOCK_TIMEOUT,
+    )
+
+
+def test_route_timeouts_without_a_route_are_the_defaults() -> None:
+    assert route_timeouts(None) == (settings.STATEMENT_TIMEOUT, settings.LOCK_TIMEOUT)
+
+
+def test_other_database_errors_return_internal_server_error() -> None:
+    error = OperationalError("SELECT 1", {}, Exception("server closed"))
+
+    response = asyncio.run(query_timeout_handler(None, error))  # type: ignore
+
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
+def test_idle_connection_is_not_cancelled() -> None:
+    def cancel() -> None:
+        raise AssertionError
+
+    guard = QueryGuard(None, "1s", "1s")  # type: ignore
+    guard.connection = SimpleNamespace(
+        info=SimpleNamespace(transaction_status=2), cancel=cancel
+    )
+
+    asyncio.run(guard.cancel_on_disconnect(DisconnectedRequest(), 0.01))  # type: ignore
+
+
+@pytest.mark.docker
+def test_guard_does_not_watch_the_client_of_a_streaming_route(
+    session: Session,
+) -> None:
+    class StreamingRequest:
+        scope = {
+            "route": SimpleNamespace(
+                name="export_table", response_class=StreamingResponse
+            )
+        }
+
+        async def is_disconnected(self) -> bool:
+            raise AssertionError
+
+    async def stream() -> None:
+        async with guarded(StreamingRequest(), session):  # type: ignore
+            await asyncio.sleep(0.05)
+
+    asyncio.run(stream())
+
+
+@pytest.mark.docker
+def test_guard_sets_the_timeouts_of_the_transaction(session: Session) -> None:
+    guard = QueryGuard(session, "1234ms", "56ms")
+    guard.start()
+
+    assert session.execute(text("SHOW statement_timeout")).scalar_one() == "1234ms"
+    assert session.execute(text("SHOW lock_timeout")).scalar_one() == "56ms"
+    guard.stop()
+
+
+@pytest.mark.docker
+def test_guard_cancels_the_running_query_on_disconnect(engine: Engine) -> None:
+    with Session(engine) as session, ThreadPoolExecutor(1) as pool:
+        guard = QueryGuard(session, "10s", "1s")
+        guard.start()
+        query = pool.submit(session.execute, text("SELECT pg_sleep(10)"))
+        while not guard.is_executing():
+            time.sleep(0.01)
+
+        start = time.perf_counter()
+        asyncio.run(guard.cancel_on_disconnect(DisconnectedRequest(), 0.01))  # type: ignore
+        with pytest.raises(OperationalError) as err:
+            query.result(timeout=10)
+        guard.stop()
+
+    assert sqlstate(err.value) == QUERY_CANCELED
+    assert time.perf_counter() - start < 5
+
+
+@pytest.mark.docker
+def test_statement_timeout_returns_gateway_timeout(
+    app: FastAPI, client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def sleep(session: ReadSessionDep) -> None:
+        session.execute(text("SELECT pg_sleep(1)"))
+
+    app.router.add_api_route("/sleep", sleep)
+    monkeypatch.setattr(settings, "ROUTE_STATEMENT_TIMEOUTS", {"sleep": "10ms"})
+
+    response = client.get("/sleep")
+
+    assert response.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+
+
+@pytest.mark.docker
+def test_lock_timeout_returns_service_unavailable(
+    engine: Engine, client: TestClient, monkeypatch: pytest.MonkeyPatch, gm_code: str
+) -> None:
+    monkeypatch.setattr(
+        settings, "ROUTE_LOCK_TIMEOUTS", {"get_cbs_aantal_woningen": "10ms"}
+    )
+    table = CbsAantalWoningen.__table__.fullname  # type: ignore
+
+    with engine.connect() as other:
+        other.execute(text(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE"))
+        response = client.get(f"{settings.API_STRING}/{CBS}/{gm_code}/aantal-woningen")
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
@@ -5,8 +5,9 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
+from app.api.deps import get_snapshot
 from app.create_app import create_app
-from shared.engine import get_sessions
+from shared.engine import get_read_sessions, get_sessions
 
 
 @pytest.fixture
@@ -27,6 +28,9 @@ def client(app: FastAPI, session: Session) -> Iterator[TestClient]:
         return session
 
     app.dependency_overrides[get_sessions] = get_session_override
+    app.dependency_overrides[get_read_sessions] = get_session_override
+    # NOTE read from the database, not from a snapshot published by a local ETL
+    app.dependency_overrides[get_snapshot] = lambda: None
 
     yield TestClient(app)
 
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from app.spatial.index import NOT_FOUND, Shape, SpatialIndex
+from app.spatial.wkt import parse_polygon_rings, ring_edges
+
+
+def square(code: str, x: float, y: float, size: float = 1.0) -> Shape:
+    return Shape(
+        code,
+        "GM0001",
+        f"POLYGON (({x} {y}, {x + size} {y}, {x + size} {y + size}, "
+        f"{x} {y + size}, {x} {y}))",
+    )
+
+
+class TestParsePolygonRings:
+    def test_should_parse_polygon_with_hole(self):
+        rings = parse_polygon_rings(
+            "POLYGON ((0 0, 10 0, 10 10, 0 0), (2 1, 8 1, 8 7, 2 1))"
+        )
+
+        assert len(rings) == 2
+        assert rings[0].shape == (4, 2)
+
+    def test_should_parse_multipolygon(self):
+        rings = parse_polygon_rings(
+            "MULTIPOLYGON (((0 0, 1 0, 1 1, 0 0)), ((5 5, 6 5, 6 6, 5 5)))"
+        )
+
+        assert len(rings) == 2
+
+    def test_should_raise_on_other_geometries(self):
+        with pytest.raises(ValueError, match="POINT"):
+            parse_polygon_rings("POINT (1 1)")
+
+    def test_should_have_no_edges_without_rings(self):
+        assert ring_edges(parse_polygon_rings("POLYGON EMPTY")).shape == (0, 4)
+
+
+class TestSpatialIndex:
+    @pytest.fixture(autouse=True)
+    def _assign_index_to_class(self):
+        self.grid = 20
+        self.index = SpatialIndex(
+            [
+                square(f"BU{x:02}{y:02}", x, y)
+                for x in range(self.grid)
+                for y in range(self.grid)
+            ]
+        )
+
+    def test_should_locate_batch_of_points(self):
+        points = np.random.default_rng(0).uniform(0, self.grid, (1000, 2))
+
+        located = self.index.locate(points)
+
+        expected = [f"BU{x:02}{y:02}" for x, y in np.floor(points).astype(int)]
+        assert self.index.codes[located].tolist() == expected
+
+    def test_should_not_locate_points_outside_shapes(self):
+        located = self.index.locate([(-1, 5), (5, self.grid + 1)])
+
+        assert located.tolist() == [NOT_FOUND, NOT_FOUND]
+
+    def test_should_not_locate_points_in_holes(self):
+        index = SpatialIndex(
+            [
+                Shape(
+                    "BU0001",
+                    "GM0001",
+                    "POLYGON ((0 0, 10 0, 10 10, 0 10, 0 0), "
+                    "(2 2, 8 2, 8 8, 2 8, 2 2))",
+                )
+            ]
+        )
+
+        assert index.locate([(1, 1), (5, 5)]).tolist() == [0, NOT_FOUND]
+
+    def test_should_locate_in_every_part_of_multipolygon(self):
+        index = SpatialIndex(
+            [
+                square("BU0001", 0, 0),
+                Shape(
+                    "BU0002",
+                    "GM0002",
+                    "MULTIPOLYGON (((5 5, 6 5, 6 6, 5 6, 5 5)), "
+                    "((8 8, 9 8, 9 9, 8 9, 8 8)))",
+                ),
+            ]
+        )
+
+        assert index.locate([(5.5, 5.5), (8.5, 8.5), (7, 7)]).tolist() == [
+            1,
+            1,
+            NOT_FOUND,
+        ]
+
+    def test_should_handle_empty_index(self):
+        assert SpatialIndex([]).locate([(1, 1)]).tolist() == [NOT_FOUND]
+
+    def test_should_skip_shapes_without_area(self):
+        index = SpatialIndex(
+            [
+                Shape("BU0001", "GM0001", "POLYGON EMPTY"),
+                Shape("BU0002", "GM0001", "POINT (1 1)"),
+                square("BU0003", 0, 0),
+            ]
+        )
+
+        assert index.codes.tolist() == ["BU0003"]
+        assert index.locate([(0.5, 0.5)]).tolist() == [0]
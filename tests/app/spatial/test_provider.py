@@ -0,0 +1,45 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.api.crud.buurt import CrudBuurt
+from app.spatial.index import Shape
+from app.spatial.provider import SpatialIndexProvider
+
+
+@pytest.fixture
+def crud() -> MagicMock:
+    crud = MagicMock(spec=CrudBuurt)
+    crud.get_version.return_value = 1
+    crud.get_shapes.return_value = [
+        Shape("BU0001", "GM0001", "POLYGON ((0 0, 1 0, 1 1, 0 1, 0 0))")
+    ]
+    return crud
+
+
+class TestSpatialIndexProvider:
+    def test_should_build_index_once_per_version(self, crud: MagicMock):
+        provider = SpatialIndexProvider(refresh_interval=0)
+
+        first = provider.get(crud)
+        second = provider.get(crud)
+
+        assert first is second
+        assert crud.get_shapes.call_count == 1
+        assert crud.get_version.call_count == 2
+
+    def test_should_rebuild_when_table_is_reloaded(self, crud: MagicMock):
+        provider = SpatialIndexProvider(refresh_interval=0)
+        first = provider.get(crud)
+
+        crud.get_version.return_value = 2
+
+        assert provider.get(crud) is not first
+
+    def test_should_not_check_version_within_interval(self, crud: MagicMock):
+        provider = SpatialIndexProvider(refresh_interval=60)
+
+        provider.get(crud)
+        provider.get(crud)
+
+        assert crud.get_version.call_count == 1
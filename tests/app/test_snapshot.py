@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import pytest
+
+from app.snapshot import SnapshotProvider
+from shared.snapshot import snapshot_arrays, write_snapshot
+
+
+def publish(path: Path, version: int, value: float) -> None:
+    write_snapshot(path, version, *snapshot_arrays(["GM0014"], [2024], [value]))
+
+
+@pytest.fixture
+def path(tmp_path: Path) -> Path:
+    return tmp_path / "cbs_aantal_woningen.bin"
+
+
+class TestSnapshotProvider:
+    def test_should_return_none_without_snapshot(self, path: Path):
+        assert SnapshotProvider(path, check_interval=0).get() is None
+        assert SnapshotProvider(None, check_interval=0).get() is None
+
+    def test_should_map_once_per_published_snapshot(self, path: Path):
+        publish(path, 1, 10.0)
+        provider = SnapshotProvider(path, check_interval=0)
+
+        assert provider.get() is provider.get()
+
+    def test_should_remap_when_published_again(self, path: Path):
+        publish(path, 1, 10.0)
+        provider = SnapshotProvider(path, check_interval=0)
+        first = provider.get()
+
+        publish(path, 2, 20.0)
+        second = provider.get()
+
+        assert first is not None
+        assert second is not None
+        assert (first.version, second.version) == (1, 2)
+        assert second.get("GM0014", 2024) == 20.0
+
+    def test_should_not_check_file_within_interval(self, path: Path):
+        publish(path, 1, 10.0)
+        provider = SnapshotProvider(path, check_interval=60)
+        first = provider.get()
+
+        path.unlink()
+
+        assert provider.get() is first
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.api.crud.buurt import CrudBuurt
+from app.api.crud.cbs import CrudCbs
+from app.snapshot import SnapshotProvider
+from app.spatial.provider import SpatialIndexProvider
+from app.warmup import WarmUp
+from shared.engine import ReplicaRouter
+from shared.snapshot import SnapshotError
+
+
+def warm_up(engine: Engine | None = None, connections: int = 2) -> WarmUp:
+    return WarmUp(
+        ReplicaRouter(engine, []),  # type: ignore
+        SnapshotProvider(None, check_interval=0),
+        SpatialIndexProvider(refresh_interval=60),
+        connections,
+    )
+
+
+class TestWarmUp:
+    @pytest.mark.docker
+    def test_should_open_connections_and_load_the_spatial_index(self, engine: Engine):
+        subject = warm_up(engine, connections=3)
+
+        subject.warm()
+
+        assert subject.finished.is_set()
+        assert engine.pool.checkedin() >= 3  # type: ignore
+        assert subject.spatial_index_provider.index is not None
+
+    @pytest.mark.docker
+    def test_should_finish_before_the_etl_created_the_tables(
+        self, engine: Engine, monkeypatch: pytest.MonkeyPatch
+    ):
+        def missing_table(crud: CrudCbs | CrudBuurt, *_: object) -> None:
+            crud.session.execute(text("SELECT * FROM not_loaded_yet"))
+
+        monkeypatch.setattr(CrudCbs, "get_aantal_woningen", missing_table)
+        monkeypatch.setattr(CrudBuurt, "get_version", missing_table)
+        subject = warm_up(engine)
+
+        subject.warm()
+
+        assert subject.finished.is_set()
+        assert subject.spatial_index_provider.index is None
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            OperationalError("SELECT 1", {}, Exception("down")),
+            SnapshotError("corrupt"),
+        ],
+    )
+    def test_should_retry_until_the_warm_up_succeeds(self, error: Exception):
+        subject = warm_up()
+        attempts = []
+
+        def warm() -> None:
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise error
+            subject.finished.set()
+
+        subject.warm = warm  # type: ignore
+
+        asyncio.run(subject.run(retry_interval=0))
+
+        assert len(attempts) == 3
@@ -0,0 +1,74 @@
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import pandas as pd
+import pytest
+from factory import Sequence
+from factory.random import reseed_random
+
+from models.faker_models.api.fake_models import CbsGerealiseerdeWoningenRecordFactory
+from models.faker_models.db.fake_models import CbsAantalWoningenFactory
+from tests.benchmarks.utils import BenchmarkRecorder, measure
+
+YEARS = 11
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc):
+    if "rows" in metafunc.fixturenames:
+        sizes = metafunc.config.getoption("--benchmark-rows").split(",")
+        metafunc.parametrize("rows", [int(size) for size in sizes], scope="session")
+
+
+@pytest.fixture(scope="session")
+def benchmark_recorder(request: pytest.FixtureRequest) -> Iterator[BenchmarkRecorder]:
+    recorder = BenchmarkRecorder.from_file(
+        request.config.getoption("--benchmark-compare"),
+        request.config.getoption("--benchmark-threshold"),
+    )
+    yield recorder
+    if recorder.results:
+        recorder.save(request.config.getoption("--benchmark-save"))
+
+
+@pytest.fixture
+def benchmark(benchmark_recorder: BenchmarkRecorder) -> Callable:
+    def run(
+        name: str,
+        rows: int,
+        func: Callable[..., Any],
+        setup: Callable[[], tuple] = tuple,
+    ) -> None:
+        regressions = benchmark_recorder.record(measure(name, rows, func, setup))
+        assert not regressions, "\n".join(regressions)
+
+    return run
+
+
+@pytest.fixture(scope="session")
+def raw_records(rows: int) -> dict[int, list[dict]]:
+    """CBS api records spread evenly over the extracted years"""
+    reseed_random("workshop")
+    first_year = pd.Timestamp.today().year - YEARS + 1
+    return {
+        year: CbsGerealiseerdeWoningenRecordFactory.build_batch(
+            rows // YEARS + (index < rows % YEARS), jaar=year
+        )
+        for index, year in enumerate(range(first_year, first_year + YEARS))
+    }
+
+
+@pytest.fixture(scope="session")
+def aantal_woningen_records(rows: int) -> list[dict]:
+    """Transformed records with a unique primary key"""
+    reseed_random("workshop")
+    return [
+        obj.model_dump()
+        for obj in CbsAantalWoningenFactory.build_batch(
+            rows, gm_code=Sequence(lambda n: f"GM{n:07}")
+        )
+    ]
+
+
+@pytest.fixture(scope="session")
+def aantal_woningen_df(aantal_woningen_records: list[dict]) -> pd.DataFrame:
+    return pd.DataFrame(aantal_woningen_records)
@@ -0,0 +1,102 @@
+import asyncio
+import json
+from collections.abc import Iterator
+
+import httpx
+import pytest
+from factory import Sequence
+from factory.random import reseed_random
+from fastapi import FastAPI
+from sqlalchemy import Engine
+from sqlmodel import Session, create_engine, delete
+
+from app.api.deps import get_snapshot
+from app.create_app import create_app
+from models.faker_models.db.fake_models import CbsAantalWoningenFactory
+from models.v1.cbs_aantal_woningen import CbsAantalWoningen
+from shared.engine import get_read_sessions, get_sessions
+from tests.benchmarks.utils import cbs_requests, run_load
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.docker]
+
+
+@pytest.fixture
+def seeded_gm_codes(
+    engine: Engine, request: pytest.FixtureRequest
+) -> Iterator[list[str]]:
+    """
+    Commits the fake data, so the concurrent requests can read it through
+    their own sessions and connections from the pool.
+    """
+    reseed_random("workshop")
+    objects = CbsAantalWoningenFactory.build_batch(
+        request.config.getoption("--load-rows"),
+        gm_code=Sequence(lambda n: f"GM{n:07}"),
+    )
+    gm_codes = [obj.gm_code for obj in objects]
+    with Session(engine) as session:
+        session.add_all(objects)
+        session.commit()
+
+        yield gm_codes
+
+        session.exec(delete(CbsAantalWoningen))
+        session.commit()
+
+
+@pytest.fixture
+def load_engine(engine: Engine, request: pytest.FixtureRequest) -> Iterator[Engine]:
+    """
+    A pool sized to the concurrency, so requests do not queue on a connection
+    and the latencies are those of the queries. With the default concurrency
+    the pool and the `engine` fixture stay below the default max_connections.
+    """
+    _engine = create_engine(
+        engine.url,
+        pool_size=request.config.getoption("--load-concurrency"),
+        max_overflow=0,
+        pool_timeout=10,
+    )
+    yield _engine
+    _engine.dispose()
+
+
+@pytest.fixture
+def load_app(load_engine: Engine) -> FastAPI:
+    app = create_app()
+
+    def get_session_override() -> Iterator[Session]:
+        with Session(load_engine) as session:
+            yield session
+
+    app.dependency_overrides[get_sessions] = get_session_override
+    app.dependency_overrides[get_read_sessions] = get_session_override
+    app.dependency_overrides[get_snapshot] = lambda: None
+    return app
+
+
+def test_api_load(
+    load_app: FastAPI,
+    seeded_gm_codes: list[str],
+    request: pytest.FixtureRequest,
+):
+    async def run() -> list[dict]:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=load_app),
+            base_url="http://test/api",
+        ) as client:
+            report = await run_load(
+                client,
+                cbs_requests(
+                    seeded_gm_codes, request.config.getoption("--load-requests")
+                ),
+                request.config.getoption("--load-concurrency"),
+            )
+        return report.summaries()
+
+    summaries = asyncio.run(run())
+
+    save_path = request.config.getoption("--benchmark-save").with_name("load.json")
+    save_path.parent.mkdir(parents=True, exist_ok=True)
+    save_path.write_text(json.dumps(summaries, indent=2))
+    assert all(summary["error_rate"] == 0 for summary in summaries)
@@ -0,0 +1,96 @@
+import json
+import time
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine, event
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlmodel import Session, and_, col, create_engine, select
+
+from app.api.crud.cbs import CrudCbs
+from models.v1.cbs_aantal_woningen import CbsAantalWoningen
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.docker]
+
+LOOKUPS = 2000
+JAAR = 2024
+
+
+def rebuilt_lookup(session: Session, gm_code: str, jaar: int) -> float:
+    """The lookup as it was, a new statement is built for every request"""
+    statement = select(CbsAantalWoningen.aantal_woningen).where(
+        and_(
+            col(CbsAantalWoningen.gm_code) == gm_code,
+            col(CbsAantalWoningen.jaar) == jaar,
+        )
+    )
+    return session.exec(statement).one_or_none() or 0.0
+
+
+def cached_lookup(session: Session, gm_code: str, jaar: int) -> float:
+    return CrudCbs(session, gm_code).get_aantal_woningen(jaar)
+
+
+def per_lookup(
+    lookup: Callable[[Session, str, int], float], session: Session, jaar: int
+) -> dict[str, float]:
+    """The CPU time of this process and the wall time per lookup, in µs"""
+    lookup(session, "GM0000", jaar)
+    cpu, wall = time.process_time(), time.perf_counter()
+    for number in range(LOOKUPS):
+        lookup(session, f"GM{number % 100:04}", jaar)
+    return {
+        "cpu_us": (time.process_time() - cpu) / LOOKUPS * 1e6,
+        "wall_us": (time.perf_counter() - wall) / LOOKUPS * 1e6,
+    }
+
+
+def cache_stats(
+    lookup: Callable[[Session, str, int], float], session: Session, jaar: int
+) -> set[CacheStats]:
+    """Whether the statements of the lookups were taken from the compiled cache"""
+    stats: set[CacheStats] = set()
+
+    def record(**kwargs: Any) -> None:
+        stats.add(kwargs["context"].cache_hit)
+
+    bind = session.get_bind()
+    event.listen(bind, "after_cursor_execute", record, named=True)
+    try:
+        for number in range(10):
+            lookup(session, f"GM{number:04}", jaar)
+    finally:
+        event.remove(bind, "after_cursor_execute", record)
+    return stats
+
+
+@pytest.fixture
+def psycopg_engines(engine: Engine) -> Iterator[dict[str, Engine]]:
+    url = engine.url.set(drivername="postgresql+psycopg")
+    engines = {
+        "psycopg": create_engine(url, connect_args={"prepare_threshold": None}),
+        "psycopg prepared": create_engine(url, connect_args={"prepare_threshold": 1}),
+    }
+    yield engines
+    for _engine in engines.values():
+        _engine.dispose()
+
+
+def test_aantal_woningen_lookup(
+    session: Session,
+    psycopg_engines: dict[str, Engine],
+    request: pytest.FixtureRequest,
+):
+    results = {
+        "rebuilt statement": per_lookup(rebuilt_lookup, session, JAAR),
+        "cached statement": per_lookup(cached_lookup, session, JAAR),
+    }
+    for name, _engine in psycopg_engines.items():
+        with Session(_engine) as psycopg_session:
+            results[name] = per_lookup(cached_lookup, psycopg_session, JAAR)
+
+    save_path = request.config.getoption("--benchmark-save").with_name("crud.json")
+    save_path.parent.mkdir(parents=True, exist_ok=True)
+    save_path.write_text(json.dumps(results, indent=2))
+    assert cache_stats(cached_lookup, session, JAAR) == {CacheStats.CACHE_HIT}
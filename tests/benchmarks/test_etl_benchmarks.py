@@ -0,0 +1,77 @@
+from collections.abc import Callable
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+from sqlmodel import Session
+
+from etl.apis.cbs import CbsApi
+from etl.flows.base import DataframeTransformer, SqlmodelLoader
+from etl.flows.cbs_aantal_woningen import (
+    CbsAantalWoningenExtractor,
+    CbsAantalWoningenTransformer,
+)
+from models.v1.cbs_aantal_woningen import CbsAantalWoningen
+from tests.etl.utils import get_row_count
+
+pytestmark = pytest.mark.benchmark
+
+
+class TestEtlBenchmarks:
+    def test_cbs_aantal_woningen_extractor(
+        self, benchmark: Callable, rows: int, raw_records: dict[int, list[dict]]
+    ):
+        api = MagicMock(spec=CbsApi)
+        api.get_gerealiseerde_woningen_for_year.side_effect = lambda year: (
+            raw_records.get(year, [])
+        )
+
+        benchmark(
+            "CbsAantalWoningenExtractor.extract",
+            rows,
+            CbsAantalWoningenExtractor(api).extract,
+        )
+
+    def test_dataframe_transformer(
+        self, benchmark: Callable, rows: int, aantal_woningen_df: pd.DataFrame
+    ):
+        benchmark(
+            "DataframeTransformer.transform",
+            rows,
+            DataframeTransformer.transform,
+            setup=lambda: (CbsAantalWoningen, aantal_woningen_df),
+        )
+
+    def test_cbs_aantal_woningen_transformer(
+        self, benchmark: Callable, rows: int, aantal_woningen_df: pd.DataFrame
+    ):
+        benchmark(
+            "CbsAantalWoningenTransformer.transform",
+            rows,
+            CbsAantalWoningenTransformer.transform,
+            setup=lambda: (aantal_woningen_df,),
+        )
+
+    @pytest.mark.docker
+    def test_sqlmodel_loader(
+        self,
+        benchmark: Callable,
+        rows: int,
+        aantal_woningen_records: list[dict],
+        session: Session,
+    ):
+        def setup() -> tuple:
+            session.expunge_all()
+            objects = [
+                CbsAantalWoningen(**record) for record in aantal_woningen_records
+            ]
+            return [CbsAantalWoningen], objects
+
+        benchmark(
+            "SqlmodelLoader.recreate_and_load",
+            rows,
+            SqlmodelLoader(session).recreate_and_load,
+            setup=setup,
+        )
+
+        assert get_row_count(session, CbsAantalWoningen) == rows
@@ -0,0 +1,128 @@
+import json
+from collections.abc import Iterator
+from datetime import date
+
+import pytest
+from factory import Sequence
+from factory.random import reseed_random
+from sqlalchemy import Engine, delete, text
+from sqlmodel import Session, SQLModel
+
+from app.api.crud.cbs import CrudCbs
+from app.api.crud.export import CrudExport
+from etl.flows.base import SqlmodelLoader
+from models.faker_models.db.fake_models import CbsAantalWoningenFactory
+from models.v1.cbs_aantal_woningen import CbsAantalWoningen
+from models.v1.etl_metadata import TableLoad
+from tests.benchmarks.utils import (
+    PlanCase,
+    PlanSummary,
+    diff,
+    explain,
+    large_relations,
+    summaries_json,
+    violations,
+)
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.docker]
+
+YEARS = 11
+LAST_YEAR = date.today().year - 1
+FIRST_YEAR = LAST_YEAR - YEARS + 1
+GM_CODE = "GM0000042"
+
+CASES = [
+    PlanCase(
+        "aantal_woningen",
+        lambda session: CrudCbs(session, GM_CODE).aantal_woningen_query(LAST_YEAR),
+        max_buffers=10,
+        max_ms=5,
+        index_on=[f"cbs_aantal_woningen_{LAST_YEAR}"],
+    ),
+    PlanCase(
+        "trend",
+        lambda session: CrudCbs(session, GM_CODE).trend_query(FIRST_YEAR, LAST_YEAR),
+        max_buffers=50,
+        max_ms=10,
+        index_on=["cbs_aantal_woningen_trend"],
+    ),
+    PlanCase(
+        "export_page",
+        lambda session: (
+            CrudExport(session, CbsAantalWoningen)
+            .statement(
+                CrudExport(session, CbsAantalWoningen).columns, (GM_CODE, LAST_YEAR)
+            )
+            .limit(1000)
+        ),
+        max_buffers=500,
+        max_ms=50,
+    ),
+]
+
+
+@pytest.fixture(scope="module")
+def seeded(engine: Engine, request: pytest.FixtureRequest) -> Iterator[int]:
+    """
+    Commits the fake data through the loader, so the table is partitioned
+    and the materialized views are refreshed as in production, and analyzes
+    it. The rows are removed afterwards.
+    """
+    rows = request.config.getoption("--plan-rows")
+    reseed_random("workshop")
+    objects = CbsAantalWoningenFactory.build_batch(
+        rows,
+        gm_code=Sequence(lambda n: f"GM{n // YEARS:07}"),
+        jaar=Sequence(lambda n: FIRST_YEAR + n % YEARS),
+    )
+    table = CbsAantalWoningen.__table__  # type: ignore
+    with Session(engine) as session:
+        SqlmodelLoader(session).recreate_and_load([CbsAantalWoningen], objects)
+        session.connection().execute(text("ANALYZE"))
+        session.commit()
+
+        yield rows
+
+        session.exec(delete(TableLoad))
+        session.commit()
+    SQLModel.metadata.drop_all(engine, tables=[table])
+    SQLModel.metadata.create_all(engine, tables=[table])
+
+
+@pytest.fixture(scope="module")
+def baseline(request: pytest.FixtureRequest) -> dict[str, dict]:
+    path = request.config.getoption("--plan-baseline")
+    return json.loads(path.read_text()) if path else {}
+
+
+@pytest.fixture(scope="module")
+def summaries(request: pytest.FixtureRequest) -> Iterator[list[PlanSummary]]:
+    summaries: list[PlanSummary] = []
+    yield summaries
+    path = request.config.getoption("--benchmark-save").with_name("plans.json")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(summaries_json(summaries), indent=2))
+
+
+@pytest.mark.parametrize("case", CASES, ids=lambda case: case.name)
+def test_query_plan(
+    case: PlanCase,
+    seeded: int,
+    engine: Engine,
+    baseline: dict[str, dict],
+    summaries: list[PlanSummary],
+    request: pytest.FixtureRequest,
+):
+    with Session(engine) as session:
+        summary = PlanSummary.from_explain(
+            case.name, explain(session, case.statement(session))
+        )
+        large = large_relations(session, min_rows=seeded // YEARS // 2)
+    summaries.append(summary)
+
+    found = violations(case, summary, large) + diff(
+        summary,
+        baseline.get(case.name),
+        request.config.getoption("--benchmark-threshold"),
+    )
+    assert not found, "\n".join(found)
@@ -0,0 +1,341 @@
+import asyncio
+import json
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Annotated, Any
+
+import httpx
+import typer
+from sqlalchemy import Select, text
+from sqlmodel import Session
+
+from app.constants import CBS, HEARTBEAT
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    rows: int
+    seconds: float
+    peak_mb: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.rows}]"
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float("inf")
+
+
+def measure(
+    name: str,
+    rows: int,
+    func: Callable[..., Any],
+    setup: Callable[[], tuple] = tuple,
+) -> BenchmarkResult:
+    """
+    Run `func` twice, once traced by tracemalloc for the peak memory and once
+    untraced for the duration, as tracing slows down allocation heavy code.
+    `setup` provides fresh arguments for every run and is not measured.
+    """
+    args = setup()
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    args = setup()
+    start = time.perf_counter()
+    func(*args)
+    seconds = time.perf_counter() - start
+
+    return BenchmarkResult(name, rows, seconds, peak / 1024**2)
+
+
+@dataclass
+class BenchmarkRecorder:
+    """Collects benchmark results and compares them with a saved baseline"""
+
+    baseline: dict[str, dict] = field(default_factory=dict)
+    threshold: float = 0.2
+    results: list[BenchmarkResult] = field(default_factory=list)
+
+    @classmethod
+    def from_file(cls, path: Path | None, threshold: float) -> "BenchmarkRecorder":
+        baseline = json.loads(path.read_text())["results"] if path else {}
+        return cls(baseline, threshold)
+
+    def record(self, result: BenchmarkResult) -> list[str]:
+        """Record a result and return a description of every regression"""
+        self.results.append(result)
+        baseline = self.baseline.get(result.key)
+        if baseline is None:
+            return []
+
+        regressions = []
+        if result.rows_per_sec < baseline["rows_per_sec"] * (1 - self.threshold):
+            regressions.append(
+                f"{result.key} rows/sec dropped from "
+                f"{baseline['rows_per_sec']:.0f} to {result.rows_per_sec:.0f}"
+            )
+        if result.peak_mb > baseline["peak_mb"] * (1 + self.threshold):
+            regressions.append(
+                f"{result.key} peak memory grew from "
+                f"{baseline['peak_mb']:.1f} MB to {result.peak_mb:.1f} MB"
+            )
+        return regressions
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(
+                {
+                    "created_at": datetime.now().isoformat(),
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "results": {
+                        result.key: {
+                            **asdict(result),
+                            "rows_per_sec": result.rows_per_sec,
+                        }
+                        for result in self.results
+                    },
+                },
+                indent=2,
+            )
+        )
+
+
+# NOTE the query plans are captured with EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)
+# and checked for index usage, buffer counts and latency, and against a baseline
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Heap Scan"}
+
+
+@dataclass(frozen=True)
+class PlanCase:
+    """A CRUD query with the plan properties it should keep"""
+
+    name: str
+    statement: Callable[[Session], Select]
+    max_buffers: int
+    max_ms: float
+    index_on: list[str] = field(default_factory=list)
+
+
+@dataclass
+class PlanSummary:
+    name: str
+    nodes: list[str]
+    scans: list[tuple[str, str]]
+    buffers: int
+    execution_ms: float
+
+    @classmethod
+    def from_explain(cls, name: str, explain: dict) -> "PlanSummary":
+        plan = explain["Plan"]
+        nodes = list(walk(plan))
+        return cls(
+            name,
+            nodes=[node["Node Type"] for node in nodes],
+            scans=[
+                (node["Node Type"], node["Relation Name"])
+                for node in nodes
+                if "Relation Name" in node
+            ],
+            buffers=plan["Shared Hit Blocks"] + plan["Shared Read Blocks"],
+            execution_ms=explain["Execution Time"],
+        )
+
+
+def walk(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk(child)
+
+
+def explain(session: Session, statement: Select) -> dict:
+    sql = statement.compile(
+        dialect=session.get_bind().dialect, compile_kwargs={"literal_binds": True}
+    )
+    return session.execute(
+        text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+    ).scalar_one()[0]
+
+
+def large_relations(session: Session, min_rows: int) -> set[str]:
+    """The tables and materialized views with more rows, according to ANALYZE"""
+    rows = session.execute(
+        text(
+            "SELECT relname FROM pg_class "
+            "WHERE relkind IN ('r', 'm') AND reltuples >= :min_rows"
+        ).bindparams(min_rows=min_rows)
+    )
+    return set(rows.scalars())
+
+
+def violations(case: PlanCase, summary: PlanSummary, large: set[str]) -> list[str]:
+    found = [
+        f"{case.name}: sequential scan on {relation}"
+        for node_type, relation in summary.scans
+        if node_type == "Seq Scan" and relation in large
+    ]
+    indexed = {
+        relation for node_type, relation in summary.scans if node_type in INDEX_SCANS
+    }
+    found += [
+        f"{case.name}: {relation} is not read by an index"
+        for relation in case.index_on
+        if relation not in indexed
+    ]
+    if summary.buffers > case.max_buffers:
+        found.append(f"{case.name}: {summary.buffers} buffers > {case.max_buffers}")
+    if summary.execution_ms > case.max_ms:
+        found.append(f"{case.name}: {summary.execution_ms:.2f} ms > {case.max_ms} ms")
+    return found
+
+
+def diff(summary: PlanSummary, baseline: dict | None, threshold: float) -> list[str]:
+    """The differences with the baseline plan, a changed plan or more buffers"""
+    if baseline is None:
+        return []
+    found = []
+    if summary.nodes != baseline["nodes"]:
+        found.append(
+            f"{summary.name}: plan changed from {' > '.join(baseline['nodes'])} "
+            f"to {' > '.join(summary.nodes)}"
+        )
+    if summary.buffers > baseline["buffers"] * (1 + threshold):
+        found.append(
+            f"{summary.name}: buffers grew from {baseline['buffers']} "
+            f"to {summary.buffers}"
+        )
+    return found
+
+
+def summaries_json(summaries: list[PlanSummary]) -> dict[str, dict]:
+    return {summary.name: asdict(summary) for summary in summaries}
+
+
+@dataclass
+class RouteStats:
+    route: str
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies)
+
+    def percentile(self, percentile: int) -> float:
+        if self.count < 2:
+            return self.latencies[0] if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100)[percentile - 1]
+
+    def summary(self, duration: float) -> dict:
+        return {
+            "route": self.route,
+            "requests": self.count,
+            "error_rate": self.errors / self.count if self.count else 0.0,
+            "throughput": self.count / duration if duration > 0 else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+        }
+
+
+@dataclass
+class LoadReport:
+    duration: float
+    routes: dict[str, RouteStats]
+
+    def summaries(self) -> list[dict]:
+        return [stats.summary(self.duration) for stats in self.routes.values()]
+
+    def format(self) -> str:
+        header = (
+            f"{'route':<40} {'requests':>8} {'errors':>7} {'req/s':>8} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        )
+        lines = [header]
+        lines += [
+            f"{summary['route']:<40} {summary['requests']:>8} "
+            f"{summary['error_rate']:>7.2%} {summary['throughput']:>8.1f} "
+            f"{summary['p50_ms']:>8.2f} {summary['p95_ms']:>8.2f} "
+            f"{summary['p99_ms']:>8.2f}"
+            for summary in self.summaries()
+        ]
+        return "\n".join(lines)
+
+
+def cbs_requests(gm_codes: list[str], count: int) -> list[tuple[str, str]]:
+    """A mix of (route, url) requests over the given gemeenten"""
+    rng = random.Random("workshop")  # noqa: S311
+    return [
+        ("/heartbeat", f"/{HEARTBEAT}")
+        if rng.random() < 0.1
+        else (
+            "/cbs/{gm_code}/aantal-woningen",
+            f"/{CBS}/{rng.choice(gm_codes)}/aantal-woningen",
+        )
+        for _ in range(count)
+    ]
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    requests: list[tuple[str, str]],
+    concurrency: int,
+) -> LoadReport:
+    """Send the (route, url) requests with at most `concurrency` in flight"""
+    queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+    routes: dict[str, RouteStats] = {}
+
+    async def worker() -> None:
+        while not queue.empty():
+            route, url = queue.get_nowait()
+            stats = routes.setdefault(route, RouteStats(route))
+            start = time.perf_counter()
+            try:
+                response = await client.get(url)
+                failed = response.is_error
+            except httpx.HTTPError:
+                failed = True
+            stats.latencies.append(time.perf_counter() - start)
+            stats.errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return LoadReport(time.perf_counter() - start, routes)
+
+
+def main(
+    base_url: str,
+    gm_codes: Annotated[list[str], typer.Argument()],
+    requests: int = 10000,
+    concurrency: int = 20,
+):
+    """
+    Load test a running uvicorn instead of the app in-process:
+
+        python -m tests.benchmarks.utils http://localhost:8080/api GM0202 GM0344
+    """
+
+    async def run() -> LoadReport:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            return await run_load(client, cbs_requests(gm_codes, requests), concurrency)
+
+    typer.echo(asyncio.run(run()).format())
+
+
+if __name__ == "__main__":
+    typer.run(main)
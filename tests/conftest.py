@@ -1,5 +1,6 @@
 from collections.abc import Iterator
 from datetime import date
+from pathlib import Path
 
 import pandas as pd
 import pytest
@@ -35,11 +36,77 @@ def fixture_configure_structlog(log_output: LogCapture):
     structlog.configure(processors=[log_output])
 
 
-def pytest_collection_modifyitems(config: Config, items):  # noqa: ANN001, ARG001
-    # any tests not marked will be marked as 'unit'
+def pytest_addoption(parser: pytest.Parser):
+    group = parser.getgroup("benchmark")
+    group.addoption(
+        "--benchmark",
+        action="store_true",
+        help="Run the tests marked as benchmark, these are skipped by default.",
+    )
+    group.addoption(
+        "--benchmark-rows",
+        default="10000,100000,1000000",
+        help="Comma separated input sizes to benchmark.",
+    )
+    group.addoption(
+        "--benchmark-save",
+        type=Path,
+        default=Path(".benchmarks/latest.json"),
+        help="Write the benchmark results as JSON to this path.",
+    )
+    group.addoption(
+        "--benchmark-compare",
+        type=Path,
+        default=None,
+        help="Fail benchmarks that regressed compared to this saved baseline.",
+    )
+    group.addoption(
+        "--benchmark-threshold",
+        type=float,
+        default=0.2,
+        help="Allowed relative regression in rows/sec and peak memory.",
+    )
+    group.addoption(
+        "--load-rows",
+        type=int,
+        default=100_000,
+        help="Rows of fake data seeded for the API load tests.",
+    )
+    group.addoption(
+        "--load-requests",
+        type=int,
+        default=5000,
+        help="Requests sent per API load test.",
+    )
+    group.addoption(
+        "--load-concurrency",
+        type=int,
+        default=20,
+        help="Concurrent requests in flight during the API load tests, every "
+        "request holds a connection so keep it below max_connections.",
+    )
+    group.addoption(
+        "--plan-rows",
+        type=int,
+        default=110_000,
+        help="Rows of fake data seeded for the query plan tests.",
+    )
+    group.addoption(
+        "--plan-baseline",
+        type=Path,
+        default=None,
+        help="Fail query plans that changed compared to this saved baseline.",
+    )
+
+
+def pytest_collection_modifyitems(config: Config, items):  # noqa: ANN001
+    skip_benchmark = pytest.mark.skip(reason="benchmarks only run with --benchmark")
     for item in items:
+        # any tests not marked will be marked as 'unit'
         if not any(item.iter_markers()):
             item.add_marker("unit")
+        if "benchmark" in item.keywords and not config.getoption("--benchmark"):
+            item.add_marker(skip_benchmark)
 
 
 @pytest.fixture(autouse=True)
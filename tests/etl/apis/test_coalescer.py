@@ -0,0 +1,84 @@
+import asyncio
+from http import HTTPStatus
+
+import httpx
+import pytest
+
+from etl.apis.coalescer import RequestCoalescer
+from etl.apis.rest_client import AsyncRestClient
+from tests.etl.utils import GEREALISEERDE_WONINGEN, FakeCbsServer, fixed
+
+
+class TestRequestCoalescer:
+    @pytest.fixture(autouse=True)
+    def _assign_url_to_class(self, fake_cbs: FakeCbsServer):
+        fake_cbs.config.latency = fixed(0.05)
+        self.url = f"{fake_cbs.url}/{GEREALISEERDE_WONINGEN}/TypedDataSet?$top=1"
+
+    def send_concurrently(
+        self, client: AsyncRestClient, urls: list[str]
+    ) -> list[httpx.Response]:
+        return asyncio.run(
+            client.execute_tasks_in_batches(
+                [[client.send_request(url, include_hostname=False) for url in urls]]
+            )
+        )
+
+    def test_should_share_concurrent_identical_requests(self, fake_cbs: FakeCbsServer):
+        coalescer = RequestCoalescer()
+        client = AsyncRestClient(coalescer=coalescer)
+
+        responses = self.send_concurrently(client, [self.url] * 20)
+
+        assert fake_cbs.api.requests[HTTPStatus.OK] == 1
+        assert coalescer.stats.coalesced == 19
+        assert (
+            len({response.json()["value"][0]["RegioS"] for response in responses}) == 1
+        )
+
+    def test_should_memoize_responses_for_the_run(self, fake_cbs: FakeCbsServer):
+        coalescer = RequestCoalescer()
+        client = AsyncRestClient(coalescer=coalescer)
+
+        self.send_concurrently(client, [self.url])
+        self.send_concurrently(client, [self.url, f"{self.url}&$skip=1"])
+
+        assert fake_cbs.api.requests[HTTPStatus.OK] == 2
+        assert coalescer.stats.memo_hits == 1
+
+    def test_should_not_memoize_after_ttl(self, fake_cbs: FakeCbsServer):
+        client = AsyncRestClient(coalescer=RequestCoalescer(ttl=0))
+
+        self.send_concurrently(client, [self.url])
+        self.send_concurrently(client, [self.url])
+
+        assert fake_cbs.api.requests[HTTPStatus.OK] == 2
+
+    def test_should_not_memoize_errors(self, fake_cbs: FakeCbsServer):
+        fake_cbs.config.faults.append(HTTPStatus.INTERNAL_SERVER_ERROR)
+        client = AsyncRestClient(coalescer=RequestCoalescer())
+
+        with pytest.raises(httpx.HTTPStatusError):
+            self.send_concurrently(client, [self.url])
+        self.send_concurrently(client, [self.url])
+
+        assert fake_cbs.api.requests[HTTPStatus.OK] == 1
+
+    def test_should_raise_error_in_every_waiter(self):
+        coalescer = RequestCoalescer()
+
+        async def fail() -> httpx.Response:
+            await asyncio.sleep(0.01)
+            msg = "refused"
+            raise httpx.ConnectError(msg)
+
+        async def run_all() -> list:
+            return await asyncio.gather(
+                *(coalescer.run("GET url", fail) for _ in range(3)),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run_all())
+
+        assert all(isinstance(result, httpx.ConnectError) for result in results)
+        assert coalescer.stats.sent == 1
@@ -0,0 +1,76 @@
+import asyncio
+import time
+from http import HTTPStatus
+
+from etl.apis.credentials import CredentialProvider, Credentials
+from etl.apis.rest_client import AsyncRestClient
+from tests.etl.utils import GEREALISEERDE_WONINGEN, FakeCbsServer
+
+
+def token_provider(
+    refresh_margin: float = 60.0, ttl: float = 3600
+) -> CredentialProvider:
+    tokens = iter(f"token-{i}" for i in range(1, 100))
+
+    async def fetch() -> Credentials:
+        await asyncio.sleep(0.01)
+        return Credentials(
+            {"Authorization": f"Bearer {next(tokens)}"}, expires_at=time.time() + ttl
+        )
+
+    return CredentialProvider(fetch, refresh_margin=refresh_margin)
+
+
+class TestCredentialProvider:
+    def test_should_fetch_once_for_concurrent_callers(self):
+        provider = token_provider()
+
+        async def get_all() -> list[Credentials]:
+            return await asyncio.gather(*(provider.get() for _ in range(50)))
+
+        credentials = asyncio.run(get_all())
+
+        assert provider.refreshes == 1
+        assert len({id(credential) for credential in credentials}) == 1
+
+    def test_should_refresh_proactively_before_expiry(self):
+        provider = token_provider(refresh_margin=60, ttl=30)
+
+        first = asyncio.run(provider.get())
+        second = asyncio.run(provider.get())
+
+        assert provider.refreshes == 2
+        assert first != second
+
+    def test_should_not_refresh_already_replaced_credentials(self):
+        provider = token_provider()
+
+        async def refresh_twice() -> None:
+            stale = await provider.get()
+            await provider.refresh(stale=stale)
+            await provider.refresh(stale=stale)
+
+        asyncio.run(refresh_twice())
+
+        assert provider.refreshes == 2
+
+
+class TestAsyncRestClientCredentials:
+    def test_concurrent_unauthorized_requests_should_share_one_refresh(
+        self, fake_cbs: FakeCbsServer
+    ):
+        fake_cbs.config.bearer_token = "token-1"
+        provider = token_provider()
+        provider.credentials = Credentials({"Authorization": "Bearer expired"})
+        client = AsyncRestClient(credentials=provider)
+        url = f"{fake_cbs.url}/{GEREALISEERDE_WONINGEN}/TypedDataSet?$top=1"
+
+        responses = asyncio.run(
+            client.execute_tasks_in_batches(
+                [[client.send_request(url, retries=1) for _ in range(50)]]
+            )
+        )
+
+        assert provider.refreshes == 1
+        assert {response.status_code for response in responses} == {HTTPStatus.OK}
+        assert fake_cbs.api.requests[HTTPStatus.UNAUTHORIZED] == 50
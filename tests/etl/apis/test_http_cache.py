@@ -0,0 +1,105 @@
+from http import HTTPStatus
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from httpx import Request, Response
+
+from etl.apis.http_cache import HttpCache
+from etl.apis.rest_client import SyncRestClient
+
+URL = "https://opendata.cbs.nl/ODataApi/odata/81955NED/TypedDataSet"
+
+
+def ok_response(url: str = URL, headers: dict | None = None) -> Response:
+    return Response(
+        HTTPStatus.OK,
+        json={"value": [{"RegioS": "GM1680", "Nieuwbouw_2": 3}]},
+        headers=headers,
+        request=Request("GET", url),
+    )
+
+
+class TestHttpCache:
+    @pytest.fixture(autouse=True)
+    def _assign_cache_to_class(self, tmp_path: Path):
+        self.cache = HttpCache(tmp_path, ttl=60)
+
+    def test_should_store_compressed_content_addressed_bodies(self):
+        self.cache.store(URL, ok_response())
+        self.cache.store(f"{URL}?other", ok_response())
+
+        assert len(list((self.cache.directory / "objects").rglob("*.gz"))) == 1
+        entry = self.cache.lookup(URL)
+        assert self.cache.response(entry).json() == ok_response().json()
+
+    def test_should_persist_index_between_instances(self):
+        self.cache.store(URL, ok_response(headers={"ETag": '"v1"'}))
+
+        entry = HttpCache(self.cache.directory).lookup(URL)
+
+        assert entry.etag == '"v1"'
+
+    def test_should_use_ttl_when_no_validators(self):
+        self.cache.store(URL, ok_response())
+        entry = self.cache.lookup(URL)
+
+        assert self.cache.is_fresh(entry)
+        entry.stored_at -= 61
+        assert not self.cache.is_fresh(entry)
+
+    def test_should_always_revalidate_entries_with_validators(self):
+        self.cache.store(URL, ok_response(headers={"Last-Modified": "yesterday"}))
+        entry = self.cache.lookup(URL)
+
+        assert not self.cache.is_fresh(entry)
+        assert HttpCache.conditional_headers(entry) == {
+            "If-Modified-Since": "yesterday"
+        }
+
+    def test_should_not_store_errors(self):
+        self.cache.store(URL, Response(HTTPStatus.INTERNAL_SERVER_ERROR))
+
+        assert self.cache.lookup(URL) is None
+        assert self.cache.stats.misses == 1
+
+    def test_should_evict_least_recently_used(self, tmp_path: Path):
+        cache = HttpCache(tmp_path / "small", max_bytes=1)
+        cache.store(URL, ok_response())
+
+        assert cache.lookup(URL) is None
+        assert cache.stats.evictions == 1
+        assert not list((cache.directory / "objects").rglob("*.gz"))
+
+
+class TestSyncRestClientCache:
+    @pytest.fixture(autouse=True)
+    def _assign_client_to_class(self, tmp_path: Path):
+        self.cache = HttpCache(tmp_path)
+        self.client = SyncRestClient(cache=self.cache)
+
+    @patch("etl.apis.rest_client.httpx.get")
+    def test_should_revalidate_with_etag(self, httpx_get: MagicMock):
+        httpx_get.side_effect = [
+            ok_response(headers={"ETag": '"v1"'}),
+            Response(HTTPStatus.NOT_MODIFIED, request=Request("GET", URL)),
+        ]
+
+        first = self.client.send_request(URL, include_hostname=False)
+        second = self.client.send_request(URL, include_hostname=False)
+
+        assert second.status_code == HTTPStatus.OK
+        assert second.json() == first.json()
+        assert httpx_get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+        assert self.cache.stats.revalidated == 1
+
+    @patch("etl.apis.rest_client.httpx.get")
+    def test_should_serve_fresh_entries_without_request(self, httpx_get: MagicMock):
+        httpx_get.return_value = ok_response()
+
+        self.client.send_request(URL, include_hostname=False)
+        response = self.client.send_request(URL, include_hostname=False)
+
+        assert response.status_code == HTTPStatus.OK
+        assert httpx_get.call_count == 1
+        assert self.cache.stats.hits == 1
@@ -0,0 +1,111 @@
+import asyncio
+from functools import partial
+from http import HTTPStatus
+
+import httpx
+
+from etl.apis.limiter import AdaptiveLimiter
+from etl.apis.rest_client import AsyncRestClient
+from tests.etl.utils import GEREALISEERDE_WONINGEN, FakeCbsServer, fixed
+
+
+def send_all(limiter: AdaptiveLimiter, statuses: list[HTTPStatus]) -> int:
+    """Send a request per status concurrently, returns the peak in flight"""
+    peak = 0
+
+    async def send(status: HTTPStatus) -> httpx.Response:
+        nonlocal peak
+        peak = max(peak, limiter.in_flight)
+        await asyncio.sleep(0.001)
+        return httpx.Response(status)
+
+    async def run() -> None:
+        await asyncio.gather(
+            *(limiter.run(partial(send, status)) for status in statuses)
+        )
+
+    asyncio.run(run())
+    return peak
+
+
+class TestAdaptiveLimiter:
+    def test_should_not_exceed_the_limit(self):
+        limiter = AdaptiveLimiter(limit=3, maximum=3)
+
+        peak = send_all(limiter, [HTTPStatus.OK] * 50)
+
+        assert peak == 3
+        assert limiter.in_flight == 0
+
+    def test_should_increase_additively_on_healthy_responses(self):
+        limiter = AdaptiveLimiter(limit=2)
+
+        send_all(limiter, [HTTPStatus.OK] * 20)
+
+        assert 4 <= limiter.current_limit <= 7
+        assert limiter.stats.decreases == 0
+
+    def test_should_decrease_multiplicatively_on_congestion(self):
+        limiter = AdaptiveLimiter(limit=16, backoff=0.5)
+
+        send_all(limiter, [HTTPStatus.TOO_MANY_REQUESTS])
+        assert limiter.current_limit == 8
+
+        send_all(limiter, [HTTPStatus.SERVICE_UNAVAILABLE])
+        assert limiter.current_limit == 4
+
+        send_all(limiter, [HTTPStatus.REQUEST_TIMEOUT] * 3)
+        assert limiter.current_limit == 2
+
+    def test_should_decrease_once_per_round_of_failures(self):
+        limiter = AdaptiveLimiter(limit=8)
+
+        send_all(limiter, [HTTPStatus.TOO_MANY_REQUESTS] * 8)
+
+        assert limiter.current_limit == 4
+        assert limiter.stats.congested == 8
+
+    def test_should_not_go_below_the_minimum(self):
+        limiter = AdaptiveLimiter(limit=2, minimum=1)
+
+        for _ in range(5):
+            send_all(limiter, [HTTPStatus.TOO_MANY_REQUESTS])
+
+        assert limiter.current_limit == 1
+
+    def test_should_not_increase_on_slow_responses(self):
+        limiter = AdaptiveLimiter(limit=2, latency_threshold=0)
+
+        send_all(limiter, [HTTPStatus.OK] * 20)
+
+        assert limiter.current_limit == 2
+
+    def test_should_converge_on_the_concurrency_upstream_tolerates(
+        self, fake_cbs: FakeCbsServer
+    ):
+        fake_cbs.config.latency = fixed(0.05)
+        fake_cbs.config.max_concurrency = 8
+        url = f"{fake_cbs.url}/{GEREALISEERDE_WONINGEN}/TypedDataSet?$top=1"
+        limiter = AdaptiveLimiter(limit=2)
+        client = AsyncRestClient(limiter=limiter)
+
+        responses = asyncio.run(
+            client.execute_tasks_in_batches(
+                [
+                    [
+                        client.send_request(
+                            url, check_status=False, include_hostname=False
+                        )
+                        for _ in range(200)
+                    ]
+                ]
+            )
+        )
+
+        throttled = sum(
+            response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+            for response in responses
+        )
+        assert limiter.stats.peak_limit >= 8
+        assert limiter.current_limit <= 3 * 8
+        assert throttled < len(responses) * 0.2
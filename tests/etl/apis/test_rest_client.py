@@ -0,0 +1,208 @@
+import asyncio
+import time
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from http import HTTPStatus
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from httpx import Request, Response
+
+from etl.apis.checkpoint import PaginationCheckpoint
+from etl.apis.rest_client import AsyncRestClient, RestClient, SyncRestClient
+from shared.settings import settings
+from tests.etl.utils import GEREALISEERDE_WONINGEN, FakeCbsServer, fixed
+
+
+def endpoint(skip: int, limit: int) -> str:
+    return f"https://example.com/items?$skip={skip}&$top={limit}"
+
+
+def page_response(skip: int) -> Response:
+    return Response(
+        HTTPStatus.OK,
+        json={"value": [{"id": skip}] if skip < 30 else []},
+        request=Request("GET", endpoint(skip, 10)),
+    )
+
+
+def get_page(url: str, **kwargs) -> Response:  # noqa: ARG001
+    return page_response(int(httpx.URL(url).params["$skip"]))
+
+
+@pytest.mark.parametrize(
+    ("retry_after", "expected"),
+    [
+        ("3", 3.0),
+        (None, settings.RETRY_AFTER_DEFAULT_SECONDS),
+        ("soon", settings.RETRY_AFTER_DEFAULT_SECONDS),
+        ("86400", settings.RETRY_AFTER_MAX_SECONDS),
+        (format_datetime(datetime.now(UTC) - timedelta(hours=1), usegmt=True), 0.0),
+    ],
+)
+def test_retry_after_should_parse_seconds_and_dates(
+    retry_after: str | None, expected: float
+):
+    headers = {"Retry-After": retry_after} if retry_after is not None else {}
+
+    delay = RestClient.retry_after(
+        Response(HTTPStatus.TOO_MANY_REQUESTS, headers=headers)
+    )
+
+    assert delay == expected
+
+
+class TestGetPaginatedResults:
+    @pytest.fixture(autouse=True)
+    def _assign_client_to_class(self, tmp_path: Path):
+        self.client = SyncRestClient()
+        self.checkpoint = PaginationCheckpoint.for_request(tmp_path, endpoint, 10)
+
+    def paginate(self) -> list[dict]:
+        return self.client.get_paginated_results(
+            endpoint,
+            break_condition=lambda result: not result["value"],
+            limit=10,
+            retries=0,
+            checkpoint=self.checkpoint,
+        )
+
+    @patch("etl.apis.rest_client.httpx.get")
+    def test_should_resume_from_checkpoint_after_failure(self, httpx_get: MagicMock):
+        assert self.checkpoint.path is not None
+        httpx_get.side_effect = [
+            page_response(0),
+            page_response(10),
+            Response(HTTPStatus.BAD_GATEWAY, request=Request("GET", endpoint(20, 10))),
+        ]
+        with pytest.raises(httpx.HTTPStatusError):
+            self.paginate()
+        assert self.checkpoint.path.exists()
+
+        httpx_get.reset_mock(side_effect=True)
+        httpx_get.side_effect = get_page
+        results = self.paginate()
+
+        assert [result["value"][0]["id"] for result in results] == [0, 10, 20]
+        assert [call.args[0] for call in httpx_get.call_args_list] == [
+            endpoint(20, 10),
+            endpoint(30, 10),
+        ]
+        assert not self.checkpoint.path.exists()
+
+    def test_should_ignore_partially_written_page(self):
+        self.checkpoint.add({"value": [{"id": 0}]}, limit=10)
+        with self.checkpoint.path.open("a") as file:
+            file.write('{"skip": 20, "resu')
+
+        self.checkpoint.resume(skip=0)
+
+        assert self.checkpoint.skip == 10
+        assert len(self.checkpoint.results) == 1
+
+    def test_should_read_back_pages_added_after_a_partially_written_page(self):
+        self.checkpoint.add({"value": [{"id": 0}]}, limit=10)
+        with self.checkpoint.path.open("a") as file:
+            file.write('{"skip": 20, "resu')
+        self.checkpoint.resume(skip=0)
+
+        self.checkpoint.add({"value": [{"id": 10}]}, limit=10)
+        self.checkpoint.add({"value": [{"id": 20}]}, limit=10)
+        self.checkpoint.resume(skip=0)
+
+        assert self.checkpoint.skip == 30
+        assert len(self.checkpoint.results) == 3
+
+    @patch("etl.apis.rest_client.httpx.get")
+    def test_should_paginate_in_memory_without_checkpoint(self, httpx_get: MagicMock):
+        httpx_get.side_effect = get_page
+
+        results = self.client.get_paginated_results(
+            endpoint,
+            break_condition=lambda result: not result["value"],
+            limit=10,
+            retries=0,
+        )
+
+        assert len(results) == 3
+
+
+class TestRestClientsAgainstFakeCbs:
+    @pytest.fixture(autouse=True)
+    def _assign_url_to_class(self, fake_cbs: FakeCbsServer):
+        self.url = f"{fake_cbs.url}/{GEREALISEERDE_WONINGEN}/TypedDataSet"
+
+    def test_should_retry_server_errors(self, fake_cbs: FakeCbsServer):
+        fake_cbs.config.faults.extend([HTTPStatus.INTERNAL_SERVER_ERROR] * 2)
+
+        response = SyncRestClient().send_request(
+            self.url, retries=2, include_hostname=False
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert fake_cbs.api.requests[HTTPStatus.INTERNAL_SERVER_ERROR] == 2
+
+    def test_should_retry_unavailable_responses(self, fake_cbs: FakeCbsServer):
+        fake_cbs.config.faults.append(HTTPStatus.SERVICE_UNAVAILABLE)
+
+        response = SyncRestClient().send_request(
+            self.url, retries=1, include_hostname=False
+        )
+
+        assert response.status_code == HTTPStatus.OK
+
+    def test_async_client_should_retry_rate_limited_requests_after_retry_after(
+        self, fake_cbs: FakeCbsServer
+    ):
+        fake_cbs.config.faults.append(HTTPStatus.TOO_MANY_REQUESTS)
+        fake_cbs.config.retry_after = 1
+        client = AsyncRestClient()
+
+        start = time.perf_counter()
+        [response] = asyncio.run(
+            client.execute_tasks_in_batches(
+                [[client.send_request(self.url, retries=1, include_hostname=False)]]
+            )
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert fake_cbs.api.requests[HTTPStatus.TOO_MANY_REQUESTS] == 1
+        assert time.perf_counter() - start >= 1
+
+    def test_should_raise_when_retries_are_exhausted(self, fake_cbs: FakeCbsServer):
+        fake_cbs.config.rate_500 = 1.0
+
+        with pytest.raises(httpx.HTTPStatusError):
+            SyncRestClient().send_request(self.url, retries=2, include_hostname=False)
+
+        assert fake_cbs.api.requests[HTTPStatus.INTERNAL_SERVER_ERROR] == 3
+
+    def test_should_paginate_until_no_results(self, fake_cbs: FakeCbsServer):
+        fake_cbs.config.max_page_size = 50
+
+        results = SyncRestClient().get_paginated_results(
+            lambda skip, limit: f"{self.url}?$top={limit}&$skip={skip}",
+            break_condition=lambda result: not result["value"],
+            limit=50,
+            retries=0,
+        )
+
+        total = len(fake_cbs.config.datasets[GEREALISEERDE_WONINGEN])
+        assert sum(len(result["value"]) for result in results) == total
+
+    def test_async_client_should_send_requests_concurrently(
+        self, fake_cbs: FakeCbsServer
+    ):
+        fake_cbs.config.latency = fixed(0.1)
+        client = AsyncRestClient()
+        batch = [
+            client.send_request(self.url, include_hostname=False) for _ in range(20)
+        ]
+
+        start = time.perf_counter()
+        responses = asyncio.run(client.execute_tasks_in_batches([batch]))
+
+        assert len(responses) == 20
+        assert time.perf_counter() - start < 20 * 0.1 / 2
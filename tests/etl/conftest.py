@@ -1,8 +1,17 @@
+from collections.abc import Iterator
 from unittest.mock import MagicMock
 
 import pytest
 
 from etl.apis.rest_client import AsyncRestClient, SyncRestClient
+from tests.etl.utils import (
+    GEREALISEERDE_WONINGEN,
+    FakeCbsApi,
+    FakeCbsConfig,
+    FakeCbsServer,
+    gerealiseerde_woningen_dataset,
+    serve,
+)
 
 
 @pytest.fixture
@@ -13,3 +22,20 @@ def sync_client() -> MagicMock:
 @pytest.fixture
 def async_client() -> MagicMock:
     return MagicMock(spec=AsyncRestClient)
+
+
+@pytest.fixture
+def fake_cbs() -> Iterator[FakeCbsServer]:
+    """
+    The fake CBS api on a free port, the config can be changed by the test
+    while the server runs.
+    """
+    config = FakeCbsConfig(
+        datasets={
+            GEREALISEERDE_WONINGEN: gerealiseerde_woningen_dataset(
+                [2023, 2024], ["GM0014", "GM0034", "GM0363"]
+            )
+        }
+    )
+    with serve(FakeCbsApi(config)) as server:
+        yield server
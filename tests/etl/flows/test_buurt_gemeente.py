@@ -0,0 +1,75 @@
+from pathlib import Path
+
+import pytest
+from sqlmodel import Session
+
+from etl.flows.bulk import BulkLoader, OrphanedRowsError
+from etl.flows.buurt_gemeente import (
+    BuurtExtractor,
+    GemeenteExtractor,
+    run_buurt_gemeente_flow,
+)
+from models.v1.buurt_gemeente import Buurt, Gemeente
+from models.v1.cbs_aantal_woningen import CbsAantalWoningen
+from shared.settings import settings
+from tests.etl.utils import get_row_count
+
+
+def write_buurten(path: Path, gm_codes: list[str]) -> Path:
+    rows = "\n".join(
+        f'BU{i:06},{gm_code},"POLYGON (({i} 0, {i + 1} 0, {i + 1} 1, {i} 0))"'
+        for i, gm_code in enumerate(gm_codes)
+    )
+    path.write_text(f"buurtcode,gemeentecode,WKT\n{rows}\n")
+    return path
+
+
+class TestExtractors:
+    def test_should_read_gemeenten_in_chunks(self):
+        chunks = list(
+            GemeenteExtractor(settings.GEMEENTEN_CSV, chunk_size=100).extract()
+        )
+
+        assert len(chunks) == 4
+        assert {"gm_code": "GM0059", "gm_naam": "Achtkarspelen"} in chunks[0]
+
+    def test_should_read_no_buurten_without_file(self):
+        assert list(BuurtExtractor(None).extract()) == []
+
+
+def test_load_order_should_put_referenced_tables_first():
+    order = BulkLoader.load_order([Buurt, CbsAantalWoningen, Gemeente])
+
+    assert order.index(Gemeente) < order.index(Buurt)
+
+
+@pytest.mark.docker
+class TestBuurtGemeenteFlow:
+    def test_should_load_gemeenten_and_buurten(self, session: Session, tmp_path: Path):
+        buurten = write_buurten(
+            tmp_path / "buurten.csv", ["GM0014", "GM0014", "GM0363"]
+        )
+
+        run_buurt_gemeente_flow(
+            GemeenteExtractor(settings.GEMEENTEN_CSV),
+            BuurtExtractor(buurten, chunk_size=2),
+            BulkLoader(session),
+        )
+
+        assert get_row_count(session, Gemeente) == 342
+        assert get_row_count(session, Buurt) == 3
+        gemeente = session.get(Gemeente, "GM0088")
+        assert gemeente is not None
+        assert gemeente.gm_naam == "Schiermonnikoog"
+
+    def test_should_raise_on_buurten_of_unknown_gemeente(
+        self, session: Session, tmp_path: Path
+    ):
+        buurten = write_buurten(tmp_path / "buurten.csv", ["GM0014", "GM9999"])
+
+        with pytest.raises(OrphanedRowsError, match="1 rows"):
+            run_buurt_gemeente_flow(
+                GemeenteExtractor(settings.GEMEENTEN_CSV),
+                BuurtExtractor(buurten),
+                BulkLoader(session),
+            )
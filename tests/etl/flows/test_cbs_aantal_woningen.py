@@ -1,4 +1,5 @@
 from datetime import date
+from pathlib import Path
 from unittest.mock import MagicMock
 
 import pandas as pd
@@ -14,6 +15,9 @@ from etl.flows.cbs_aantal_woningen import (
 )
 from models.faker_models.db.fake_models import GemeenteFactory
 from models.v1.cbs_aantal_woningen import CbsAantalWoningen
+from models.v1.cbs_aggregates import CbsAantalWoningenPerJaar, CbsAantalWoningenTrend
+from models.v1.etl_metadata import TableLoad
+from shared.snapshot import Snapshot
 from tests.etl.utils import get_row_count
 
 
@@ -93,6 +97,145 @@ class TestCbsAantalWoningenFlow:
 
         assert get_row_count(session, CbsAantalWoningen) == 1
 
+    @pytest.fixture
+    def extractor(self) -> MagicMock:
+        extractor = MagicMock(spec=CbsAantalWoningenExtractor)
+        extractor.extract.return_value = pd.DataFrame(
+            {"gm_code": ["gm1", "gm1"], "jaar": [2023, 2024], "aantal_woningen": [1, 2]}
+        )
+        return extractor
+
+    def test_should_skip_load_when_nothing_changed(
+        self, session: Session, extractor: MagicMock
+    ):
+        for _ in range(2):
+            run_cbs_aantal_woningen_flow(extractor, SqlmodelLoader(session))
+
+        table_load = session.get(TableLoad, "source.cbs_aantal_woningen")
+        assert table_load is not None
+        assert table_load.version == 1
+
+    def test_should_only_replace_changed_years(
+        self, session: Session, extractor: MagicMock
+    ):
+        loader = MagicMock(wraps=SqlmodelLoader(session))
+        loader.session = session
+        run_cbs_aantal_woningen_flow(extractor, loader)
+
+        extractor.extract.return_value = pd.DataFrame(
+            {"gm_code": ["gm1", "gm1"], "jaar": [2023, 2024], "aantal_woningen": [1, 3]}
+        )
+        run_cbs_aantal_woningen_flow(extractor, loader)
+
+        assert loader.recreate_and_load.call_count == 1
+        assert [call.args[1] for call in loader.replace_partition.call_args_list] == [
+            2024
+        ]
+        row = session.get(CbsAantalWoningen, ("gm1", 2024))
+        assert row is not None
+        assert row.aantal_woningen == 3
+
+    def test_should_keep_years_without_extracted_rows(
+        self, session: Session, extractor: MagicMock
+    ):
+        run_cbs_aantal_woningen_flow(extractor, SqlmodelLoader(session))
+
+        extractor.extract.return_value = pd.DataFrame(
+            {"gm_code": ["gm1"], "jaar": [2023], "aantal_woningen": [5]}
+        )
+        run_cbs_aantal_woningen_flow(
+            extractor, SqlmodelLoader(session), years=[2023, 2024]
+        )
+
+        extracted = session.get(CbsAantalWoningen, ("gm1", 2023))
+        kept = session.get(CbsAantalWoningen, ("gm1", 2024))
+        assert extracted is not None
+        assert extracted.aantal_woningen == 5
+        assert kept is not None
+        assert kept.aantal_woningen == 2
+
+    def test_should_recreate_table_when_years_change(
+        self, session: Session, extractor: MagicMock
+    ):
+        run_cbs_aantal_woningen_flow(extractor, SqlmodelLoader(session))
+
+        extractor.extract.return_value = pd.DataFrame(
+            {"gm_code": ["gm1"], "jaar": [2024], "aantal_woningen": [2]}
+        )
+        run_cbs_aantal_woningen_flow(extractor, SqlmodelLoader(session))
+
+        assert session.get(CbsAantalWoningen, ("gm1", 2023)) is None
+
+    def test_should_load_unchanged_years_when_forced(
+        self, session: Session, extractor: MagicMock
+    ):
+        run_cbs_aantal_woningen_flow(extractor, SqlmodelLoader(session))
+        run_cbs_aantal_woningen_flow(extractor, SqlmodelLoader(session), force=True)
+
+        table_load = session.get(TableLoad, "source.cbs_aantal_woningen")
+        assert table_load is not None
+        assert table_load.version == 2
+
+    def test_should_publish_snapshot_after_load(self, session: Session, tmp_path: Path):
+        extractor = MagicMock(spec=CbsAantalWoningenExtractor)
+        extractor.extract.return_value = pd.DataFrame(
+            {"gm_code": ["gm1", "gm2"], "jaar": [2023, 2024], "aantal_woningen": [1, 2]}
+        )
+        path = tmp_path / "cbs_aantal_woningen.bin"
+
+        run_cbs_aantal_woningen_flow(
+            extractor, SqlmodelLoader(session), [2024], snapshot=path
+        )
+
+        snapshot = Snapshot(path)
+        table_load = session.get(TableLoad, "source.cbs_aantal_woningen")
+        assert table_load is not None
+        assert snapshot.version == table_load.version
+        assert snapshot.get("gm2", 2024) == 2
+        assert snapshot.get("gm1", 2023) is None
+
+    def test_should_bump_table_version_on_every_load(self, session: Session):
+        loader = SqlmodelLoader(session)
+        for aantal_woningen in (1, 2):
+            loader.recreate_and_load(
+                [CbsAantalWoningen],
+                [
+                    CbsAantalWoningen(
+                        gm_code="gm1", jaar=2024, aantal_woningen=aantal_woningen
+                    )
+                ],
+            )
+
+        table_load = session.get(TableLoad, "source.cbs_aantal_woningen")
+        assert table_load is not None
+        assert table_load.version == 2
+
+    def test_should_refresh_aggregates_after_every_load(self, session: Session):
+        loader = SqlmodelLoader(session)
+        loader.recreate_and_load(
+            [CbsAantalWoningen],
+            [
+                CbsAantalWoningen(gm_code="gm1", jaar=2023, aantal_woningen=10),
+                CbsAantalWoningen(gm_code="gm2", jaar=2023, aantal_woningen=30),
+            ],
+        )
+        loader.replace_partition(
+            CbsAantalWoningen,
+            2024,
+            [CbsAantalWoningen(gm_code="gm1", jaar=2024, aantal_woningen=15)],
+        )
+
+        trend = session.get(CbsAantalWoningenTrend, ("gm1", 2024))
+        assert trend is not None
+        assert trend.cumulatief_aantal_woningen == 25
+        assert trend.groei == pytest.approx(0.5)
+        eerste = session.get(CbsAantalWoningenTrend, ("gm2", 2023))
+        assert eerste is not None
+        assert eerste.rang == 1
+        per_jaar = session.get(CbsAantalWoningenPerJaar, 2023)
+        assert per_jaar is not None
+        assert per_jaar.aantal_gemeenten == 2
+
     def test_should_not_write_cbs_objects_when_invalid_gm_code(
         self, current_year: int, session: Session
     ):
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+from sqlmodel import Session
+
+from etl.flows.fingerprints import FingerprintStore, fingerprint
+
+
+@pytest.fixture
+def df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "gm_code": ["GM0014", "GM0034", "GM0363"],
+            "jaar": [2024, 2024, 2024],
+            "aantal_woningen": [10, 20, 30],
+        }
+    )
+
+
+class TestFingerprint:
+    def test_should_ignore_row_and_column_order(self, df: pd.DataFrame):
+        shuffled = df.sample(frac=1, random_state=1)[
+            ["jaar", "aantal_woningen", "gm_code"]
+        ]
+
+        assert fingerprint(shuffled) == fingerprint(df)
+
+    def test_should_normalize_values(self, df: pd.DataFrame):
+        normalized = df.assign(
+            gm_code=df["gm_code"] + "  ", aantal_woningen=df["aantal_woningen"] * 1.0
+        )
+
+        assert fingerprint(normalized) == fingerprint(df)
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            lambda df: df.assign(aantal_woningen=[10, 20, 31]),
+            lambda df: df.iloc[:2],
+            lambda df: pd.concat([df, df.iloc[:1]]),
+            lambda df: df.rename(columns={"jaar": "year"}),
+        ],
+    )
+    def test_should_change_with_content(self, df: pd.DataFrame, change):  # noqa: ANN001
+        assert fingerprint(change(df)) != fingerprint(df)
+
+
+@pytest.mark.docker
+class TestFingerprintStore:
+    def test_should_report_changed_partitions(self, session: Session):
+        store = FingerprintStore(session, "source.table")
+        store.save({2023: "a", 2024: "b"})
+
+        assert store.changed({2023: "a", 2024: "c", 2025: "d"}) == [2024, 2025]
+
+    def test_should_replace_all_partitions(self, session: Session):
+        store = FingerprintStore(session, "source.table")
+        store.save({2023: "a", 2024: "b"})
+        FingerprintStore(session, "source.other").save({2023: "a"})
+
+        store.save({2024: "c"}, replace=True)
+
+        assert store.load() == {"2024": "c"}
+        assert FingerprintStore(session, "source.other").load() == {"2023": "a"}
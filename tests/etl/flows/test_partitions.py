@@ -0,0 +1,101 @@
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from etl.flows.base import SqlmodelLoader
+from etl.flows.cbs_aantal_woningen import (
+    CbsAantalWoningenExtractor,
+    run_cbs_aantal_woningen_flow,
+)
+from models.v1.buurt_gemeente import Gemeente
+from models.v1.cbs_aantal_woningen import CbsAantalWoningen
+
+
+def woningen(
+    jaar: int, aantal_woningen: float, count: int = 3
+) -> list[CbsAantalWoningen]:
+    return [
+        CbsAantalWoningen(
+            gm_code=f"GM{i:04}", jaar=jaar, aantal_woningen=aantal_woningen
+        )
+        for i in range(count)
+    ]
+
+
+def partitions(session: Session) -> list[str]:
+    return list(
+        session.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = inhrelid "
+                "WHERE inhparent = 'source.cbs_aantal_woningen'::regclass "
+                "ORDER BY child.relname"
+            )
+        ).scalars()
+    )
+
+
+def totals(session: Session) -> dict[int, float]:
+    return dict(
+        session.exec(
+            select(CbsAantalWoningen.jaar, CbsAantalWoningen.aantal_woningen)
+        ).all()
+    )
+
+
+@pytest.mark.docker
+class TestPartitions:
+    def test_full_load_should_create_partition_per_year(self, session: Session):
+        SqlmodelLoader(session).recreate_and_load(
+            [CbsAantalWoningen], woningen(2023, 1) + woningen(2024, 2)
+        )
+
+        assert partitions(session) == [
+            "cbs_aantal_woningen_2023",
+            "cbs_aantal_woningen_2024",
+            "cbs_aantal_woningen_default",
+        ]
+
+    def test_should_replace_only_the_partition_of_the_year(self, session: Session):
+        loader = SqlmodelLoader(session)
+        loader.recreate_and_load(
+            [CbsAantalWoningen], woningen(2023, 1) + woningen(2024, 2)
+        )
+
+        loader.replace_partition(CbsAantalWoningen, 2024, woningen(2024, 5, count=2))
+
+        assert totals(session) == {2023: 1, 2024: 5}
+        assert len(session.exec(select(CbsAantalWoningen)).all()) == 5
+        assert "cbs_aantal_woningen_2024" in partitions(session)
+
+    def test_should_move_rows_out_of_default_partition(self, session: Session):
+        session.add_all(woningen(2020, 1))
+        session.commit()
+
+        SqlmodelLoader(session).replace_partition(
+            CbsAantalWoningen, 2020, woningen(2020, 3)
+        )
+
+        assert totals(session) == {2020: 3}
+        assert "cbs_aantal_woningen_2020" in partitions(session)
+
+    def test_should_raise_for_unpartitioned_table(self, session: Session):
+        with pytest.raises(ValueError, match="not a partitioned table"):
+            SqlmodelLoader(session).replace_partition(Gemeente, 2024, [])
+
+    def test_flow_should_only_reload_given_years(self, session: Session):
+        SqlmodelLoader(session).recreate_and_load(
+            [CbsAantalWoningen], woningen(2023, 1) + woningen(2024, 2)
+        )
+        extractor = MagicMock(spec=CbsAantalWoningenExtractor)
+        extractor.extract.return_value = pd.DataFrame(
+            {"gm_code": ["GM0001"], "jaar": [2024], "aantal_woningen": [7]}
+        )
+
+        run_cbs_aantal_woningen_flow(extractor, SqlmodelLoader(session), [2024])
+
+        extractor.extract.assert_called_once_with([2024])
+        assert totals(session) == {2023: 1, 2024: 7}
@@ -0,0 +1,91 @@
+from datetime import date
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from etl.apis.cbs import CbsApi
+from etl.flows.cbs_aantal_woningen import CbsAantalWoningenExtractor
+from etl.flows.staging import ParquetStage
+
+
+def records(year: int) -> list[dict]:
+    return [
+        {
+            "Gebruiksfunctie": "A045364",
+            "Perioden": f"{year}MM01",
+            "RegioS": "GM1680",
+            "Nieuwbouw_2": 3,
+        },
+        {
+            "Gebruiksfunctie": "A045364",
+            "Perioden": f"{year}MM02",
+            "RegioS": "GM1680",
+            "Nieuwbouw_2": 4,
+        },
+    ]
+
+
+class TestParquetStage:
+    @pytest.fixture(autouse=True)
+    def _assign_stage_to_class(self, tmp_path: Path):
+        self.stage = ParquetStage(tmp_path, "cbs")
+
+    def test_should_write_hive_partitions(self):
+        path = self.stage.write(records(2024), 2024)
+
+        assert path == self.stage.path / "year=2024" / "part-0.parquet"
+        assert self.stage.partitions() == [2024]
+
+    def test_should_append_batches_as_parts(self):
+        self.stage.write(records(2024), 2024)
+        path = self.stage.write(pd.DataFrame(records(2024)), 2024)
+
+        assert path.name == "part-1.parquet"
+        assert len(self.stage.read()) == 4
+
+    def test_should_read_selected_columns_and_partitions(self):
+        self.stage.write(records(2023), 2023)
+        self.stage.write(records(2024), 2024)
+
+        df = self.stage.read(columns=["RegioS", "Nieuwbouw_2"], partitions=[2024])
+
+        assert list(df.columns) == ["RegioS", "Nieuwbouw_2"]
+        assert df["Nieuwbouw_2"].sum() == 7
+
+    def test_should_reset_partition(self):
+        self.stage.write(records(2024), 2024)
+        self.stage.reset(2024)
+
+        assert self.stage.partitions() == []
+        assert self.stage.read(columns=["RegioS"]).empty
+
+
+class TestCbsAantalWoningenExtractorStaging:
+    @pytest.fixture(autouse=True)
+    def _assign_api_to_class(self, tmp_path: Path):
+        self.api = MagicMock(spec=CbsApi)
+        self.api.get_gerealiseerde_woningen_for_year.side_effect = records
+        self.stage = ParquetStage(tmp_path, "cbs_aantal_woningen")
+
+    def test_should_stage_every_extracted_year(self):
+        CbsAantalWoningenExtractor(self.api, stage=self.stage).extract()
+
+        assert len(self.stage.partitions()) == 11
+
+    def test_should_replay_without_calling_api(self):
+        extracted = CbsAantalWoningenExtractor(self.api, stage=self.stage).extract()
+        self.api.reset_mock()
+
+        replayed = CbsAantalWoningenExtractor(
+            self.api, stage=self.stage, replay=True
+        ).extract()
+
+        self.api.get_gerealiseerde_woningen_for_year.assert_not_called()
+        pd.testing.assert_frame_equal(replayed, extracted, check_dtype=False)
+        assert replayed["jaar"].max() == date.today().year
+
+    def test_replay_requires_stage(self):
+        with pytest.raises(ValueError):
+            CbsAantalWoningenExtractor(self.api, replay=True)
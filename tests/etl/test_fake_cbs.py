@@ -0,0 +1,70 @@
+from http import HTTPStatus
+
+import httpx
+import pytest
+
+from etl.apis.cbs import CbsApi
+from tests.etl.utils import GEREALISEERDE_WONINGEN, FakeCbsServer, parse_filter
+
+
+class TestFakeCbs:
+    @pytest.fixture(autouse=True)
+    def _assign_url_to_class(self, fake_cbs: FakeCbsServer):
+        self.url = f"{fake_cbs.url}/{GEREALISEERDE_WONINGEN}/TypedDataSet"
+
+    def test_cbs_api_should_get_filtered_records(self, fake_cbs: FakeCbsServer):
+        results = CbsApi(endpoint=fake_cbs.url).get_gerealiseerde_woningen_for_year(
+            2024
+        )
+
+        assert len(results) == 12 * 3
+        assert {result["RegioS"] for result in results} == {
+            "GM0014",
+            "GM0034",
+            "GM0363",
+        }
+        assert all(result["Perioden"].startswith("2024MM") for result in results)
+
+    def test_should_select_columns(self):
+        response = httpx.get(self.url, params={"$select": "RegioS, Nieuwbouw_2"})
+
+        assert set(response.json()["value"][0]) == {"RegioS", "Nieuwbouw_2"}
+
+    def test_should_page_with_top_and_skip(self, fake_cbs: FakeCbsServer):
+        records = fake_cbs.config.datasets[GEREALISEERDE_WONINGEN]
+
+        response = httpx.get(self.url, params={"$top": 10, "$skip": 5})
+
+        assert response.json()["value"] == records[5:15]
+
+    def test_should_link_next_page_beyond_max_page_size(self, fake_cbs: FakeCbsServer):
+        fake_cbs.config.max_page_size = 100
+
+        body = httpx.get(self.url).json()
+
+        assert len(body["value"]) == 100
+        assert "%24skip=100" in body["odata.nextLink"]
+
+    def test_should_send_retry_after_when_rate_limited(self, fake_cbs: FakeCbsServer):
+        fake_cbs.config.rate_429 = 1.0
+        fake_cbs.config.retry_after = 3
+
+        response = httpx.get(self.url)
+
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert response.headers["Retry-After"] == "3"
+
+    def test_should_reject_unsupported_filter(self):
+        response = httpx.get(self.url, params={"$filter": "Nieuwbouw_2 gt 3"})
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_parse_filter_should_combine_conditions():
+    predicates = parse_filter(
+        "(Gebruiksfunctie eq 'A045364') and (substringof('GM',RegioS))"
+    )
+    record = {"Gebruiksfunctie": "A045364", "RegioS": "GM0014"}
+
+    assert all(predicate(record) for predicate in predicates)
+    assert not all(predicate({**record, "RegioS": "NL01"}) for predicate in predicates)
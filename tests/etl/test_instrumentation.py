@@ -0,0 +1,69 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from structlog.testing import LogCapture
+
+from etl.flows.base import DataframeTransformer
+from etl.instrumentation import ProfileMode, instrument, profiled, span
+from models.v1.cbs_aantal_woningen import CbsAantalWoningen
+
+
+class TestSpan:
+    def test_should_log_duration_rows_and_memory(self, log_output: LogCapture):
+        with span("extract", "test") as current:
+            current.rows = 10
+
+        entry = log_output.entries[-1]
+        assert entry["event"] == "Stage succeeded."
+        assert entry["stage"] == "extract"
+        assert entry["rows"] == 10
+        assert entry["rows_per_sec"] > 0
+        assert entry["peak_rss_mb"] > 0
+
+    def test_should_log_failed_stage(self, log_output: LogCapture):
+        with pytest.raises(RuntimeError), span("load", "test"):
+            raise RuntimeError
+
+        assert log_output.entries[-1]["event"] == "Stage failed."
+
+    def test_should_count_rows_of_argument(self, log_output: LogCapture):
+        @instrument("load", rows_from="objects")
+        def load(objects: list) -> None: ...
+
+        load([1, 2, 3])
+
+        assert log_output.entries[-1]["rows"] == 3
+
+    def test_should_instrument_transformers(self, log_output: LogCapture):
+        df = pd.DataFrame({"gm_code": ["GM1"], "jaar": [2024], "aantal_woningen": [1]})
+
+        DataframeTransformer.transform(CbsAantalWoningen, df)
+
+        entry = log_output.entries[-1]
+        assert entry["stage"] == "transform"
+        assert entry["name"] == "DataframeTransformer.transform"
+        assert entry["rows"] == 1
+
+
+class TestProfiled:
+    def test_cpu_profile_should_dump_stats(self, tmp_path: Path):
+        with profiled(ProfileMode.CPU, "flow", output_dir=tmp_path):
+            sum(range(1000))
+
+        assert len(list(tmp_path.glob("flow-*.prof"))) == 1
+
+    def test_memory_profile_should_log_top_allocations(self, log_output: LogCapture):
+        with profiled(ProfileMode.MEMORY, "flow", top=5):
+            data = [str(i) for i in range(10000)]
+
+        entry = log_output.entries[-1]
+        assert entry["event"] == "Memory profile."
+        assert 0 < len(entry["top"]) <= 5
+        assert data
+
+    def test_should_not_profile_without_mode(self, log_output: LogCapture):
+        with profiled(None, "flow"):
+            pass
+
+        assert not log_output.entries
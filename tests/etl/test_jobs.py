@@ -0,0 +1,198 @@
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import pytest
+from sqlalchemy import Engine, delete, select
+from sqlmodel import Session, col
+
+from etl.jobs import JobFlow, JobQueue, Worker
+from models.v1.etl_metadata import EtlJob, JobStatus
+from shared.engine import get_session
+
+pytestmark = pytest.mark.docker
+
+
+@pytest.fixture
+def queue(engine: Engine) -> Iterator[JobQueue]:
+    """The jobs are committed, so other connections can claim them"""
+    yield JobQueue(engine, worker_id="worker-1", retry_delay=0)
+
+    with Session(engine) as session:
+        session.execute(delete(EtlJob))
+        session.commit()
+
+
+def stored(engine: Engine, job: EtlJob) -> EtlJob:
+    with Session(engine) as session:
+        return session.get_one(EtlJob, job.id)
+
+
+def claimed(queue: JobQueue) -> EtlJob:
+    job = queue.claim()
+    assert job is not None
+    return job
+
+
+def worker(queue: JobQueue, flows: dict[str, JobFlow]) -> Worker:
+    return Worker(queue, flows, session_factory=partial(get_session, testing=True))
+
+
+class TestJobQueue:
+    def test_should_claim_the_oldest_job_and_lease_it(self, queue: JobQueue):
+        first = queue.enqueue("flow", partition="2023")
+        queue.enqueue("flow", partition="2024")
+
+        job = queue.claim()
+
+        assert job is not None
+        assert job.id == first.id
+        assert job.status == JobStatus.RUNNING
+        assert job.attempts == 1
+        assert job.leased_by == "worker-1"
+        assert job.lease_expires_at is not None
+        assert job.heartbeat_at is not None
+        assert job.lease_expires_at > job.heartbeat_at
+
+    def test_should_skip_jobs_locked_by_another_worker(
+        self, engine: Engine, queue: JobQueue
+    ):
+        first = queue.enqueue("flow")
+        second = queue.enqueue("flow")
+
+        with engine.connect() as other:
+            other.execute(
+                select(col(EtlJob.id))
+                .where(col(EtlJob.id) == first.id)
+                .with_for_update()
+            )
+            job = queue.claim()
+
+        assert job is not None
+        assert job.id == second.id
+
+    def test_should_claim_nothing_when_empty(self, queue: JobQueue):
+        assert queue.claim() is None
+
+    def test_should_claim_a_job_again_when_its_lease_expired(
+        self, engine: Engine, queue: JobQueue
+    ):
+        queue.lease = queue.lease * 0
+        queue.enqueue("flow")
+        job = claimed(queue)
+        other = JobQueue(engine, worker_id="worker-2")
+
+        reclaimed = other.claim()
+
+        assert reclaimed is not None
+        assert reclaimed.id == job.id
+        assert reclaimed.attempts == 2
+        assert not queue.heartbeat(job)
+        assert other.heartbeat(reclaimed)
+
+    def test_should_retry_until_the_attempts_are_exhausted(
+        self, engine: Engine, queue: JobQueue
+    ):
+        job = queue.enqueue("flow", max_attempts=2)
+
+        queue.fail(claimed(queue), "first")
+        retried = stored(engine, job)
+        queue.fail(claimed(queue), "second")
+        failed = stored(engine, job)
+
+        assert retried.status == JobStatus.PENDING
+        assert retried.error == "first"
+        assert failed.status == JobStatus.FAILED
+        assert failed.attempts == 2
+
+    def test_should_defer_without_counting_the_attempt(
+        self, engine: Engine, queue: JobQueue
+    ):
+        job = queue.enqueue("flow")
+        queue.defer(claimed(queue), delay=0)
+
+        assert stored(engine, job).status == JobStatus.PENDING
+        assert stored(engine, job).attempts == 0
+
+    def test_should_lock_tables_exclusively(self, queue: JobQueue):
+        with queue.table_locks(["table"], None) as locked:
+            assert locked
+            with queue.table_locks(["table"], "2023") as other:
+                assert not other
+
+        with queue.table_locks(["table"], "2023") as locked:
+            assert locked
+
+    def test_should_load_partitions_of_a_table_in_parallel(self, queue: JobQueue):
+        with queue.table_locks(["table"], "2023") as locked:
+            assert locked
+            with queue.table_locks(["table"], "2024") as other:
+                assert other
+            with queue.table_locks(["table"], "2023") as same:
+                assert not same
+            with queue.table_locks(["table"], None) as whole:
+                assert not whole
+
+
+class TestWorker:
+    def test_should_run_the_jobs_until_the_queue_is_empty(
+        self, engine: Engine, queue: JobQueue
+    ):
+        calls = []
+        flows = {"flow": JobFlow(lambda _, params: calls.append(params), ("t",))}
+        jobs = [queue.enqueue("flow", params={"years": [year]}) for year in (1, 2)]
+
+        assert worker(queue, flows).run() == 2
+
+        assert calls == [{"years": [1]}, {"years": [2]}]
+        assert all(stored(engine, job).status == JobStatus.SUCCEEDED for job in jobs)
+
+    def test_should_fail_a_job_after_its_attempts(
+        self, engine: Engine, queue: JobQueue
+    ):
+        def fail(session: Session, params: dict) -> None:  # noqa: ARG001
+            msg = "extract failed"
+            raise RuntimeError(msg)
+
+        job = queue.enqueue("flow", max_attempts=2)
+
+        worker(queue, {"flow": JobFlow(fail, ("t",))}).run()
+
+        failed = stored(engine, job)
+        assert failed.status == JobStatus.FAILED
+        assert failed.attempts == 2
+        assert failed.error is not None
+        assert "extract failed" in failed.error
+
+    def test_should_fail_jobs_of_unknown_flows(self, engine: Engine, queue: JobQueue):
+        job = queue.enqueue("unknown")
+
+        worker(queue, {}).run()
+
+        assert stored(engine, job).status == JobStatus.FAILED
+
+    def test_should_defer_jobs_of_locked_tables(self, engine: Engine, queue: JobQueue):
+        job = queue.enqueue("flow")
+        flows = {"flow": JobFlow(lambda *_: None, ("t",))}
+
+        with queue.table_locks(["t"], None):
+            worker(queue, flows).run(max_jobs=1)
+
+        assert stored(engine, job).status == JobStatus.PENDING
+
+    def test_concurrent_workers_should_run_every_job_once(
+        self, engine: Engine, queue: JobQueue
+    ):
+        calls = []
+        flows = {"flow": JobFlow(lambda _, params: calls.append(params["n"]), ())}
+        for n in range(20):
+            queue.enqueue("flow", params={"n": n})
+        workers = [
+            worker(JobQueue(engine, worker_id=f"worker-{n}"), flows) for n in range(4)
+        ]
+
+        with ThreadPoolExecutor(len(workers)) as pool:
+            claimed = sum(pool.map(lambda subject: subject.run(), workers))
+
+        assert claimed == 20
+        assert sorted(calls) == list(range(20))
@@ -0,0 +1,108 @@
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+import pytest
+from sqlmodel import Session
+
+from etl.runner import FlowRunner, FlowSpec, FlowStatus, format_summary
+
+
+@contextmanager
+def fake_session() -> Iterator[MagicMock]:
+    yield MagicMock(spec=Session)
+
+
+def succeed(session: Session) -> None: ...
+
+
+def fail(session: Session) -> None:  # noqa: ARG001
+    msg = "extract failed"
+    raise RuntimeError(msg)
+
+
+def statuses(runner: FlowRunner) -> dict[str, FlowStatus]:
+    return {result.name: result.status for result in runner.run()}
+
+
+class TestFlowRunner:
+    def test_should_run_dependencies_first(self):
+        order = []
+        flows = [
+            FlowSpec(
+                "buurt", lambda _: order.append("buurt"), depends_on=("gemeente",)
+            ),
+            FlowSpec("gemeente", lambda _: order.append("gemeente")),
+        ]
+
+        FlowRunner(flows, session_factory=fake_session).run()
+
+        assert order == ["gemeente", "buurt"]
+
+    def test_should_run_independent_flows_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        flows = [
+            FlowSpec("verkoopprijzen", lambda _: barrier.wait()),
+            FlowSpec("aantal-woningen", lambda _: barrier.wait()),
+        ]
+
+        runner = FlowRunner(flows, max_workers=2, session_factory=fake_session)
+
+        assert set(statuses(runner).values()) == {FlowStatus.SUCCEEDED}
+
+    def test_should_give_every_flow_its_own_session(self):
+        sessions = []
+        flows = [FlowSpec(name, sessions.append) for name in ("a", "b", "c")]
+
+        FlowRunner(flows, session_factory=fake_session).run()
+
+        assert len({id(session) for session in sessions}) == 3
+
+    def test_should_skip_dependants_of_failed_flow(self):
+        flows = [
+            FlowSpec("gemeente", fail),
+            FlowSpec("buurt", succeed, depends_on=("gemeente",)),
+            FlowSpec("aantal-woningen", succeed),
+        ]
+
+        runner = FlowRunner(
+            flows, max_workers=1, fail_fast=False, session_factory=fake_session
+        )
+
+        assert statuses(runner) == {
+            "gemeente": FlowStatus.FAILED,
+            "buurt": FlowStatus.SKIPPED,
+            "aantal-woningen": FlowStatus.SUCCEEDED,
+        }
+
+    def test_fail_fast_should_not_start_new_flows(self):
+        flows = [
+            FlowSpec("gemeente", fail),
+            FlowSpec("aantal-woningen", succeed, depends_on=("gemeente",)),
+            FlowSpec("verkoopprijzen", succeed, depends_on=("gemeente",)),
+        ]
+
+        runner = FlowRunner(flows, session_factory=fake_session)
+
+        assert statuses(runner)["verkoopprijzen"] == FlowStatus.SKIPPED
+
+    def test_should_raise_on_cycle(self):
+        flows = [
+            FlowSpec("a", succeed, depends_on=("b",)),
+            FlowSpec("b", succeed, depends_on=("a",)),
+        ]
+
+        with pytest.raises(ValueError, match="cycle"):
+            FlowRunner(flows)
+
+    def test_should_raise_on_unknown_dependency(self):
+        with pytest.raises(ValueError, match="unknown"):
+            FlowRunner([FlowSpec("buurt", succeed, depends_on=("gemeente",))])
+
+    def test_summary_should_contain_errors(self):
+        results = FlowRunner(
+            [FlowSpec("gemeente", fail)], session_factory=fake_session
+        ).run()
+
+        assert "extract failed" in format_summary(results)
@@ -1,5 +1,311 @@
+import asyncio
+import random
+import re
+import socket
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Annotated
+
+import typer
+import uvicorn
+from factory.random import reseed_random
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
 from sqlmodel import Session, SQLModel, func, select
 
+from models.faker_models.api.fake_models import CbsGerealiseerdeWoningenRecordFactory
+
 
 def get_row_count(session: Session, table: type[SQLModel]) -> int:
     return session.exec(select(func.count()).select_from(table)).one()
+
+
+GEREALISEERDE_WONINGEN = "81955NED"
+
+EQ_PATTERN = re.compile(r"^\(?\s*(\w+)\s+eq\s+'([^']*)'\s*\)?$")
+SUBSTRINGOF_PATTERN = re.compile(r"^\(?\s*substringof\('([^']*)',\s*(\w+)\)\s*\)?$")
+
+Predicate = Callable[[dict], bool]
+
+
+def fixed(seconds: float) -> Callable[[], float]:
+    return lambda: seconds
+
+
+def uniform(low: float, high: float, seed: int = 0) -> Callable[[], float]:
+    rng = random.Random(seed)  # noqa: S311
+    return lambda: rng.uniform(low, high)
+
+
+def lognormal(median: float, sigma: float, seed: int = 0) -> Callable[[], float]:
+    """A long tailed latency distribution, as most real apis have"""
+    rng = random.Random(seed)  # noqa: S311
+    return lambda: median * rng.lognormvariate(0, sigma)
+
+
+@dataclass
+class FakeCbsConfig:
+    """
+    The behaviour of the fake api. The rates are the chance a request fails
+    with that status, `faults` are returned first and in order, to script
+    a scenario deterministically. With a `bearer_token` requests without it
+    are unauthorized. Requests beyond `max_concurrency` in flight are rate
+    limited, like an api with a concurrency quota.
+    """
+
+    datasets: dict[str, list[dict]] = field(default_factory=dict)
+    latency: Callable[[], float] = field(default_factory=lambda: fixed(0.0))
+    rate_429: float = 0.0
+    rate_500: float = 0.0
+    rate_401: float = 0.0
+    retry_after: int = 1
+    max_page_size: int = 10000
+    faults: deque[HTTPStatus] = field(default_factory=deque)
+    bearer_token: str | None = None
+    max_concurrency: int | None = None
+    seed: int = 0
+
+
+def gerealiseerde_woningen_dataset(
+    years: list[int], gm_codes: list[str], seed: int = 0
+) -> list[dict]:
+    """
+    Monthly records for every gemeente and year, together with records of
+    other regions and gebruiksfuncties, so the filter of `CbsApi` matters.
+    """
+    reseed_random(seed)
+    records = []
+    for year in years:
+        for maand in range(1, 13):
+            records += [
+                CbsGerealiseerdeWoningenRecordFactory.build(
+                    jaar=year, maand=maand, RegioS=gm_code
+                )
+                for gm_code in gm_codes
+            ]
+            records += [
+                CbsGerealiseerdeWoningenRecordFactory.build(
+                    jaar=year, maand=maand, RegioS="NL01"
+                ),
+                CbsGerealiseerdeWoningenRecordFactory.build(
+                    jaar=year, maand=maand, Gebruiksfunctie="A045365"
+                ),
+            ]
+    return records
+
+
+def parse_condition(condition: str) -> Predicate:
+    if match := EQ_PATTERN.match(condition):
+        name, value = match.groups()
+        return lambda record: str(record.get(name)) == value
+    if match := SUBSTRINGOF_PATTERN.match(condition):
+        value, name = match.groups()
+        return lambda record: value in str(record.get(name))
+    msg = f"Unsupported $filter condition: {condition}"
+    raise ValueError(msg)
+
+
+def parse_filter(expression: str | None) -> list[Predicate]:
+    """
+    Parse the subset of the OData $filter syntax the CBS extractors use,
+    `eq` and `substringof` conditions joined by `and`.
+    """
+    if not expression:
+        return []
+    return [parse_condition(part) for part in re.split(r"\s+and\s+", expression)]
+
+
+@dataclass
+class FakeCbsApi:
+    config: FakeCbsConfig = field(default_factory=FakeCbsConfig)
+    requests: Counter = field(default_factory=Counter)
+    in_flight: int = 0
+
+    def __post_init__(self):
+        self.rng = random.Random(self.config.seed)  # noqa: S311
+
+    def authorized(self, request: Request) -> bool:
+        if self.config.bearer_token is None:
+            return True
+        authorization = request.headers.get("Authorization")
+        return authorization == f"Bearer {self.config.bearer_token}"
+
+    def fault(self, request: Request) -> HTTPStatus | None:
+        if not self.authorized(request):
+            return HTTPStatus.UNAUTHORIZED
+        if self.config.faults:
+            return self.config.faults.popleft()
+        if (
+            self.config.max_concurrency is not None
+            and self.in_flight > self.config.max_concurrency
+        ):
+            return HTTPStatus.TOO_MANY_REQUESTS
+        draw = self.rng.random()
+        for status, rate in (
+            (HTTPStatus.TOO_MANY_REQUESTS, self.config.rate_429),
+            (HTTPStatus.INTERNAL_SERVER_ERROR, self.config.rate_500),
+            (HTTPStatus.UNAUTHORIZED, self.config.rate_401),
+        ):
+            if draw < rate:
+                return status
+            draw -= rate
+        return None
+
+    def fault_response(self, status: HTTPStatus) -> JSONResponse:
+        headers = (
+            {"Retry-After": str(self.config.retry_after)}
+            if status == HTTPStatus.TOO_MANY_REQUESTS
+            else {}
+        )
+        return JSONResponse(
+            {"odata.error": {"message": {"value": status.phrase}}},
+            status_code=status,
+            headers=headers,
+        )
+
+    def query(
+        self,
+        request: Request,
+        table: str,
+        filter_: str | None,
+        select: str | None,
+        top: int | None,
+        skip: int,
+    ) -> dict:
+        if table not in self.config.datasets:
+            raise HTTPException(HTTPStatus.NOT_FOUND, f"Unknown table {table}")
+        try:
+            predicates = parse_filter(filter_)
+        except ValueError as err:
+            raise HTTPException(HTTPStatus.BAD_REQUEST, str(err)) from err
+
+        records = [
+            record
+            for record in self.config.datasets[table]
+            if all(predicate(record) for predicate in predicates)
+        ]
+        page_size = min(top or self.config.max_page_size, self.config.max_page_size)
+        page = records[skip : skip + page_size]
+        if select:
+            columns = [column.strip() for column in select.split(",")]
+            page = [{column: record[column] for column in columns} for record in page]
+
+        body: dict = {"odata.metadata": f"{request.base_url}$metadata", "value": page}
+        end = skip + page_size
+        if end < len(records) and (top is None or top > page_size):
+            next_url = request.url.include_query_params(**{"$skip": end})
+            if top is not None:
+                next_url = next_url.include_query_params(**{"$top": top - page_size})
+            body["odata.nextLink"] = str(next_url)
+        return body
+
+    def create_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.get("/{table}/TypedDataSet")
+        async def typed_data_set(
+            request: Request,
+            table: str,
+            filter_: Annotated[str | None, Query(alias="$filter")] = None,
+            select: Annotated[str | None, Query(alias="$select")] = None,
+            top: Annotated[int | None, Query(alias="$top", ge=0)] = None,
+            skip: Annotated[int, Query(alias="$skip", ge=0)] = 0,
+        ) -> JSONResponse:
+            self.in_flight += 1
+            try:
+                status = self.fault(request)
+                await asyncio.sleep(self.config.latency())
+            finally:
+                self.in_flight -= 1
+            if status is not None:
+                self.requests[status] += 1
+                return self.fault_response(status)
+
+            body = self.query(request, table, filter_, select, top, skip)
+            self.requests[HTTPStatus.OK] += 1
+            return JSONResponse(body)
+
+        return app
+
+
+@dataclass
+class FakeCbsServer:
+    api: FakeCbsApi
+    url: str
+
+    @property
+    def config(self) -> FakeCbsConfig:
+        return self.api.config
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(api: FakeCbsApi, port: int | None = None) -> Iterator[FakeCbsServer]:
+    """Run the fake api with uvicorn in a background thread"""
+    port = port or free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(api.create_app(), port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            msg = f"Fake CBS api failed to start on port {port}"
+            raise RuntimeError(msg)
+        time.sleep(0.01)
+    try:
+        yield FakeCbsServer(api, f"http://127.0.0.1:{port}")
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+
+def main(
+    port: int = 8081,
+    gm_codes: int = 350,
+    years: Annotated[list[int] | None, typer.Option("--year")] = None,
+    latency_ms: float = 0.0,
+    rate_429: float = 0.0,
+    rate_500: float = 0.0,
+    rate_401: float = 0.0,
+    retry_after: int = 1,
+    max_concurrency: int | None = None,
+):
+    """
+    A local stand-in for the CBS OData api, serving synthetic TypedDataSets
+    from the fake-data factories, with injected latency and 429/500/401
+    responses to test and benchmark the rest clients offline:
+
+        python -m tests.etl.utils --port 8081 --latency-ms 50 --rate-500 0.05
+        export CBS_ODATA_URL=http://localhost:8081
+        python -m etl.main cbs-gerealiseerde-woningen
+    """
+    config = FakeCbsConfig(
+        datasets={
+            GEREALISEERDE_WONINGEN: gerealiseerde_woningen_dataset(
+                years or [time.localtime().tm_year - 1],
+                [f"GM{code:04}" for code in range(gm_codes)],
+            )
+        },
+        latency=lognormal(latency_ms / 1000, 0.5) if latency_ms else fixed(0.0),
+        rate_429=rate_429,
+        rate_500=rate_500,
+        rate_401=rate_401,
+        retry_after=retry_after,
+        max_concurrency=max_concurrency,
+    )
+    uvicorn.run(FakeCbsApi(config).create_app(), port=port)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,66 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from shared.snapshot import Snapshot, SnapshotError, snapshot_arrays, write_snapshot
+
+
+@pytest.fixture
+def path(tmp_path: Path) -> Path:
+    path = tmp_path / "snapshots" / "cbs_aantal_woningen.bin"
+    write_snapshot(
+        path,
+        3,
+        *snapshot_arrays(
+            ["GM0363", "GM0014", "GM0014"], [2024, 2023, 2024], [10.0, 20.0, 30.0]
+        ),
+    )
+    return path
+
+
+class TestSnapshot:
+    def test_should_look_up_values(self, path: Path):
+        snapshot = Snapshot(path)
+
+        assert snapshot.version == 3
+        assert snapshot.get("GM0014", 2023) == 20.0
+        assert snapshot.get("GM0014", 2024) == 30.0
+        assert snapshot.get("GM0363", 2024) == 10.0
+
+    @pytest.mark.parametrize(
+        ("gm_code", "jaar"),
+        [("GM0363", 2023), ("GM0001", 2024), ("GM0014", 2025), ("GM00140", 2024)],
+    )
+    def test_should_return_none_when_missing(self, path: Path, gm_code: str, jaar: int):
+        assert Snapshot(path).get(gm_code, jaar) is None
+
+    def test_should_map_arrays_without_copying(self, path: Path):
+        snapshot = Snapshot(path)
+
+        assert not snapshot.values.flags.owndata
+        assert not snapshot.values.flags.writeable
+        assert snapshot.keys.tolist() == [b"GM0014", b"GM0363"]
+        np.testing.assert_array_equal(snapshot.years, [2023, 2024])
+
+    def test_should_keep_mapping_when_replaced(self, path: Path):
+        previous = Snapshot(path)
+
+        write_snapshot(path, 4, *snapshot_arrays(["GM0014"], [2024], [1.0]))
+
+        assert previous.get("GM0014", 2024) == 30.0
+        assert Snapshot(path).get("GM0014", 2024) == 1.0
+        assert list(path.parent.iterdir()) == [path]
+
+    def test_should_write_empty_snapshot(self, tmp_path: Path):
+        path = tmp_path / "empty.bin"
+        write_snapshot(path, 1, *snapshot_arrays([], [], []))
+
+        assert Snapshot(path).get("GM0014", 2024) is None
+
+    def test_should_raise_on_other_files(self, tmp_path: Path):
+        path = tmp_path / "other.bin"
+        path.write_bytes(bytes(64))
+
+        with pytest.raises(SnapshotError):
+            Snapshot(path)
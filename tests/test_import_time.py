@@ -0,0 +1,50 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).parents[1] / "src"
+
+# cold start budgets in seconds, about twice the import time on a laptop
+BUDGETS = {"app.main": 1.5, "etl.main": 0.75}
+
+# heavy dependencies that only the code paths using them should import
+DEFERRED = {
+    "app.main": ["pandas", "pyarrow", "numpy"],
+    "etl.main": ["pandas", "pyarrow", "numpy", "httpx", "sqlalchemy"],
+}
+
+IMPORT_TIME = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_times(module: str) -> dict[str, float]:
+    """The cumulative import time in seconds of every module `module` imports"""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": str(SRC)},
+    )
+    return {
+        match.group(3): int(match.group(1)) / 1e6
+        for match in IMPORT_TIME.finditer(result.stderr)
+    }
+
+
+@pytest.mark.parametrize("module", BUDGETS)
+def test_import_time_within_budget(module: str):
+    # NOTE the fastest of a few runs, the first may also compile the bytecode
+    seconds = min(import_times(module)[module] for _ in range(3))
+
+    assert seconds < BUDGETS[module], f"importing {module} took {seconds:.2f}s"
+
+
+@pytest.mark.parametrize("module", DEFERRED)
+def test_heavy_dependencies_imported_lazily(module: str):
+    imported = import_times(module)
+
+    assert [name for name in DEFERRED[module] if name in imported] == []